@@ -0,0 +1,10 @@
+/*
+  # Event tracks
+
+  Events are now emitted once per tracked plate instead of once per sampled
+  frame. The frame range over which the plate was seen is kept alongside the
+  representative `frame_no`. Rows written before tracking leave both NULL.
+*/
+
+ALTER TABLE events ADD COLUMN IF NOT EXISTS first_frame_no INTEGER;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS last_frame_no INTEGER;
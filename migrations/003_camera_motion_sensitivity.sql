@@ -0,0 +1,9 @@
+/*
+  # Per-camera motion sensitivity
+
+  The worker skips sampled frames with no motion before running the plate
+  detector. `motion_sensitivity` (0..1, higher passes smaller movements)
+  tunes that gate per camera; NULL uses the MOTION_SENSITIVITY setting.
+*/
+
+ALTER TABLE cameras ADD COLUMN IF NOT EXISTS motion_sensitivity DOUBLE PRECISION;
@@ -0,0 +1,9 @@
+/*
+  # Per-camera regions of interest
+
+  `roi` holds the rectangles/polygons (coordinates normalised to 0..1) where
+  plates can appear. The detector crops each frame to their union before
+  inference. NULL searches the whole frame.
+*/
+
+ALTER TABLE cameras ADD COLUMN IF NOT EXISTS roi JSONB;
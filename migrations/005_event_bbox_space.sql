@@ -0,0 +1,8 @@
+/*
+  # Event bbox coordinate space
+
+  Records which frame the `bbox` pixel coordinates refer to: "source" for
+  the original video frame. Existing rows stay NULL (unknown).
+*/
+
+ALTER TABLE events ADD COLUMN IF NOT EXISTS bbox_space VARCHAR(32);
@@ -0,0 +1,13 @@
+/*
+  # Segmented uploads
+
+  Long videos are split into time-range segments processed as separate
+  jobs. `segments_total` is the number of segments (NULL for uploads
+  processed in one piece); each finished segment increments
+  `segments_done` (and `segments_failed` if it failed) and adds its events
+  to `events_detected`. The upload is done once every segment has reported.
+*/
+
+ALTER TABLE uploads ADD COLUMN IF NOT EXISTS segments_total INTEGER;
+ALTER TABLE uploads ADD COLUMN IF NOT EXISTS segments_done INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE uploads ADD COLUMN IF NOT EXISTS segments_failed INTEGER NOT NULL DEFAULT 0;
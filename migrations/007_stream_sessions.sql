@@ -0,0 +1,9 @@
+/*
+  # Live stream sessions
+
+  The stream worker records each connection to a camera's RTSP stream as
+  an upload row that owns the events it produces. Sessions have no
+  uploading user, so `uploaded_by` becomes optional.
+*/
+
+ALTER TABLE uploads ALTER COLUMN uploaded_by DROP NOT NULL;
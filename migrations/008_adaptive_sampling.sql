@@ -0,0 +1,12 @@
+/*
+  # Adaptive frame sampling
+
+  The worker lowers the frame sampling rate when the job queue backs up
+  and raises it when idle. `min_sampling_fps`/`max_sampling_fps` bound
+  that rate per camera (NULL uses SAMPLING_MIN_FPS / FRAME_EXTRACTION_FPS).
+  `uploads.sampling_fps` records the rate each upload was processed at.
+*/
+
+ALTER TABLE cameras ADD COLUMN IF NOT EXISTS min_sampling_fps DOUBLE PRECISION;
+ALTER TABLE cameras ADD COLUMN IF NOT EXISTS max_sampling_fps DOUBLE PRECISION;
+ALTER TABLE uploads ADD COLUMN IF NOT EXISTS sampling_fps DOUBLE PRECISION;
@@ -0,0 +1,15 @@
+/*
+  # Deduplicate events per detection
+
+  Workers checkpoint their progress and resume interrupted jobs, and a
+  resumed or retried job writes the events around its resume point again.
+  A unique index on (upload_id, frame_no, bbox) lets those inserts be
+  skipped with ON CONFLICT DO NOTHING.
+
+  Event ids have been derived from the same three values, so existing data
+  should have no duplicates. If index creation fails, remove the duplicate
+  rows first.
+*/
+
+CREATE UNIQUE INDEX IF NOT EXISTS events_upload_frame_bbox_key
+  ON events (upload_id, frame_no, bbox);
@@ -0,0 +1,16 @@
+/*
+  # Upload priority
+
+  Uploads are queued in a lane by priority. Lanes with work share the
+  dequeues by weight (QUEUE_LANE_WEIGHTS, high 8 / normal 4 / low 1 by
+  default), so higher lanes go first more often without starving lower
+  ones, and within a lane uploaders and cameras take turns.
+*/
+
+DO $$ BEGIN
+    CREATE TYPE upload_priority AS ENUM ('high', 'normal', 'low');
+EXCEPTION
+    WHEN duplicate_object THEN NULL;
+END $$;
+
+ALTER TABLE uploads ADD COLUMN IF NOT EXISTS priority upload_priority NOT NULL DEFAULT 'normal';
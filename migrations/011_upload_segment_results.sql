@@ -0,0 +1,17 @@
+/*
+  # Segment results
+
+  One row per finished segment of a segmented upload. A segment can be
+  delivered to a worker more than once (lease expiry, crash before ack);
+  the primary key makes sure its events and completion are merged into the
+  upload only the first time.
+*/
+
+CREATE TABLE IF NOT EXISTS upload_segments (
+    upload_id UUID NOT NULL REFERENCES uploads(id) ON DELETE CASCADE,
+    segment INTEGER NOT NULL,
+    events_detected INTEGER NOT NULL DEFAULT 0,
+    error_message TEXT,
+    completed_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (upload_id, segment)
+);
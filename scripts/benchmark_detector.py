@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""Compare the torch and ONNX Runtime plate detector backends on one clip.
+
+Usage:
+    python scripts/benchmark_detector.py video.mp4 [--frames 200] [--every 10] [--int8]
+
+Samples frames the way the worker does (every `--every`-th frame, resized
+to RESIZE_WIDTH), runs each backend over the same batches and prints
+throughput and how closely the ONNX boxes match the torch ones.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.detectors import yolo_easyocr_adapter as adapter  # noqa: E402
+from src.detectors.onnx_backend import load_detector  # noqa: E402
+from src.detectors.sampling import FrameSampler  # noqa: E402
+from src.detectors.tracker import iou  # noqa: E402
+
+
+def load_frames(path: str, limit: int, every: int):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise SystemExit(f"Cannot open video: {path}")
+    width = cap.get(cv2.CAP_PROP_FRAME_WIDTH) or adapter.RESIZE_WIDTH
+    scale = adapter.RESIZE_WIDTH / width
+    frames = []
+    for _, frame in FrameSampler(cap, every):
+        frames.append(adapter._resize(frame, scale))
+        if len(frames) >= limit:
+            break
+    cap.release()
+    return frames
+
+
+def run(backend: str, model, frames, batch_size: int):
+    adapter.DETECTOR_BACKEND = backend
+    adapter._detect_boxes(model, frames[:batch_size])  # warm-up
+    boxes = []
+    started = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        boxes.extend(adapter._detect_boxes(model, frames[i:i + batch_size]))
+    return time.perf_counter() - started, boxes
+
+
+def agreement(reference, candidate):
+    """Fraction of reference boxes matched (IoU >= 0.5) and their mean IoU."""
+    matched, overlaps, total = 0, [], 0
+    for ref_boxes, cand_boxes in zip(reference, candidate):
+        for box in ref_boxes:
+            total += 1
+            best = max((iou(box, other) for other in cand_boxes), default=0.0)
+            if best >= 0.5:
+                matched += 1
+                overlaps.append(best)
+    recall = matched / total if total else 1.0
+    mean_iou = sum(overlaps) / len(overlaps) if overlaps else 0.0
+    return recall, mean_iou
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("video")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--every", type=int, default=10, help="sample every N-th frame")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--int8", action="store_true", help="quantize the ONNX model to INT8")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, args.every)
+    print(f"{len(frames)} frames at {frames[0].shape[1]}x{frames[0].shape[0]}, "
+          f"batch size {args.batch_size}, {os.cpu_count()} CPUs")
+
+    from ultralytics import YOLO
+
+    models = {
+        "torch": YOLO(adapter.YOLO_MODEL),
+        "onnx": load_detector(
+            adapter.YOLO_MODEL, adapter.ONNX_MODEL or None, adapter.ONNX_MODEL_DIR,
+            imgsz=adapter.RESIZE_WIDTH, int8=args.int8, threads=adapter.TORCH_THREADS,
+        ),
+    }
+    results = {name: run(name, model, frames, args.batch_size) for name, model in models.items()}
+
+    for name, (seconds, boxes) in results.items():
+        count = sum(len(b) for b in boxes)
+        print(f"{name:>6}: {len(frames) / seconds:7.1f} frames/s "
+              f"({1000 * seconds / len(frames):6.1f} ms/frame), {count} boxes")
+    recall, mean_iou = agreement(results["torch"][1], results["onnx"][1])
+    print(f"onnx vs torch: {recall:.1%} of torch boxes matched, mean IoU {mean_iou:.3f}")
+
+
+if __name__ == "__main__":
+    main()
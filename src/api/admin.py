@@ -25,11 +25,15 @@ async def health_check(
 
     try:
         queue_length = await queue_service.get_queue_length("video_processing")
+        lanes = await queue_service.get_lane_lengths("video_processing")
+        dead_jobs = await queue_service.get_dead_letter_length("video_processing")
         queue_status = "healthy"
     except Exception as e:
         logger.error("Queue health check failed", error=str(e))
         queue_status = "unhealthy"
         queue_length = -1
+        lanes = {}
+        dead_jobs = -1
 
     return {
         "status": "ok" if db_status == "healthy" and queue_status == "healthy" else "degraded",
@@ -37,5 +41,7 @@ async def health_check(
         "queue": {
             "status": queue_status,
             "pending_jobs": queue_length,
+            "lanes": lanes,
+            "dead_jobs": dead_jobs,
         },
     }
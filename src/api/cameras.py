@@ -8,7 +8,13 @@ from src.auth import get_current_user, get_current_admin
 from src.database import get_db
 from src.models.camera import Camera
 from src.models.user import User
-from src.schemas.camera import CameraCreate, CameraUpdate, CameraResponse
+from src.schemas.camera import (
+    CameraCreate,
+    CameraResponse,
+    CameraRoi,
+    CameraUpdate,
+    check_sampling_bounds,
+)
 from src.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -69,7 +75,16 @@ async def update_camera(
     if not camera:
         raise HTTPException(status_code=404, detail="Camera not found")
 
-    for field, value in camera_data.model_dump(exclude_unset=True).items():
+    updates = camera_data.model_dump(exclude_unset=True)
+    try:
+        check_sampling_bounds(
+            updates.get("min_sampling_fps", camera.min_sampling_fps),
+            updates.get("max_sampling_fps", camera.max_sampling_fps),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+    for field, value in updates.items():
         setattr(camera, field, value)
 
     await db.commit()
@@ -78,3 +93,44 @@ async def update_camera(
     logger.info("Camera updated", camera_id=str(camera.id), updated_by=str(current_user.id))
 
     return CameraResponse.model_validate(camera)
+
+
+@router.get("/{camera_id}/roi", response_model=CameraRoi)
+async def get_camera_roi(
+    camera_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    result = await db.execute(select(Camera).where(Camera.id == camera_id))
+    camera = result.scalar_one_or_none()
+
+    if not camera:
+        raise HTTPException(status_code=404, detail="Camera not found")
+
+    return CameraRoi(regions=camera.roi or [])
+
+
+@router.put("/{camera_id}/roi", response_model=CameraRoi)
+async def update_camera_roi(
+    camera_id: uuid.UUID,
+    roi: CameraRoi,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin),
+):
+    result = await db.execute(select(Camera).where(Camera.id == camera_id))
+    camera = result.scalar_one_or_none()
+
+    if not camera:
+        raise HTTPException(status_code=404, detail="Camera not found")
+
+    camera.roi = [region.model_dump() for region in roi.regions] or None
+    await db.commit()
+
+    logger.info(
+        "Camera ROI updated",
+        camera_id=str(camera.id),
+        regions=len(roi.regions),
+        updated_by=str(current_user.id),
+    )
+
+    return CameraRoi(regions=camera.roi or [])
@@ -4,9 +4,11 @@ from sqlalchemy import select
 
 from src.auth import get_current_user
 from src.database import get_db
-from src.models.upload import Upload
+from src.models.upload import Upload, UploadStatus
 from src.models.user import User
 from src.schemas.upload import UploadJobResponse
+from src.services.job_cost import estimate_eta
+from src.services.queue import queue_service
 from src.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -25,4 +27,14 @@ async def get_job_status(
     if not upload:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    return UploadJobResponse.model_validate(upload)
+    response = UploadJobResponse.model_validate(upload)
+    response.summary = (upload.meta_data or {}).get("summary")
+
+    work_ahead = None
+    if upload.status == UploadStatus.QUEUED:
+        try:
+            work_ahead = await queue_service.get_work_ahead("video_processing", job_id)
+        except Exception as e:
+            logger.warning("Could not read queue position", job_id=job_id, error=str(e))
+    response.eta_seconds = estimate_eta(upload, work_ahead)
+    return response
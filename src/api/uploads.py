@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 from datetime import datetime
 
@@ -9,11 +10,12 @@ from typing import Optional
 from src.auth import get_current_user
 from src.config import settings
 from src.database import get_db
-from src.models.upload import Upload, UploadStatus
+from src.models.upload import Upload, UploadPriority, UploadStatus
 from src.models.user import User
 from src.schemas.upload import UploadJobResponse
 from src.services.storage import get_storage_service
 from src.services.queue import queue_service
+from src.services.job_cost import estimate_cost, probe_upload
 from src.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -24,6 +26,7 @@ router = APIRouter(prefix="/uploads", tags=["Uploads"])
 async def upload_video(
     file: UploadFile = File(...),
     camera_id: Optional[str] = Form(None),
+    priority: UploadPriority = Form(UploadPriority.NORMAL),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -33,6 +36,9 @@ async def upload_video(
     job_id = str(uuid.uuid4())
     storage_path = f"uploads/{job_id}/{file.filename}"
 
+    probe = await asyncio.to_thread(probe_upload, file.file, file.filename)
+    cost = estimate_cost(probe)
+
     try:
         storage_service = get_storage_service()
         await storage_service.upload_file(
@@ -56,6 +62,8 @@ async def upload_video(
         storage_path=storage_path,
         file_size=file_size,
         status=UploadStatus.QUEUED,
+        priority=priority,
+        meta_data={"probe": probe, "estimated_cost": cost},
     )
     db.add(upload)
     await db.commit()
@@ -66,8 +74,14 @@ async def upload_video(
         "upload_id": str(upload.id),
         "storage_path": storage_path,
         "camera_id": camera_id,
+        "priority": priority.value,
+        "cost": cost,
+        # Jobs of one uploader and camera share that flow's turn in the lane
+        "flow": f"{current_user.id}/{camera_id or '-'}",
     })
 
-    logger.info("Upload created", job_id=job_id, uploaded_by=str(current_user.id))
+    logger.info(
+        "Upload created", job_id=job_id, uploaded_by=str(current_user.id), priority=priority.value
+    )
 
     return UploadJobResponse.model_validate(upload)
@@ -23,6 +23,15 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_KEY: str = ""
 
     REDIS_URL: str = "redis://localhost:6379/0"
+    QUEUE_RELIABLE: bool = True
+    QUEUE_LEASE_SECONDS: float = 300.0
+    QUEUE_MAX_ATTEMPTS: int = 3
+    # Share of dequeues each priority lane gets while several have work
+    QUEUE_LANE_WEIGHTS: str = "high:8,normal:4,low:1"
+    JOB_COST_SECONDS_PER_FRAME: float = 0.05
+    JOB_COST_SECONDS_PER_MEGAPIXEL: float = 0.001
+    JOB_COST_DEFAULT_SECONDS: float = 60.0
+    JOB_ETA_PARALLELISM: int = 4
 
     STORAGE_BUCKET: str = "anpr-uploads"
     STORAGE_CROPS_BUCKET: str = "anpr-crops"
@@ -33,11 +42,66 @@ class Settings(BaseSettings):
     MINIO_SECURE: bool = False
     MINIO_BUCKET: str = "anpr-uploads"
 
+    MINIO_REGION: str = "us-east-1"
+
+    STORAGE_BACKEND: Literal["auto", "minio", "supabase", "local"] = "auto"
+    STORAGE_MAX_CONCURRENCY: int = 16
+    LOCAL_STORAGE_PATH: str = "/tmp/anpr_storage"
+    CROP_UPLOAD_CONCURRENCY: int = 8
+    CROP_UPLOAD_RETRIES: int = 3
+    CROP_UPLOAD_RETRY_BACKOFF: float = 0.5
+
     WORKER_CONCURRENCY: int = 4
     WORKER_BATCH_SIZE: int = 10
+    WORKER_JOB_TYPE_LIMITS: str = ""
+    WORKER_SHUTDOWN_TIMEOUT: int = 300
+
+    WORKER_TEMP_DIR: str = ""
+    SEGMENT_SECONDS: int = 600
+    CHECKPOINT_INTERVAL_SECONDS: float = 30.0
+    CHECKPOINT_STALE_SECONDS: float = 900.0
+    CHECKPOINT_TTL_SECONDS: int = 7 * 86400
+    SEGMENT_OVERLAP_SECONDS: float = 5.0
+    DOWNLOAD_CHUNK_SIZE: int = 1024 * 1024
+    DOWNLOAD_VERIFY_ETAG: bool = True
+
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_TIMEOUT: float = 60.0
+
+    EVENT_BATCH_SIZE: int = 100
+    EVENT_FLUSH_INTERVAL: float = 2.0
+
+    DETECTOR_PLUGIN: str = "yolo_easyocr"
+    DETECTOR_THREADS: int = 0
+    DETECTION_QUEUE_SIZE: int = 32
+    DECODE_QUEUE_DEPTH: int = 32
+    INFERENCE_CONSUMERS: int = 1
 
     DETECTION_CONFIDENCE_THRESHOLD: float = 0.7
-    FRAME_EXTRACTION_FPS: int = 2
+    # A job fails once this many detection batches in a row raised
+    DETECTION_MAX_FAILED_BATCHES: int = 3
+    FRAME_EXTRACTION_FPS: float = 2
+    ADAPTIVE_SAMPLING_ENABLED: bool = True
+    SAMPLING_MIN_FPS: float = 0.5
+    SAMPLING_TARGET_QUEUE_DEPTH: int = 8
+    SAMPLING_TARGET_WAIT_SECONDS: float = 120.0
+    FRAME_SEEK_THRESHOLD: int = 250
+
+    STREAM_BATCH_SIZE: int = 1
+    STREAM_TIMEOUT_SECONDS: float = 10.0
+    STREAM_RECONNECT_MIN_SECONDS: float = 1.0
+    STREAM_RECONNECT_MAX_SECONDS: float = 60.0
+    STREAM_REFRESH_SECONDS: float = 30.0
+    STREAM_MAX_CAMERAS: int = 16
+    STREAM_SHARD_INDEX: int = 0
+    STREAM_SHARD_COUNT: int = 1
+
+    MOTION_GATE_ENABLED: bool = True
+    MOTION_SENSITIVITY: float = 0.5
+
+    TRACKING_ENABLED: bool = True
+    TRACK_MAX_MISSES: int = 2
+    TRACK_IOU_THRESHOLD: float = 0.3
 
     CORS_ORIGINS: str = "http://localhost:3000"
 
@@ -61,5 +125,25 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> list[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    @property
+    def worker_job_type_limits(self) -> dict[str, int]:
+        limits = {}
+        for item in self.WORKER_JOB_TYPE_LIMITS.split(","):
+            if ":" not in item:
+                continue
+            job_type, limit = item.split(":", 1)
+            limits[job_type.strip()] = int(limit)
+        return limits
+
+    @property
+    def queue_lane_weights(self) -> dict[str, int]:
+        weights = {}
+        for item in self.QUEUE_LANE_WEIGHTS.split(","):
+            if ":" not in item:
+                continue
+            priority, weight = item.split(":", 1)
+            weights[priority.strip()] = max(1, int(weight))
+        return weights
+
 
 settings = Settings()
@@ -0,0 +1,164 @@
+# src/detectors/ocr_cache.py
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import cv2
+import numpy as np
+from prometheus_client import Counter
+
+from src.detectors.recognizers import Reading
+
+# dHash grid: plates are wide, so use more columns than rows to keep
+# per-character detail (HASH_WIDTH * HASH_HEIGHT bits).
+HASH_WIDTH = 64
+HASH_HEIGHT = 16
+HASH_BITS = HASH_WIDTH * HASH_HEIGHT
+# Minimum brightness step (after contrast stretching) that sets a bit, so
+# flat plate background hashes to stable zeros instead of sensor noise.
+HASH_MARGIN = 16
+
+ocr_cache_lookups = Counter(
+    'anpr_ocr_cache_lookups', 'OCR cache lookups by outcome', ['result']
+)
+
+
+def dhash(gray: np.ndarray) -> int:
+    """Difference hash of a greyscale crop: one bit per rising horizontal edge."""
+    stretched = cv2.normalize(gray, None, 0, 255, cv2.NORM_MINMAX)
+    small = cv2.resize(stretched, (HASH_WIDTH + 1, HASH_HEIGHT), interpolation=cv2.INTER_AREA)
+    small = small.astype(np.int16)
+    bits = (small[:, 1:] - small[:, :-1] > HASH_MARGIN).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class OcrCache:
+    """Reuses OCR readings for near-identical plate crops.
+
+    Entries are keyed by the recognizer version and a dHash of the
+    normalised crop. A lookup hits when a stored hash of the same version
+    is within `max_distance` bits. Near matches are found through a band
+    index: the hash is split into `max_distance + 1` bands, and any hash
+    within that distance must share at least one band exactly.
+
+    The in-process LRU holds `max_entries` readings and is shared by all
+    detection threads. With a Redis client, exact-hash readings are also
+    shared between workers for `ttl` seconds. Readings of "no text"
+    (None) are cached too.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        max_distance: int = 4,
+        redis_client=None,
+        ttl: int = 86400,
+    ):
+        self.max_entries = max_entries
+        self.max_distance = max(0, max_distance)
+        self.redis = redis_client
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, int], Reading]" = OrderedDict()
+        self._bands: Dict[Tuple[str, int, int], Set[int]] = {}
+        self._lock = threading.Lock()
+        bands = self.max_distance + 1
+        step = -(-HASH_BITS // bands)
+        self._band_slices = [(i, min(step, HASH_BITS - i)) for i in range(0, HASH_BITS, step)]
+
+    def _band_keys(self, version: str, value: int):
+        for offset, width in self._band_slices:
+            yield version, offset, (value >> offset) & ((1 << width) - 1)
+
+    def _find(self, version: str, value: int) -> Optional[Tuple[str, int]]:
+        key = (version, value)
+        if key in self._entries:
+            return key
+        if not self.max_distance:
+            return None
+        best, best_distance = None, self.max_distance + 1
+        for band_key in self._band_keys(version, value):
+            for other in self._bands.get(band_key, ()):
+                distance = hamming(value, other)
+                if distance < best_distance:
+                    best, best_distance = (version, other), distance
+        return best
+
+    def get(self, version: str, value: int) -> Tuple[bool, Reading]:
+        with self._lock:
+            key = self._find(version, value)
+            if key is not None:
+                self._entries.move_to_end(key)
+                ocr_cache_lookups.labels(result="hit").inc()
+                return True, self._entries[key]
+
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(f"ocr:{version}:{value:x}")
+            except Exception:
+                # The shared tier is only an optimisation; fall back to OCR
+                raw = None
+            if raw is not None:
+                reading = json.loads(raw)
+                reading = tuple(reading) if reading is not None else None
+                self._store(version, value, reading)
+                ocr_cache_lookups.labels(result="redis_hit").inc()
+                return True, reading
+
+        ocr_cache_lookups.labels(result="miss").inc()
+        return False, None
+
+    def _store(self, version: str, value: int, reading: Reading) -> None:
+        with self._lock:
+            key = (version, value)
+            if key not in self._entries:
+                for band_key in self._band_keys(version, value):
+                    self._bands.setdefault(band_key, set()).add(value)
+            self._entries[key] = reading
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                (old_version, old_value), _ = self._entries.popitem(last=False)
+                for band_key in self._band_keys(old_version, old_value):
+                    band = self._bands.get(band_key)
+                    if band is not None:
+                        band.discard(old_value)
+                        if not band:
+                            del self._bands[band_key]
+
+    def put(self, version: str, value: int, reading: Reading) -> None:
+        self._store(version, value, reading)
+        if self.redis is not None:
+            try:
+                self.redis.set(f"ocr:{version}:{value:x}", json.dumps(reading), ex=self.ttl)
+            except Exception:
+                pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def recognize(
+        self,
+        version: str,
+        grays: Sequence[np.ndarray],
+        recognize: Callable[[Sequence[np.ndarray]], List[Reading]],
+    ) -> List[Reading]:
+        """Answer what the cache can and pass only the misses to `recognize`."""
+        hashes = [dhash(gray) for gray in grays]
+        results: List[Reading] = [None] * len(grays)
+        misses = []
+        for i, value in enumerate(hashes):
+            hit, reading = self.get(version, value)
+            if hit:
+                results[i] = reading
+            else:
+                misses.append(i)
+
+        if misses:
+            for i, reading in zip(misses, recognize([grays[i] for i in misses]), strict=True):
+                results[i] = reading
+                self.put(version, hashes[i], reading)
+        return results
@@ -0,0 +1,175 @@
+# src/detectors/onnx_backend.py
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+PAD_VALUE = 114
+
+
+def letterbox(frame: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """Resize `frame` into a `size`x`size` square, keeping aspect ratio.
+
+    Returns the padded image, the scale applied and the (x, y) padding, as
+    ultralytics does, so boxes can be mapped back with `unletterbox`.
+    """
+    h, w = frame.shape[:2]
+    gain = min(size / h, size / w)
+    new_w, new_h = round(w * gain), round(h * gain)
+    if (new_w, new_h) != (w, h):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - new_w) / 2, (size - new_h) / 2
+    top, left = round(pad_y - 0.1), round(pad_x - 0.1)
+    out = np.full((size, size, 3), PAD_VALUE, dtype=np.uint8)
+    out[top:top + new_h, left:left + new_w] = frame
+    return out, gain, (left, top)
+
+
+def unletterbox(
+    boxes: np.ndarray, gain: float, pad: Tuple[float, float], shape: Tuple[int, int]
+) -> np.ndarray:
+    boxes = boxes.copy()
+    boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad[0]) / gain
+    boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad[1]) / gain
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, shape[1])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, shape[0])
+    return boxes
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy non-maximum suppression; returns kept indices by descending score."""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = (np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest])).clip(0)
+        h = (np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest])).clip(0)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def postprocess(
+    output: np.ndarray, conf: float, iou_threshold: float, max_detections: int = 100
+) -> np.ndarray:
+    """Decode one image's raw YOLOv8 output of shape (4 + classes, anchors).
+
+    Returns an (N, 5) array of x1, y1, x2, y2, score in letterboxed pixels.
+    """
+    predictions = output.T
+    scores = predictions[:, 4:].max(axis=1)
+    predictions, scores = predictions[scores >= conf], scores[scores >= conf]
+    if not len(predictions):
+        return np.zeros((0, 5), dtype=np.float32)
+
+    cx, cy, w, h = predictions[:, :4].T
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    keep = nms(boxes, scores, iou_threshold)[:max_detections]
+    return np.concatenate([boxes[keep], scores[keep, None]], axis=1).astype(np.float32)
+
+
+class OnnxPlateDetector:
+    """Runs an exported YOLOv8 plate model with ONNX Runtime on CPU.
+
+    Letterboxing, output decoding and NMS are done in NumPy, mirroring what
+    ultralytics does, so the boxes match the torch path. onnxruntime is
+    only imported here, so the rest of the module works without it.
+    """
+
+    def __init__(self, model_path: str, iou_threshold: float = 0.7, threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, _ = model_input.shape
+        # Static exports have a fixed batch and image size; dynamic ones use names
+        self.fixed_batch = batch if isinstance(batch, int) else None
+        self.fixed_size = height if isinstance(height, int) else None
+        self.iou_threshold = iou_threshold
+
+    def predict_boxes(self, frames: List[np.ndarray], conf: float, imgsz: int) -> List[np.ndarray]:
+        """Return an (N, 5) x1, y1, x2, y2, score array per frame, in frame pixels."""
+        size = self.fixed_size or imgsz
+        prepared = [letterbox(frame, size) for frame in frames]
+        # BGR HWC uint8 -> RGB CHW float32 in 0..1
+        blob = np.stack([image for image, _, _ in prepared])[..., ::-1].transpose(0, 3, 1, 2)
+        blob = np.ascontiguousarray(blob, dtype=np.float32) / 255.0
+
+        step = self.fixed_batch or len(frames)
+        outputs = [
+            self.session.run(None, {self.input_name: blob[i:i + step]})[0]
+            for i in range(0, len(frames), step)
+        ]
+        output = np.concatenate(outputs)
+
+        results = []
+        for raw, frame, (_, gain, pad) in zip(output, frames, prepared, strict=True):
+            boxes = postprocess(raw, conf, self.iou_threshold)
+            boxes[:, :4] = unletterbox(boxes[:, :4], gain, pad, frame.shape[:2])
+            results.append(boxes)
+        return results
+
+
+def export_onnx(
+    model_name: str, output_dir: str, imgsz: int = 640, int8: bool = False
+) -> str:
+    """Export `model_name` to ONNX (dynamic batch/size) and optionally quantize it.
+
+    Only the export needs torch/ultralytics. Returns the path of the model
+    to load; files already in `output_dir` are reused.
+    """
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    stem = model_name.replace("/", "__")
+    fp32_path = out / f"{stem}.onnx"
+
+    if not fp32_path.exists():
+        from ultralytics import YOLO
+
+        exported = YOLO(model_name).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+        os.replace(exported, fp32_path)
+
+    return quantize_onnx(str(fp32_path), output_dir) if int8 else str(fp32_path)
+
+
+def quantize_onnx(model_path: str, output_dir: str) -> str:
+    """Quantize an ONNX model's weights to int8 into `output_dir`; reuses an earlier result."""
+    if model_path.endswith(".int8.onnx"):
+        return model_path
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    int8_path = out / f"{Path(model_path).stem}.int8.onnx"
+    if not int8_path.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(model_path, str(int8_path), weight_type=QuantType.QUInt8)
+    return str(int8_path)
+
+
+def load_detector(
+    model_name: str,
+    model_path: Optional[str],
+    model_dir: str,
+    imgsz: int,
+    int8: bool,
+    threads: int = 0,
+) -> OnnxPlateDetector:
+    if model_path:
+        path = quantize_onnx(model_path, model_dir) if int8 else model_path
+    else:
+        path = export_onnx(model_name, model_dir, imgsz=imgsz, int8=int8)
+    return OnnxPlateDetector(path, threads=threads)
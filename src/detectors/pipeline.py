@@ -0,0 +1,172 @@
+# src/detectors/pipeline.py
+import heapq
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Tuple
+
+import numpy as np
+from prometheus_client import Histogram
+
+stage_seconds = Histogram(
+    'anpr_pipeline_stage_seconds', 'Time spent per batch in each detection pipeline stage', ['stage']
+)
+
+Frame = Tuple[int, np.ndarray]
+PrepareFn = Callable[[int, np.ndarray], Any]
+InferFn = Callable[[List[Any]], List[Any]]
+
+_END = object()
+_POLL_SECONDS = 0.2
+
+
+class FramePipeline:
+    """Overlaps video decoding with inference.
+
+    A decoder thread reads frames from `frames`, applies `prepare` (e.g. a
+    resize) and packs them into batches held in a bounded queue of about
+    `queue_depth` frames. `consumers` inference threads drain that queue
+    and call `infer` on each batch. Iterating the pipeline yields each
+    batch's results in decode order, whichever consumer finished first.
+
+    `infer` must be safe to call from several threads at once when
+    `consumers` > 1. Per-stage timings are accumulated in `stats`.
+    """
+
+    def __init__(
+        self,
+        frames: Iterable[Frame],
+        infer: InferFn,
+        prepare: Optional[PrepareFn] = None,
+        batch_size: int = 1,
+        queue_depth: int = 32,
+        consumers: int = 1,
+    ):
+        self.frames = frames
+        self.infer = infer
+        self.prepare = prepare
+        self.batch_size = max(1, batch_size)
+        self.consumers = max(1, consumers)
+        self.stats: Dict[str, Any] = {
+            "batches": 0,
+            "frames": 0,
+            "prepare_seconds": 0.0,
+            "infer_seconds": 0.0,
+            "infer_wait_seconds": 0.0,
+        }
+        self._batches: queue.Queue = queue.Queue(maxsize=max(1, queue_depth // self.batch_size))
+        self._results: queue.Queue = queue.Queue(maxsize=self.consumers * 2)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _add_stat(self, key: str, value: float) -> None:
+        with self._lock:
+            self.stats[key] += value
+
+    def _decode(self) -> None:
+        seq = 0
+        batch: List[Any] = []
+        try:
+            for frame_no, frame in self.frames:
+                if self._stop.is_set():
+                    return
+                if self.prepare is not None:
+                    started = time.perf_counter()
+                    item = self.prepare(frame_no, frame)
+                    elapsed = time.perf_counter() - started
+                    self._add_stat("prepare_seconds", elapsed)
+                    stage_seconds.labels(stage="prepare").observe(elapsed)
+                else:
+                    item = (frame_no, frame)
+                batch.append(item)
+
+                if len(batch) >= self.batch_size:
+                    if not self._put(self._batches, (seq, batch)):
+                        return
+                    seq += 1
+                    batch = []
+
+            if batch and not self._put(self._batches, (seq, batch)):
+                return
+        except BaseException as e:
+            self._put(self._results, (-1, e))
+        finally:
+            for _ in range(self.consumers):
+                self._put(self._batches, _END)
+
+    def _consume(self) -> None:
+        while True:
+            started = time.perf_counter()
+            item = self._get(self._batches)
+            waited = time.perf_counter() - started
+            self._add_stat("infer_wait_seconds", waited)
+            stage_seconds.labels(stage="wait").observe(waited)
+            if item is _END:
+                self._put(self._results, _END)
+                return
+
+            seq, batch = item
+            try:
+                started = time.perf_counter()
+                results = self.infer(batch)
+                elapsed = time.perf_counter() - started
+            except BaseException as e:
+                self._put(self._results, (-1, e))
+                self._put(self._results, _END)
+                return
+
+            stage_seconds.labels(stage="infer").observe(elapsed)
+            with self._lock:
+                self.stats["infer_seconds"] += elapsed
+                self.stats["batches"] += 1
+                self.stats["frames"] += len(batch)
+            if not self._put(self._results, (seq, results)):
+                return
+
+    def __iter__(self) -> Generator[Any, None, None]:
+        threads = [threading.Thread(target=self._decode, name="frame-decoder", daemon=True)]
+        threads += [
+            threading.Thread(target=self._consume, name=f"frame-infer-{i}", daemon=True)
+            for i in range(self.consumers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        pending: List[Tuple[int, int, Any]] = []
+        next_seq = 0
+        finished = 0
+        try:
+            while finished < self.consumers:
+                item = self._results.get()
+                if item is _END:
+                    finished += 1
+                    continue
+                seq, payload = item
+                if seq < 0:
+                    raise payload
+                # Consumers may finish out of order; release batches in sequence.
+                heapq.heappush(pending, (seq, id(payload), payload))
+                while pending and pending[0][0] == next_seq:
+                    yield heapq.heappop(pending)[2]
+                    next_seq += 1
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,206 @@
+# src/detectors/recognizers.py
+import bisect
+import itertools
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+OCR_BATCH_SIZE = max(1, int(os.getenv("OCR_BATCH_SIZE", "32")))
+# Crops whose aspect ratio falls in this range are treated as tight plate
+# crops and sent straight to the recognizer, skipping EasyOCR's detector.
+OCR_TIGHT_MIN_ASPECT = float(os.getenv("OCR_TIGHT_MIN_ASPECT", "1.5"))
+OCR_TIGHT_MAX_ASPECT = float(os.getenv("OCR_TIGHT_MAX_ASPECT", "6.0"))
+# CRNN recognizer (OCR_BACKEND=crnn)
+CRNN_MODEL = os.getenv("CRNN_MODEL", "")
+CRNN_ALPHABET = os.getenv("CRNN_ALPHABET", "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+CRNN_HEIGHT = int(os.getenv("CRNN_HEIGHT", "32"))
+CRNN_WIDTH = int(os.getenv("CRNN_WIDTH", "128"))
+
+Reading = Optional[Tuple[str, float]]
+
+
+class PlateRecognizer(ABC):
+    """Reads plate text from pre-localised, greyscale plate crops."""
+
+    name: str = "base"
+
+    @property
+    def version(self) -> str:
+        """Identifies the model and settings; cached readings are keyed on it."""
+        return self.name
+
+    @abstractmethod
+    def recognize(self, grays: Sequence[np.ndarray]) -> List[Reading]:
+        """Return the best (text, confidence) for each crop, or None if no text."""
+
+
+class EasyOcrRecognizer(PlateRecognizer):
+    """EasyOCR's general scene-text reader.
+
+    Tight plate crops are stacked on one canvas and recognised in a single
+    call with the text detector skipped; loose crops go through `readtext`.
+    """
+
+    name = "easyocr"
+
+    def __init__(self, gpu: bool = False, reader=None):
+        if reader is None:
+            import easyocr
+
+            reader = easyocr.Reader(['en'], gpu=gpu)
+        self.reader = reader
+
+    @staticmethod
+    def is_tight(crop: np.ndarray) -> bool:
+        h, w = crop.shape[:2]
+        return h > 0 and OCR_TIGHT_MIN_ASPECT <= w / h <= OCR_TIGHT_MAX_ASPECT
+
+    def _recognize_tight(self, grays: Sequence[np.ndarray]) -> List[Reading]:
+        """Recognize many tight plate crops with a single recognizer call.
+
+        The crops are stacked vertically on one canvas and passed to EasyOCR as
+        pre-computed text boxes, so the text detector never runs. Each result is
+        mapped back to its crop by vertical position.
+        """
+        width = max(g.shape[1] for g in grays)
+        offsets = list(itertools.accumulate((g.shape[0] for g in grays), initial=0))
+        canvas = np.zeros((offsets[-1], width), dtype=np.uint8)
+        boxes = []
+        for gray, top in zip(grays, offsets[:-1], strict=True):
+            h, w = gray.shape[:2]
+            canvas[top:top + h, :w] = gray
+            boxes.append([0, w, top, top + h])
+
+        results = self.reader.recognize(
+            canvas, horizontal_list=boxes, free_list=[], batch_size=OCR_BATCH_SIZE, detail=1
+        )
+
+        best: List[Reading] = [None] * len(grays)
+        for box, text, prob in results:
+            if not text:
+                continue
+            top = min(point[1] for point in box)
+            i = bisect.bisect_right(offsets, top) - 1
+            if 0 <= i < len(grays) and (best[i] is None or prob > best[i][1]):
+                best[i] = (text, float(prob))
+        return best
+
+    def recognize(self, grays: Sequence[np.ndarray]) -> List[Reading]:
+        results: List[Reading] = [None] * len(grays)
+
+        tight = [i for i, g in enumerate(grays) if self.is_tight(g)]
+        if tight:
+            readings = self._recognize_tight([grays[i] for i in tight])
+            for i, result in zip(tight, readings, strict=True):
+                results[i] = result
+
+        tight_set = set(tight)
+        for i, gray in enumerate(grays):
+            if i in tight_set:
+                continue
+            # Loose crop: let EasyOCR locate the text first (easyocr returns list of tuples)
+            ocr_results = self.reader.readtext(gray)
+            if ocr_results:
+                # take best result (highest prob)
+                best = max(ocr_results, key=lambda r: r[2])
+                results[i] = (best[1], float(best[2]))
+        return results
+
+
+def ctc_greedy_decode(probs: np.ndarray, alphabet: str, blank: int = 0) -> Reading:
+    """Decode one (time, classes) probability matrix with best-path CTC.
+
+    Class `blank` is the CTC blank; class i > blank maps to alphabet[i - 1].
+    Confidence is the mean probability of the emitted characters.
+    """
+    best = probs.argmax(axis=1)
+    scores = probs.max(axis=1)
+    chars, confidences = [], []
+    previous = blank
+    for index, score in zip(best, scores, strict=True):
+        if index != blank and index != previous:
+            chars.append(alphabet[index - 1])
+            confidences.append(score)
+        previous = index
+    if not chars:
+        return None
+    return "".join(chars), float(np.mean(confidences))
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
+class CrnnRecognizer(PlateRecognizer):
+    """Compact CTC plate recognizer (CRNN-style) on ONNX Runtime.
+
+    Crops are resized to a fixed height, padded to a fixed width and run
+    in batches of OCR_BATCH_SIZE. The model takes NCHW float input scaled
+    to -1..1 and returns per-timestep class scores shaped (N, T, C), with
+    the CTC blank at index 0 and CRNN_ALPHABET after it. Raw logits are
+    softmaxed; probabilities are used as-is.
+    """
+
+    name = "crnn"
+
+    def __init__(
+        self,
+        model_path: str,
+        alphabet: str = CRNN_ALPHABET,
+        height: int = CRNN_HEIGHT,
+        width: int = CRNN_WIDTH,
+        threads: int = 0,
+    ):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        _, channels, model_height, model_width = model_input.shape
+        self.channels = channels if isinstance(channels, int) else 1
+        self.height = model_height if isinstance(model_height, int) else height
+        self.width = model_width if isinstance(model_width, int) else width
+        self.alphabet = alphabet
+        self.model_path = model_path
+
+    @property
+    def version(self) -> str:
+        return f"{self.name}:{os.path.basename(self.model_path)}:{self.alphabet}"
+
+    def preprocess(self, grays: Sequence[np.ndarray]) -> np.ndarray:
+        batch = np.zeros((len(grays), self.channels, self.height, self.width), dtype=np.float32)
+        for i, gray in enumerate(grays):
+            h, w = gray.shape[:2]
+            new_w = min(self.width, max(1, round(w * self.height / h)))
+            resized = cv2.resize(gray, (new_w, self.height), interpolation=cv2.INTER_LINEAR)
+            batch[i, :, :, :new_w] = (resized.astype(np.float32) / 127.5) - 1.0
+        return batch
+
+    def recognize(self, grays: Sequence[np.ndarray]) -> List[Reading]:
+        results: List[Reading] = []
+        for start in range(0, len(grays), OCR_BATCH_SIZE):
+            chunk = grays[start:start + OCR_BATCH_SIZE]
+            scores = self.session.run(None, {self.input_name: self.preprocess(chunk)})[0]
+            if scores.min() < 0 or not np.allclose(scores.sum(axis=-1), 1.0, atol=1e-3):
+                scores = _softmax(scores)
+            results.extend(ctc_greedy_decode(s, self.alphabet) for s in scores)
+        return results
+
+
+def create_recognizer(backend: str, gpu: bool = False, threads: int = 0) -> PlateRecognizer:
+    if backend == "crnn":
+        if not CRNN_MODEL:
+            raise ValueError("OCR_BACKEND=crnn requires CRNN_MODEL")
+        return CrnnRecognizer(CRNN_MODEL, threads=threads)
+    if backend == "easyocr":
+        return EasyOcrRecognizer(gpu=gpu)
+    raise ValueError(f"Unknown OCR backend: {backend}")
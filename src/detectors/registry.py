@@ -0,0 +1,76 @@
+# src/detectors/registry.py
+import importlib
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+
+class DetectorPlugin(ABC):
+    """A plate detector model behind the shared video loop.
+
+    DetectorAdapter owns decoding, sampling, ROI cropping, motion gating,
+    batching, pipelining and tracking; a plugin only turns batches of frames
+    into plate readings. `prepare` runs on the decoder thread for each
+    sampled frame (e.g. to resize it) and `detect_batch` runs on an
+    inference thread, possibly several at once.
+
+    `detect_batch` receives `(frame_no, prepared)` pairs and returns
+    detection dicts with `plate`, `confidence`, `bbox` ({x1, y1, x2, y2} in
+    pixels of the frame passed to `prepare`), `frame_no` and `crop` (the
+    plate image to store).
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    def load(self) -> None:
+        """Load models up front so the first batch does not pay for it."""
+
+    def prepare(self, frame: np.ndarray) -> Any:
+        return frame
+
+    @abstractmethod
+    def detect_batch(self, frames: Sequence[Tuple[int, Any]]) -> List[Dict[str, Any]]:
+        pass
+
+
+# Plugins are registered by import path so heavy model dependencies are only
+# imported when that plugin is selected.
+_registry: Dict[str, Union[str, Callable[[], DetectorPlugin]]] = {
+    "yolo_easyocr": "src.detectors.yolo_easyocr_adapter:YoloEasyOcrDetector",
+}
+_instances: Dict[str, DetectorPlugin] = {}
+_lock = threading.Lock()
+
+
+def register_detector(name: str, factory: Union[str, Callable[[], DetectorPlugin]]) -> None:
+    """Register a plugin factory (a callable or a "module:attribute" path)."""
+    with _lock:
+        _registry[name] = factory
+        _instances.pop(name, None)
+
+
+def available_detectors() -> List[str]:
+    return sorted(_registry)
+
+
+def get_detector(name: str) -> DetectorPlugin:
+    """Return the shared instance of the plugin registered as `name`.
+
+    `name` may also be a "module:attribute" path to an unregistered plugin.
+    """
+    with _lock:
+        if name not in _instances:
+            try:
+                factory = _registry[name] if ":" not in name else name
+            except KeyError:
+                raise ValueError(
+                    f"Unknown detector plugin: {name} (available: {', '.join(available_detectors())})"
+                ) from None
+            if isinstance(factory, str):
+                module_name, attribute = factory.split(":")
+                factory = getattr(importlib.import_module(module_name), attribute)
+            _instances[name] = factory()
+        return _instances[name]
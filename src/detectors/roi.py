@@ -0,0 +1,74 @@
+# src/detectors/roi.py
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+
+def region_points(region: Dict[str, Any]) -> List[Tuple[float, float]]:
+    """Return a region's outline as normalised (x, y) points."""
+    if region["type"] == "rect":
+        x1, y1, x2, y2 = region["x1"], region["y1"], region["x2"], region["y2"]
+        return [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+    return [tuple(point) for point in region["points"]]
+
+
+class RegionOfInterest:
+    """Restricts detection to the parts of a camera's view where plates appear.
+
+    `regions` are rectangles (`{"type": "rect", "x1", "y1", "x2", "y2"}`)
+    or polygons (`{"type": "polygon", "points": [[x, y], ...]}`) in
+    coordinates normalised to 0..1, so they survive resolution changes.
+    `crop` cuts a frame down to the bounding box of the union of regions
+    and blanks whatever lies outside them; `to_frame` maps a box found in
+    the crop back to full-frame coordinates.
+    """
+
+    def __init__(self, regions: Sequence[Dict[str, Any]]):
+        self.regions = list(regions)
+        self._shape: Optional[Tuple[int, int]] = None
+        self.origin = (0, 0)
+        self._bounds = (0, 0, 0, 0)
+        self._mask: Optional[np.ndarray] = None
+
+    def _bind(self, height: int, width: int) -> None:
+        polygons = [
+            np.array(
+                [(round(x * width), round(y * height)) for x, y in region_points(region)],
+                dtype=np.int32,
+            )
+            for region in self.regions
+        ]
+        points = np.concatenate(polygons)
+        x0, y0 = np.clip(points.min(axis=0), 0, (width, height))
+        x1, y1 = np.clip(points.max(axis=0), 0, (width, height))
+        if x1 <= x0 or y1 <= y0:
+            raise ValueError("Region of interest lies outside the frame")
+
+        mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        cv2.fillPoly(mask, [polygon - (x0, y0) for polygon in polygons], 255)
+        # A plain rectangle covers its own bounding box: no masking needed
+        self._mask = None if cv2.countNonZero(mask) == mask.size else mask
+        self._bounds = (int(x0), int(y0), int(x1), int(y1))
+        self.origin = (int(x0), int(y0))
+        self._shape = (height, width)
+
+    def crop(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        if self._shape != (height, width):
+            self._bind(height, width)
+        x0, y0, x1, y1 = self._bounds
+        view = frame[y0:y1, x0:x1]
+        if self._mask is None:
+            return view
+        return cv2.bitwise_and(view, view, mask=self._mask)
+
+    def to_frame(self, bbox: Dict[str, int], scale: float = 1.0) -> Dict[str, int]:
+        """Map a box in crop coordinates back to the (optionally scaled) full frame."""
+        dx, dy = round(self.origin[0] * scale), round(self.origin[1] * scale)
+        return {
+            "x1": bbox["x1"] + dx,
+            "y1": bbox["y1"] + dy,
+            "x2": bbox["x2"] + dx,
+            "y2": bbox["y2"] + dy,
+        }
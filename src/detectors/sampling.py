@@ -0,0 +1,135 @@
+# src/detectors/sampling.py
+import time
+from typing import Any, Dict, Generator, Optional, Tuple
+
+import cv2
+import numpy as np
+from prometheus_client import Counter
+
+# Skipping this many frames or more is done with a seek instead of grab() calls.
+DEFAULT_SEEK_THRESHOLD = 250
+
+frames_read = Counter(
+    'anpr_decoder_frames', 'Frames read by the video decoder', ['op']
+)
+decode_seconds = Counter(
+    'anpr_decoder_seconds', 'Seconds spent reading and decoding video frames'
+)
+
+
+class FrameSampler:
+    """Yields every `interval`-th frame of a capture as (position, frame).
+
+    Positions are 0-based frame indices; sampled positions are those with
+    `position % interval == phase`. Skipped frames are only grabbed, never
+    retrieved (no colour conversion or copy), and long gaps are crossed by
+    seeking when the backend supports it. Decode cost is tallied in `stats`
+    and exported as Prometheus counters.
+    """
+
+    def __init__(
+        self,
+        cap: cv2.VideoCapture,
+        interval: int,
+        phase: int = 0,
+        start_frame: int = 0,
+        end_frame: Optional[int] = None,
+        seek_threshold: int = DEFAULT_SEEK_THRESHOLD,
+    ):
+        self.cap = cap
+        self.interval = max(1, int(interval))
+        self.phase = phase % self.interval
+        self.start_frame = max(0, start_frame)
+        self.end_frame = end_frame
+        self.seek_threshold = max(1, seek_threshold)
+        self.stats: Dict[str, Any] = {
+            "frames_grabbed": 0,
+            "frames_decoded": 0,
+            "seeks": 0,
+            "decode_seconds": 0.0,
+        }
+
+    def _first_target(self) -> int:
+        offset = (self.phase - self.start_frame) % self.interval
+        return self.start_frame + offset
+
+    def _seek(self, target: int) -> Optional[int]:
+        """Seek to `target`; return the position actually reached, or None."""
+        if not self.cap.set(cv2.CAP_PROP_POS_FRAMES, target):
+            return None
+        reached = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if reached < 0:
+            return None
+        self.stats["seeks"] += 1
+        frames_read.labels(op="seek").inc()
+        return reached
+
+    def _grab(self, count: int) -> bool:
+        grabbed = 0
+        try:
+            for _ in range(count):
+                if not self.cap.grab():
+                    return False
+                grabbed += 1
+            return True
+        finally:
+            self.stats["frames_grabbed"] += grabbed
+            frames_read.labels(op="grab").inc(grabbed)
+
+    def __iter__(self) -> Generator[Tuple[int, np.ndarray], None, None]:
+        position = 0
+        target = self._first_target()
+
+        while self.end_frame is None or target < self.end_frame:
+            started = time.perf_counter()
+            gap = target - position
+            if gap >= self.seek_threshold:
+                reached = self._seek(target)
+                if reached is not None:
+                    position = reached
+                    if position > target:
+                        # Overshot (keyframe-only seeking): resume at the next sample
+                        target += -(-(position - target) // self.interval) * self.interval
+                        if self.end_frame is not None and target >= self.end_frame:
+                            break
+                    gap = target - position
+            if gap > 0 and not self._grab(gap):
+                break
+
+            ok = self.cap.grab()
+            if ok:
+                ok, frame = self.cap.retrieve()
+            elapsed = time.perf_counter() - started
+            self.stats["decode_seconds"] += elapsed
+            decode_seconds.inc(elapsed)
+            if not ok:
+                break
+
+            self.stats["frames_grabbed"] += 1
+            self.stats["frames_decoded"] += 1
+            frames_read.labels(op="retrieve").inc()
+            position = target + 1
+
+            yield target, frame
+            target += self.interval
+
+
+def probe_video(path: str) -> Dict[str, Any]:
+    """Read a video's frame count, frame rate, size and codec from its container."""
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            raise ValueError(f"Cannot open video file: {path}")
+        frames = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        return {
+            "frames": frames,
+            "fps": fps,
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "duration": frames / fps if fps > 0 else 0.0,
+            "codec": "".join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)).strip("\x00 "),
+        }
+    finally:
+        cap.release()
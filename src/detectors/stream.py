@@ -0,0 +1,193 @@
+# src/detectors/stream.py
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Generator, Optional, Tuple
+from urllib.parse import urlparse, urlunparse
+from urllib.request import url2pathname
+
+import cv2
+import numpy as np
+from prometheus_client import Counter
+
+from src.detectors.sampling import decode_seconds, frames_read
+
+# Assumed frame rate when a live stream does not report one
+DEFAULT_STREAM_FPS = 25.0
+# Capture times kept for sampled frames (oldest dropped first)
+MAX_PENDING_TIMESTAMPS = 10000
+
+stream_frames = Counter(
+    'anpr_stream_frames', 'Frames read from live camera streams', ['camera_id', 'op']
+)
+
+
+class PacedCapture:
+    """Plays a video file back in real time, standing in for a live camera.
+
+    `grab` blocks until the next frame is due at the file's frame rate (times
+    `speed`), so the stream pipeline sees the same pacing and frame drops
+    as with an RTSP source. Used for `file://` camera URLs.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.cap = cv2.VideoCapture(path)
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or DEFAULT_STREAM_FPS
+        self.period = 1.0 / (fps * speed)
+        self._next: Optional[float] = None
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def grab(self) -> bool:
+        now = time.monotonic()
+        if self._next is None:
+            self._next = now
+        elif now < self._next:
+            time.sleep(self._next - now)
+        self._next += self.period
+        return self.cap.grab()
+
+    def retrieve(self) -> Tuple[bool, Any]:
+        return self.cap.retrieve()
+
+    def get(self, prop: int) -> float:
+        return self.cap.get(prop)
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+def open_stream(url: str, timeout: float = 10.0):
+    """Open a camera URL: RTSP/HTTP through FFmpeg, `file://` as a paced file."""
+    if url.startswith("file://"):
+        return PacedCapture(url2pathname(urlparse(url).path))
+    timeout_ms = int(timeout * 1000)
+    return cv2.VideoCapture(
+        url,
+        cv2.CAP_FFMPEG,
+        [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms, cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms],
+    )
+
+
+def connect_stream(url: str, timeout: float = 10.0):
+    """Open a camera URL and wait for its first frame.
+
+    Raises ConnectionError, with the capture released, when the camera
+    cannot be opened or sends nothing.
+    """
+    cap = open_stream(url, timeout=timeout)
+    if not cap.isOpened() or not cap.grab():
+        cap.release()
+        raise ConnectionError(f"Cannot open stream: {redact_url(url)}")
+    return cap
+
+
+def redact_url(url: str) -> str:
+    """Drop credentials from a camera URL so it can be stored and logged."""
+    parts = urlparse(url)
+    if parts.username is None and parts.password is None:
+        return url
+    host = parts.hostname or ""
+    if parts.port:
+        host = f"{host}:{parts.port}"
+    return urlunparse(parts._replace(netloc=host))
+
+
+class StreamSampler:
+    """Yields about `fps` frames per second of a live capture as (frame_no, frame).
+
+    Every frame is grabbed so the decoder keeps up with the camera, but only
+    sampled frames are retrieved (decoded to BGR). `frame_no` counts grabbed
+    frames since the stream was opened. The wall-clock time each sampled
+    frame was grabbed is kept for `captured_at`. Iteration ends when the
+    stream drops or `stop` is set.
+    """
+
+    def __init__(
+        self,
+        cap,
+        fps: float,
+        stop: Optional[threading.Event] = None,
+        camera_id: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.cap = cap
+        self.period = 1.0 / fps if fps > 0 else 0.0
+        self.stop = stop or threading.Event()
+        self.camera_id = camera_id or "unknown"
+        self.clock = clock
+        stream_fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_STREAM_FPS
+        # Grabbed frames per sample, for frame-based settings such as track gaps
+        self.interval = max(1, round(stream_fps * self.period))
+        self.stats: Dict[str, Any] = {
+            "frames_grabbed": 0,
+            "frames_decoded": 0,
+            "decode_seconds": 0.0,
+        }
+        self._timestamps: "OrderedDict[int, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def captured_at(self, frame_no: int) -> datetime:
+        with self._lock:
+            timestamp = self._timestamps.get(frame_no)
+        return datetime.utcfromtimestamp(timestamp if timestamp is not None else self.clock())
+
+    def _remember(self, frame_no: int, timestamp: float) -> None:
+        with self._lock:
+            self._timestamps[frame_no] = timestamp
+            while len(self._timestamps) > MAX_PENDING_TIMESTAMPS:
+                self._timestamps.popitem(last=False)
+
+    def __iter__(self) -> Generator[Tuple[int, np.ndarray], None, None]:
+        frame_no = -1
+        next_due = None
+        grabbed = stream_frames.labels(camera_id=self.camera_id, op="grab")
+        retrieved = stream_frames.labels(camera_id=self.camera_id, op="retrieve")
+
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            if not self.cap.grab():
+                break
+            frame_no += 1
+            self.stats["frames_grabbed"] += 1
+            grabbed.inc()
+            timestamp = self.clock()
+            if next_due is not None and timestamp < next_due:
+                continue
+
+            ok, frame = self.cap.retrieve()
+            elapsed = time.perf_counter() - started
+            self.stats["decode_seconds"] += elapsed
+            decode_seconds.inc(elapsed)
+            if not ok:
+                break
+            self.stats["frames_decoded"] += 1
+            retrieved.inc()
+            frames_read.labels(op="retrieve").inc()
+
+            next_due = timestamp if next_due is None else next_due
+            next_due += self.period
+            if next_due <= timestamp:
+                # Fell behind the camera: restart the schedule instead of bursting
+                next_due = timestamp + self.period
+            self._remember(frame_no, timestamp)
+            yield frame_no, frame
+
+
+class Backoff:
+    """Exponential reconnect delays: `initial`, doubling up to `maximum`."""
+
+    def __init__(self, initial: float = 1.0, maximum: float = 60.0):
+        self.initial = initial
+        self.maximum = maximum
+        self._delay = initial
+
+    def next(self) -> float:
+        delay = self._delay
+        self._delay = min(self._delay * 2, self.maximum)
+        return delay
+
+    def reset(self) -> None:
+        self._delay = self.initial
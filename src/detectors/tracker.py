@@ -0,0 +1,175 @@
+# src/detectors/tracker.py
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple
+
+Box = Tuple[float, float, float, float]
+
+
+def _box(bbox: Dict[str, Any]) -> Box:
+    return bbox["x1"], bbox["y1"], bbox["x2"], bbox["y2"]
+
+
+def iou(a: Box, b: Box) -> float:
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    if inter <= 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return inter / (area_a + area_b - inter)
+
+
+def centroid_distance(a: Box, b: Box) -> float:
+    """Distance between box centres, in widths of box `a`."""
+    ax, ay = (a[0] + a[2]) / 2, (a[1] + a[3]) / 2
+    bx, by = (b[0] + b[2]) / 2, (b[1] + b[3]) / 2
+    width = max(1.0, a[2] - a[0])
+    return ((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5 / width
+
+
+@dataclass(eq=False)
+class Track:
+    track_id: int
+    first_frame: int
+    last_frame: int
+    box: Box
+    best: Dict[str, Any]
+    votes: Dict[str, float] = field(default_factory=dict)
+    texts: Dict[str, Tuple[str, float]] = field(default_factory=dict)
+    hits: int = 0
+
+    def add(self, detection: Dict[str, Any]) -> None:
+        self.last_frame = detection["frame_no"]
+        self.box = _box(detection["bbox"])
+        self.hits += 1
+        if detection["confidence"] > self.best["confidence"]:
+            self.best = detection
+
+        # Confidence-weighted vote on the normalised text; remember the most
+        # confident raw reading of each candidate for the emitted event.
+        normalized = detection["normalized_plate"]
+        self.votes[normalized] = self.votes.get(normalized, 0.0) + detection["confidence"]
+        raw = self.texts.get(normalized)
+        if raw is None or detection["confidence"] > raw[1]:
+            self.texts[normalized] = (detection["plate"], detection["confidence"])
+
+    def to_event(self) -> Dict[str, Any]:
+        normalized = max(self.votes, key=self.votes.get)
+        event = dict(self.best)
+        event["plate"] = self.texts[normalized][0]
+        event["normalized_plate"] = normalized
+        event["first_frame_no"] = self.first_frame
+        event["last_frame_no"] = self.last_frame
+        event["track_hits"] = self.hits
+        return event
+
+
+class PlateTracker:
+    """Links plate detections across sampled frames into tracks.
+
+    Detections are matched to open tracks greedily by IoU, falling back to
+    centroid distance for fast-moving vehicles. A track that has not been
+    seen for more than `max_gap` frames is closed and emitted as a single
+    event: the most confident detection (crop, bbox, frame), with the plate
+    text chosen by confidence-weighted vote and the track's first/last
+    frame numbers.
+    """
+
+    def __init__(
+        self,
+        max_gap: int,
+        iou_threshold: float = 0.3,
+        max_centroid_distance: float = 1.5,
+    ):
+        self.max_gap = max_gap
+        self.iou_threshold = iou_threshold
+        self.max_centroid_distance = max_centroid_distance
+        self._tracks: List[Track] = []
+        self._next_id = 0
+
+    @property
+    def open_tracks(self) -> int:
+        return len(self._tracks)
+
+    def oldest_open_frame(self) -> Optional[int]:
+        if not self._tracks:
+            return None
+        return min(track.first_frame for track in self._tracks)
+
+    def update(self, frame_no: int, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add one frame's detections; return events for tracks that closed."""
+        closed = self.expire(frame_no)
+
+        candidates = []
+        for t, track in enumerate(self._tracks):
+            for d, detection in enumerate(detections):
+                box = _box(detection["bbox"])
+                overlap = iou(track.box, box)
+                distance = centroid_distance(track.box, box)
+                if overlap >= self.iou_threshold or distance <= self.max_centroid_distance:
+                    candidates.append((-overlap, distance, t, d))
+
+        matched_tracks, matched_detections = set(), set()
+        for _, _, t, d in sorted(candidates):
+            if t in matched_tracks or d in matched_detections:
+                continue
+            self._tracks[t].add(detections[d])
+            matched_tracks.add(t)
+            matched_detections.add(d)
+
+        for d, detection in enumerate(detections):
+            if d not in matched_detections:
+                self._start(detection)
+
+        return closed
+
+    def expire(self, frame_no: int) -> List[Dict[str, Any]]:
+        """Close tracks last seen more than `max_gap` frames before `frame_no`."""
+        closed = [t for t in self._tracks if frame_no - t.last_frame > self.max_gap]
+        if closed:
+            self._tracks = [t for t in self._tracks if t not in closed]
+        return [track.to_event() for track in sorted(closed, key=lambda t: t.first_frame)]
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Close every open track (end of video)."""
+        closed, self._tracks = self._tracks, []
+        return [track.to_event() for track in sorted(closed, key=lambda t: t.first_frame)]
+
+    def _start(self, detection: Dict[str, Any]) -> None:
+        track = Track(
+            track_id=self._next_id,
+            first_frame=detection["frame_no"],
+            last_frame=detection["frame_no"],
+            box=_box(detection["bbox"]),
+            best=detection,
+        )
+        track.add(detection)
+        self._tracks.append(track)
+        self._next_id += 1
+
+
+def track_detections(
+    batches: Iterable[Tuple[int, List[Dict[str, Any]]]], tracker: PlateTracker
+) -> Generator[Dict[str, Any], None, None]:
+    """Collapse a stream of per-batch detections into one event per track.
+
+    `batches` yields `(last_frame_no, detections)` in frame order, where
+    `last_frame_no` is the last sampled frame of the batch (so tracks can
+    expire across batches without detections).
+    """
+    for last_frame, detections in batches:
+        yield from track_batch(tracker, last_frame, detections)
+    yield from tracker.flush()
+
+
+def track_batch(
+    tracker: PlateTracker, last_frame: int, detections: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Feed one batch to the tracker; return events for the tracks it closed."""
+    events = []
+    for frame_no, group in itertools.groupby(detections, key=lambda d: d["frame_no"]):
+        events.extend(tracker.update(frame_no, list(group)))
+    events.extend(tracker.expire(last_frame))
+    return events
@@ -2,43 +2,125 @@
 import os
 import re
 import cv2
-import time
-import torch
-import shutil
+import threading
+import queue
 import numpy as np
-from pathlib import Path
-from typing import Dict, List, Generator, Any
-from ultralytics import YOLO
-import easyocr
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+try:
+    import torch
+except ImportError:  # ONNX-only workers (DETECTOR_BACKEND=onnx, OCR_BACKEND=crnn)
+    torch = None
+
+from src.detectors.ocr_cache import OcrCache
+from src.detectors.recognizers import create_recognizer
+from src.detectors.registry import DetectorPlugin
 
 # Configuration via env (override in .env or docker-compose)
 YOLO_MODEL = os.getenv("YOLO_MODEL", "keremberke/yolov8n-license-plate")
+# "torch" (ultralytics) or "onnx" (ONNX Runtime on CPU, see onnx_backend.py)
+DETECTOR_BACKEND = os.getenv("DETECTOR_BACKEND", "torch")
+ONNX_MODEL = os.getenv("ONNX_MODEL", "")  # exported model; empty = export YOLO_MODEL
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "/tmp/anpr_models")
+# Quantize weights to int8 (the exported or the given ONNX_MODEL) into ONNX_MODEL_DIR
+ONNX_INT8 = os.getenv("ONNX_INT8", "false").lower() in ("1", "true", "yes")
 CONFIDENCE_THRESHOLD = float(os.getenv("DETECT_CONFIDENCE", "0.30"))
-FRAME_SKIP = int(os.getenv("FRAME_SKIP", "10"))
 RESIZE_WIDTH = int(os.getenv("RESIZE_WIDTH", "640"))
-DEVICE = os.getenv("DEVICE", "cuda" if torch.cuda.is_available() else "cpu")
-CROP_DIR = Path(os.getenv("DETECTOR_CROP_DIR", "/tmp/anpr_crops"))
+# "two_stage": detect on the RESIZE_WIDTH frame, OCR the full-resolution crop.
+# "single": detect and OCR on the resized frame (boxes are in source pixels either way).
+DETECTION_MODE = os.getenv("DETECTION_MODE", "two_stage")
+TWO_STAGE = DETECTION_MODE == "two_stage"
+DEVICE = os.getenv("DEVICE", "cuda" if torch is not None and torch.cuda.is_available() else "cpu")
 MIN_BOX_WIDTH = int(os.getenv("MIN_BOX_WIDTH", "20"))
 MIN_BOX_HEIGHT = int(os.getenv("MIN_BOX_HEIGHT", "10"))
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", "0"))  # 0 = torch default
+# "easyocr" or "crnn" (CTC model on ONNX Runtime, see recognizers.py)
+OCR_BACKEND = os.getenv("OCR_BACKEND", "easyocr")
+# Reuse readings of near-identical crops (dHash within OCR_CACHE_MAX_DISTANCE bits)
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "4096"))
+OCR_CACHE_MAX_DISTANCE = int(os.getenv("OCR_CACHE_MAX_DISTANCE", "4"))
+OCR_CACHE_REDIS_URL = os.getenv("OCR_CACHE_REDIS_URL", "")  # empty = in-process only
+OCR_CACHE_TTL = int(os.getenv("OCR_CACHE_TTL", "86400"))
+
+# Initialize models lazily so worker import stays fast. Ultralytics and
+# EasyOCR models are not safe to share between threads, so each inference
+# thread checks a (detector, recognizer) pair out of this pool; new pairs
+# are only loaded when every existing one is busy.
+_model_pool: "queue.SimpleQueue" = queue.SimpleQueue()
+_local = threading.local()
+_ocr_cache: Optional[OcrCache] = None
+
+
+def _get_ocr_cache() -> Optional[OcrCache]:
+    global _ocr_cache
+    if OCR_CACHE_ENABLED and _ocr_cache is None:
+        redis_client = None
+        if OCR_CACHE_REDIS_URL:
+            import redis
+
+            redis_client = redis.Redis.from_url(OCR_CACHE_REDIS_URL, socket_timeout=0.5)
+        _ocr_cache = OcrCache(
+            max_entries=OCR_CACHE_SIZE,
+            max_distance=OCR_CACHE_MAX_DISTANCE,
+            redis_client=redis_client,
+            ttl=OCR_CACHE_TTL,
+        )
+    return _ocr_cache
+
+
+def _load_models():
+    if torch is not None and DEVICE == "cpu" and TORCH_THREADS > 0:
+        torch.set_num_threads(TORCH_THREADS)
+    if DETECTOR_BACKEND == "onnx":
+        from src.detectors.onnx_backend import load_detector
+
+        yolo_model = load_detector(
+            YOLO_MODEL, ONNX_MODEL or None, ONNX_MODEL_DIR,
+            imgsz=RESIZE_WIDTH, int8=ONNX_INT8, threads=TORCH_THREADS,
+        )
+    else:
+        from ultralytics import YOLO
+
+        # ultralytics model will accept device argument on call; keep model ready
+        yolo_model = YOLO(YOLO_MODEL)
+    recognizer = create_recognizer(OCR_BACKEND, gpu=(DEVICE == 'cuda'), threads=TORCH_THREADS)
+    return yolo_model, recognizer
 
-os.makedirs(CROP_DIR, exist_ok=True)
 
-# Initialize models lazily so worker import stays fast
-_yolo_model = None
-_ocr_reader = None
+@contextmanager
+def _models():
+    try:
+        models = _model_pool.get_nowait()
+    except queue.Empty:
+        models = _load_models()
+    try:
+        yield models
+    finally:
+        _model_pool.put(models)
+
 
 def _init_models():
-    global _yolo_model, _ocr_reader
-    if _yolo_model is None:
-        _yolo_model = YOLO(YOLO_MODEL)
-        # ultralytics model will accept device argument on call; keep model ready
-    if _ocr_reader is None:
-        _ocr_reader = easyocr.Reader(['en'], gpu=(DEVICE == 'cuda'))
+    # Warm the pool so the first batch does not pay the model load
+    with _models():
+        pass
+    _get_ocr_cache()
+
+
+def _clahe():
+    # CLAHE objects are not thread-safe, so keep one per detection thread
+    clahe = getattr(_local, "clahe", None)
+    if clahe is None:
+        clahe = _local.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+    return clahe
+
 
 def _clean_plate_text(text: str) -> str:
     # Normalize plate text: uppercase, remove non-alphanum
     return re.sub(r'[^A-Z0-9]', '', text.upper())
 
+
 def _pad_bbox(x1, y1, x2, y2, pad_px, w, h):
     x1p = max(0, x1 - pad_px)
     y1p = max(0, y1 - pad_px)
@@ -46,95 +128,117 @@ def _pad_bbox(x1, y1, x2, y2, pad_px, w, h):
     y2p = min(h - 1, y2 + pad_px)
     return x1p, y1p, x2p, y2p
 
-def process_video(video_path: str, camera_id: str = None) -> Generator[Dict[str, Any], None, None]:
-    """
-    Process a video file and yield detection dicts.
-    Each yielded dict should include keys:
-      - plate (str)
-      - normalized_plate (str)
-      - confidence (float)
-      - bbox (dict x1,y1,x2,y2)
-      - frame_no (int)
-      - captured_at (float) # seconds since start of file
-      - crop_path (str) local path saved to disk (worker will upload)
-    """
-    _init_models()
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise RuntimeError(f"Could not open video: {video_path}")
 
-    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
-    frame_no = 0
-    saved = 0
-    start_time = time.time()
+def _detect_boxes(yolo_model, frames: List[np.ndarray]) -> List[List[Tuple[int, int, int, int]]]:
+    """Run one YOLO call over a batch of equally sized frames.
 
-    try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            frame_no += 1
-            if frame_no % FRAME_SKIP != 0:
+    Returns the plate boxes (x1, y1, x2, y2) of each frame, in input order.
+    """
+    # Size the network input to the frames (a multiple of the model stride)
+    # so ROI crops are not upscaled back to a full-frame input.
+    imgsz = max(32, -(-max(frames[0].shape[:2]) // 32) * 32)
+    if DETECTOR_BACKEND == "onnx":
+        raw = [
+            r[:, :4] for r in yolo_model.predict_boxes(frames, conf=CONFIDENCE_THRESHOLD, imgsz=imgsz)
+        ]
+    else:
+        results = yolo_model(frames, conf=CONFIDENCE_THRESHOLD, imgsz=imgsz, device=DEVICE, verbose=False)
+        raw = []
+        for r in results:
+            # r.boxes may be ultralytics objects. Normalize access:
+            raw.append([
+                box.xyxy.cpu().numpy().flatten() if hasattr(box.xyxy, "cpu") else np.array(box.xyxy).flatten()
+                for box in getattr(r, "boxes", [])
+            ])
+
+    boxes_per_frame = []
+    for frame_boxes in raw:
+        boxes = []
+        for xy in frame_boxes:
+            x1, y1, x2, y2 = map(int, xy.tolist())
+            if x2 - x1 < MIN_BOX_WIDTH or y2 - y1 < MIN_BOX_HEIGHT:
                 continue
+            boxes.append((x1, y1, x2, y2))
+        boxes_per_frame.append(boxes)
+    return boxes_per_frame
 
-            # Resize preserving aspect ratio
-            h, w = frame.shape[:2]
-            new_h = int(h * (RESIZE_WIDTH / w))
-            resized = cv2.resize(frame, (RESIZE_WIDTH, new_h))
-
-            # Run detection (pass device and conf)
-            results = _yolo_model(resized, conf=CONFIDENCE_THRESHOLD, device=DEVICE)
-
-            for r in results:
-                # r.boxes may be ultralytics objects. Normalize access:
-                for box in getattr(r, "boxes", []):
-                    xy = box.xyxy.cpu().numpy().flatten() if hasattr(box.xyxy, "cpu") else np.array(box.xyxy).flatten()
-                    x1, y1, x2, y2 = map(int, xy.tolist())
-                    bw = x2 - x1
-                    bh = y2 - y1
-                    if bw < MIN_BOX_WIDTH or bh < MIN_BOX_HEIGHT:
-                        continue
-
-                    # pad crop
-                    x1p, y1p, x2p, y2p = _pad_bbox(x1, y1, x2, y2, pad_px=6, w=resized.shape[1], h=resized.shape[0])
-                    crop = resized[y1p:y2p, x1p:x2p]
-                    if crop.size == 0:
-                        continue
-
-                    # Preprocess for OCR
-                    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
-                    # Optional: CLAHE
-                    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-                    gray_eq = clahe.apply(gray)
-
-                    # OCR (easyocr returns list of tuples)
-                    ocr_results = _ocr_reader.readtext(gray_eq)
-                    if not ocr_results:
-                        continue
-
-                    # take best result (highest prob)
-                    best = max(ocr_results, key=lambda r: r[2])
-                    text = best[1]
-                    prob = float(best[2])
-
-                    cleaned = _clean_plate_text(text)
-                    timestamp_sec = frame_no / fps
-
-                    # Save crop for audit / labeling
-                    crop_name = f"{Path(video_path).stem}_f{frame_no}_c{saved}.jpg"
-                    crop_path = str(CROP_DIR / crop_name)
-                    cv2.imwrite(crop_path, crop)
-                    saved += 1
-
-                    yield {
-                        "plate": text,
-                        "normalized_plate": cleaned,
-                        "confidence": prob,
-                        "bbox": {"x1": int(x1), "y1": int(y1), "x2": int(x2), "y2": int(y2)},
-                        "frame_no": int(frame_no),
-                        "captured_at": float(timestamp_sec),
-                        "crop_path": crop_path,
-                        "camera_id": camera_id,
-                    }
-    finally:
-        cap.release()
+
+def _resize(frame: np.ndarray, scale: float) -> np.ndarray:
+    # Resize preserving aspect ratio
+    h, w = frame.shape[:2]
+    return cv2.resize(frame, (max(1, round(w * scale)), max(1, round(h * scale))))
+
+
+class YoloEasyOcrDetector(DetectorPlugin):
+    """YOLO plate localisation followed by plate OCR.
+
+    `prepare` shrinks each frame to at most RESIZE_WIDTH pixels wide on the
+    decoder thread. YOLO runs once per batch on the small frames; boxes are
+    scaled back to the frame given to `prepare`. In the default two-stage
+    DETECTION_MODE the plate is then cropped from that full-resolution
+    frame for OCR, otherwise from the small frame. All crops of a batch go
+    to the recognizer (through the OCR cache) in one call.
+    """
+
+    name = "yolo_easyocr"
+
+    def load(self) -> None:
+        _init_models()
+
+    def prepare(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+        scale = min(1.0, RESIZE_WIDTH / frame.shape[1])
+        small = _resize(frame, scale) if scale < 1.0 else frame
+        return small, frame, scale
+
+    def detect_batch(
+        self, frames: Sequence[Tuple[int, Tuple[np.ndarray, np.ndarray, float]]]
+    ) -> List[Dict[str, Any]]:
+        with _models() as (yolo_model, _):
+            boxes_per_frame = _detect_boxes(yolo_model, [small for _, (small, _, _) in frames])
+
+        candidates = []
+        for (frame_no, (small, source, scale)), boxes in zip(frames, boxes_per_frame, strict=True):
+            # Two-stage: read the plate from the source frame, else from the small one
+            image, crop_scale = (source, 1 / scale) if TWO_STAGE else (small, 1.0)
+            h, w = image.shape[:2]
+            pad_px = max(1, round(6 * crop_scale))
+            for box in boxes:
+                x1, y1, x2, y2 = (round(v * crop_scale) for v in box)
+                # pad crop
+                x1p, y1p, x2p, y2p = _pad_bbox(x1, y1, x2, y2, pad_px=pad_px, w=w, h=h)
+                if y2p <= y1p or x2p <= x1p:
+                    continue
+                # Copied so the detection does not keep the whole source frame alive
+                crop = image[y1p:y2p, x1p:x2p].copy()
+                # Boxes are always reported in source-frame pixels
+                bbox = {
+                    k: int(round(v / scale)) for k, v in zip(("x1", "y1", "x2", "y2"), box, strict=True)
+                }
+                candidates.append((frame_no, bbox, crop))
+
+        if not candidates:
+            return []
+
+        # Preprocess for OCR
+        grays = [_clahe().apply(cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)) for _, _, crop in candidates]
+        cache = _get_ocr_cache()
+        with _models() as (_, recognizer):
+            if cache is not None:
+                ocr_results = cache.recognize(recognizer.version, grays, recognizer.recognize)
+            else:
+                ocr_results = recognizer.recognize(grays)
+
+        detections = []
+        for (frame_no, bbox, crop), ocr in zip(candidates, ocr_results, strict=True):
+            if ocr is None:
+                continue
+            text, prob = ocr
+            detections.append({
+                "plate": text,
+                "normalized_plate": _clean_plate_text(text),
+                "confidence": prob,
+                "bbox": bbox,
+                "frame_no": int(frame_no),
+                "crop": crop,
+            })
+        return detections
@@ -7,6 +7,7 @@ from prometheus_client import make_asgi_app
 from src.config import settings
 from src.logging_config import setup_logging, get_logger
 from src.services.queue import queue_service
+from src.services.http import close_http_client
 
 from src.api import auth, users, cameras, uploads, jobs, events, feedback, bolos, licenses, admin
 
@@ -19,6 +20,7 @@ async def lifespan(app: FastAPI):
     logger.info("Starting ANPR City API", mode=settings.MODE)
     await queue_service.connect()
     yield
+    await close_http_client()
     await queue_service.disconnect()
     logger.info("ANPR City API shutdown")
 
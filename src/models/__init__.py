@@ -1,6 +1,6 @@
 from src.models.user import User
 from src.models.camera import Camera
-from src.models.upload import Upload
+from src.models.upload import Upload, UploadSegment
 from src.models.event import Event, Correction
 from src.models.bolo import BOLO, BOLOMatch
 from src.models.license import License, UsageReport
@@ -11,6 +11,7 @@ __all__ = [
     "User",
     "Camera",
     "Upload",
+    "UploadSegment",
     "Event",
     "Correction",
     "BOLO",
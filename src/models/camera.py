@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import String, Float, Boolean, DateTime, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.database import Base
@@ -22,6 +22,12 @@ class Camera(Base):
     heading: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     rtsp_url: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     active: Mapped[bool] = mapped_column(Boolean, default=True)
+    motion_sensitivity: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Bounds for adaptive frame sampling; NULL uses SAMPLING_MIN_FPS / FRAME_EXTRACTION_FPS
+    min_sampling_fps: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    max_sampling_fps: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Detection regions, normalised to 0..1; see src/schemas/camera.py:CameraRoi
+    roi: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -3,7 +3,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import String, Float, DateTime, Enum as SQLEnum, ForeignKey, Text, Integer
+from sqlalchemy import String, Float, DateTime, Enum as SQLEnum, ForeignKey, Text, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -19,6 +19,10 @@ class ReviewState(str, Enum):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # One event per detection: retried and resumed jobs re-insert the same rows
+        Index("events_upload_frame_bbox_key", "upload_id", "frame_no", "bbox", unique=True),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -33,7 +37,11 @@ class Event(Base):
     normalized_plate: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
     confidence: Mapped[float] = mapped_column(Float, nullable=False)
     bbox: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    # "source" (video pixels); NULL for rows written before it was recorded
+    bbox_space: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
     frame_no: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_frame_no: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    last_frame_no: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     captured_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     crop_path: Mapped[str] = mapped_column(Text, nullable=False)
     review_state: Mapped[ReviewState] = mapped_column(
@@ -3,7 +3,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import String, DateTime, Enum as SQLEnum, ForeignKey, Text, Integer
+from sqlalchemy import String, DateTime, Enum as SQLEnum, ForeignKey, Text, Integer, Float
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -17,6 +17,12 @@ class UploadStatus(str, Enum):
     FAILED = "failed"
 
 
+class UploadPriority(str, Enum):
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
 class Upload(Base):
     __tablename__ = "uploads"
 
@@ -27,8 +33,9 @@ class Upload(Base):
     camera_id: Mapped[Optional[uuid.UUID]] = mapped_column(
         UUID(as_uuid=True), ForeignKey("cameras.id"), nullable=True
     )
-    uploaded_by: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
+    # NULL for live stream sessions, which have no uploader
+    uploaded_by: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=True
     )
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
     storage_path: Mapped[str] = mapped_column(Text, nullable=False)
@@ -36,12 +43,37 @@ class Upload(Base):
     status: Mapped[UploadStatus] = mapped_column(
         SQLEnum(UploadStatus, name="upload_status"), default=UploadStatus.QUEUED
     )
+    priority: Mapped[UploadPriority] = mapped_column(
+        SQLEnum(UploadPriority, name="upload_priority"), default=UploadPriority.NORMAL
+    )
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     meta_data: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
     events_detected: Mapped[int] = mapped_column(Integer, default=0)
+    sampling_fps: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    segments_total: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    segments_done: Mapped[int] = mapped_column(Integer, default=0)
+    segments_failed: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
     def __repr__(self) -> str:
         return f"<Upload {self.job_id} - {self.status}>"
+
+
+class UploadSegment(Base):
+    """The result of one finished segment of a segmented upload.
+
+    Keyed by upload and segment index, so a segment delivered twice is only
+    merged into its upload once.
+    """
+
+    __tablename__ = "upload_segments"
+
+    upload_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("uploads.id", ondelete="CASCADE"), primary_key=True
+    )
+    segment: Mapped[int] = mapped_column(Integer, primary_key=True)
+    events_detected: Mapped[int] = mapped_column(Integer, default=0)
+    error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    completed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
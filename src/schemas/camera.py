@@ -1,11 +1,28 @@
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Literal, Optional, Union
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
+Coordinate = Annotated[float, Field(ge=0.0, le=1.0)]
 
-class CameraCreate(BaseModel):
+
+def check_sampling_bounds(min_fps: Optional[float], max_fps: Optional[float]) -> None:
+    if min_fps is not None and max_fps is not None and min_fps > max_fps:
+        raise ValueError("min_sampling_fps must not exceed max_sampling_fps")
+
+
+class SamplingBounds(BaseModel):
+    min_sampling_fps: Optional[float] = Field(default=None, gt=0.0)
+    max_sampling_fps: Optional[float] = Field(default=None, gt=0.0)
+
+    @model_validator(mode="after")
+    def check_sampling_bounds(self):
+        check_sampling_bounds(self.min_sampling_fps, self.max_sampling_fps)
+        return self
+
+
+class CameraCreate(SamplingBounds):
     name: str
     description: Optional[str] = None
     lat: float
@@ -13,9 +30,12 @@ class CameraCreate(BaseModel):
     heading: Optional[float] = None
     rtsp_url: Optional[str] = None
     active: bool = True
+    motion_sensitivity: Optional[float] = Field(default=None, ge=0.0, le=1.0)
 
 
-class CameraUpdate(BaseModel):
+class CameraUpdate(SamplingBounds):
+    """Partial update; the handler also checks sampling bounds against the stored camera."""
+
     name: Optional[str] = None
     description: Optional[str] = None
     lat: Optional[float] = None
@@ -23,6 +43,7 @@ class CameraUpdate(BaseModel):
     heading: Optional[float] = None
     rtsp_url: Optional[str] = None
     active: Optional[bool] = None
+    motion_sensitivity: Optional[float] = Field(default=None, ge=0.0, le=1.0)
 
 
 class CameraResponse(BaseModel):
@@ -34,7 +55,38 @@ class CameraResponse(BaseModel):
     heading: Optional[float]
     rtsp_url: Optional[str]
     active: bool
+    motion_sensitivity: Optional[float] = None
+    min_sampling_fps: Optional[float] = None
+    max_sampling_fps: Optional[float] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class RoiRect(BaseModel):
+    type: Literal["rect"] = "rect"
+    x1: Coordinate
+    y1: Coordinate
+    x2: Coordinate
+    y2: Coordinate
+
+    @model_validator(mode="after")
+    def check_extent(self) -> "RoiRect":
+        if self.x2 <= self.x1 or self.y2 <= self.y1:
+            raise ValueError("x2/y2 must be greater than x1/y1")
+        return self
+
+
+class RoiPolygon(BaseModel):
+    type: Literal["polygon"] = "polygon"
+    points: list[tuple[Coordinate, Coordinate]] = Field(min_length=3)
+
+
+class CameraRoi(BaseModel):
+    """Regions of the frame, normalised to 0..1, where plates can appear.
+
+    An empty list means the whole frame is searched.
+    """
+
+    regions: list[Annotated[Union[RoiRect, RoiPolygon], Field(discriminator="type")]] = []
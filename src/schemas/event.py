@@ -21,8 +21,11 @@ class EventResponse(BaseModel):
     confidence: float
     camera_id: UUID
     bbox: dict
+    bbox_space: Optional[str] = None
     captured_at: datetime
     frame_no: int
+    first_frame_no: Optional[int] = None
+    last_frame_no: Optional[int] = None
     crop_path: str
     review_state: ReviewState
     created_at: datetime
@@ -1,14 +1,21 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel
 
-from src.models.upload import UploadStatus
+from src.models.upload import UploadPriority, UploadStatus
 
 
 class UploadJobResponse(BaseModel):
     job_id: str
     status: UploadStatus
+    priority: UploadPriority = UploadPriority.NORMAL
     created_at: datetime
+    summary: Optional[dict] = None
+    sampling_fps: Optional[float] = None
+    segments_total: Optional[int] = None
+    segments_done: Optional[int] = None
+    eta_seconds: Optional[float] = None
 
     class Config:
         from_attributes = True
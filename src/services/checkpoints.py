@@ -0,0 +1,151 @@
+import json
+import time
+from typing import Any, Optional
+
+from src.config import settings
+from src.logging_config import get_logger
+from src.services.queue import queue_service
+
+logger = get_logger(__name__)
+
+CHECKPOINT_PREFIX = "checkpoint:"
+# Outside CHECKPOINT_PREFIX so scans for checkpoint hashes do not see it
+REQUEUED_PREFIX = "checkpoint-requeued:"
+
+
+class CheckpointStore:
+    """Per-job progress in Redis, so a job cut short can resume.
+
+    Each running job has a hash `checkpoint:<job_id>` holding its queue
+    payload, `frame` (the frame to resume from: every event for a vehicle
+    first seen earlier is committed), `events` (how many of those events
+    there are) and `updated_at`. The hash is created when the job starts
+    and deleted when it finishes or fails. While the job runs, `heartbeat`
+    refreshes `updated_at` whatever the job is doing (downloading, probing,
+    long stretches without detections); one left behind with a stale
+    `updated_at` belongs to a job whose worker died.
+    """
+
+    def __init__(self, redis_client=None):
+        self._redis = redis_client
+        self._active: set[str] = set()
+
+    @property
+    def redis(self):
+        redis = self._redis or queue_service.redis
+        if redis is None:
+            raise RuntimeError("Redis not connected")
+        return redis
+
+    @staticmethod
+    def key(job_id: str) -> str:
+        return f"{CHECKPOINT_PREFIX}{job_id}"
+
+    async def begin(self, job_data: dict) -> Optional[dict[str, int]]:
+        """Register a starting job; return where it should resume from.
+
+        Returns None for a requeued job (`resume` set) whose checkpoint is
+        gone: it finished in the meantime and must not run again.
+        """
+        key = self.key(job_data["job_id"])
+        now = time.time()
+        # A requeued job has been picked up, so a later stall may requeue it again
+        await self.redis.delete(self.requeued_key(job_data["job_id"]))
+        existing = await self.redis.hgetall(key)
+        if existing and "frame" in existing:
+            await self.redis.hset(key, mapping={"updated_at": now})
+            checkpoint = {"frame": int(existing["frame"]), "events": int(existing["events"])}
+        elif job_data.get("resume"):
+            return None
+        else:
+            checkpoint = {"frame": job_data.get("start_frame") or 0, "events": 0}
+            await self.redis.hset(
+                key,
+                mapping={"payload": json.dumps(job_data), **checkpoint, "updated_at": now},
+            )
+        await self.redis.expire(key, settings.CHECKPOINT_TTL_SECONDS)
+        self._active.add(job_data["job_id"])
+        return checkpoint
+
+    async def save(self, job_id: str, frame: int, events: int) -> None:
+        await self.redis.hset(
+            self.key(job_id),
+            mapping={"frame": frame, "events": events, "updated_at": time.time()},
+        )
+
+    async def heartbeat(self) -> None:
+        """Mark every job this process is running as alive."""
+        now = time.time()
+        for job_id in list(self._active):
+            key = self.key(job_id)
+            if await self.redis.hexists(key, "payload"):
+                await self.redis.hset(key, mapping={"updated_at": now})
+            else:
+                self._active.discard(job_id)
+
+    async def clear(self, job_id: str) -> None:
+        self._active.discard(job_id)
+        await self.redis.delete(self.key(job_id))
+
+    async def stalled(self, max_age: float) -> list[dict[str, Any]]:
+        """Payloads of jobs whose checkpoint has not moved for `max_age` seconds."""
+        cutoff = time.time() - max_age
+        payloads = []
+        async for key in self.redis.scan_iter(match=f"{CHECKPOINT_PREFIX}*"):
+            fields = await self.redis.hmget(key, ["payload", "updated_at"])
+            payload, updated_at = fields
+            if payload and updated_at and float(updated_at) < cutoff:
+                payloads.append(json.loads(payload))
+        return payloads
+
+    @staticmethod
+    def requeued_key(job_id: str) -> str:
+        return f"{REQUEUED_PREFIX}{job_id}"
+
+    async def claim(self, job_id: str) -> bool:
+        """Take the right to requeue a stalled job, so only one worker does.
+
+        The claim holds until the requeued job starts (`begin`), however
+        long it waits in the queue, so a waiting job is not requeued twice.
+        """
+        return bool(
+            await self.redis.set(
+                self.requeued_key(job_id), 1, nx=True, ex=settings.CHECKPOINT_TTL_SECONDS
+            )
+        )
+
+
+class JobProgress:
+    """Tracks what a running job can checkpoint.
+
+    Rows are reported with `written` once handed to the event writer; at a
+    checkpoint (after the writer has flushed) the rows for vehicles first
+    seen before the checkpoint frame are added to the saved event count.
+    """
+
+    def __init__(self, store: CheckpointStore, job_id: str, frame: int, events: int):
+        self.store = store
+        self.job_id = job_id
+        self.frame = frame
+        self.events = events
+        self._pending: list[int] = []
+        self._saved_at = time.monotonic()
+
+    def written(self, row: dict[str, Any]) -> None:
+        first_frame = row.get("first_frame_no")
+        self._pending.append(row["frame_no"] if first_frame is None else first_frame)
+
+    def due(self) -> bool:
+        return time.monotonic() - self._saved_at >= settings.CHECKPOINT_INTERVAL_SECONDS
+
+    async def save(self, frame: int) -> None:
+        frame = max(frame, self.frame)
+        self.events += sum(1 for first in self._pending if first < frame)
+        self._pending = [first for first in self._pending if first >= frame]
+        self.frame = frame
+        self._saved_at = time.monotonic()
+        await self.store.save(self.job_id, frame, self.events)
+        logger.info("Job checkpointed", job_id=self.job_id, frame=frame, events=self.events)
+
+
+checkpoint_store = CheckpointStore()
@@ -0,0 +1,107 @@
+import asyncio
+from io import BytesIO
+from typing import Any, Optional
+
+import cv2
+
+from src.config import settings
+from src.logging_config import get_logger
+from src.services.storage import StorageService
+
+logger = get_logger(__name__)
+
+
+def encode_jpeg(crop) -> bytes:
+    ok, buffer = cv2.imencode('.jpg', crop)
+    if not ok:
+        raise ValueError("Failed to encode crop as JPEG")
+    return buffer.tobytes()
+
+
+class CropUploader:
+    """Uploads crops concurrently while detection keeps running.
+
+    At most `concurrency` uploads are in flight; `submit` waits for a free
+    slot, which throttles the detection stream when storage falls behind.
+    Each crop is retried with exponential backoff. Finished uploads are
+    collected with `completed()` or `drain()` as `(payload, error)` pairs,
+    so callers only persist rows whose crop is confirmed in storage.
+    """
+
+    def __init__(
+        self,
+        storage: StorageService,
+        bucket: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        retries: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+    ):
+        self.storage = storage
+        self.bucket = bucket or settings.STORAGE_CROPS_BUCKET
+        self.retries = settings.CROP_UPLOAD_RETRIES if retries is None else retries
+        self.retry_backoff = (
+            settings.CROP_UPLOAD_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+        )
+        self._slots = asyncio.Semaphore(concurrency or settings.CROP_UPLOAD_CONCURRENCY)
+        self._pending: dict[asyncio.Task, tuple[Any, str]] = {}
+
+    async def __aenter__(self) -> "CropUploader":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            await self.cancel()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, crop, object_name: str, payload: Any = None) -> None:
+        await self._slots.acquire()
+        task = asyncio.create_task(self._upload(crop, object_name))
+        # Released from the callback so a task cancelled before it starts frees its slot too
+        task.add_done_callback(lambda _: self._slots.release())
+        self._pending[task] = (payload, object_name)
+
+    def completed(self) -> list[tuple[Any, Optional[BaseException]]]:
+        done = [task for task in self._pending if task.done()]
+        return [self._outcome(task) for task in done]
+
+    async def drain(self) -> list[tuple[Any, Optional[BaseException]]]:
+        if self._pending:
+            await asyncio.wait(set(self._pending))
+        return self.completed()
+
+    async def cancel(self) -> None:
+        for task in self._pending:
+            task.cancel()
+        await asyncio.gather(*self._pending, return_exceptions=True)
+        self._pending.clear()
+
+    def _outcome(self, task: asyncio.Task) -> tuple[Any, Optional[BaseException]]:
+        payload, object_name = self._pending.pop(task)
+        error = task.exception()
+        if error is not None:
+            logger.error("Crop upload failed", object_name=object_name, error=str(error))
+        return payload, error
+
+    async def _upload(self, crop, object_name: str) -> None:
+        data = await asyncio.to_thread(encode_jpeg, crop)
+        for attempt in range(self.retries + 1):
+            try:
+                await self.storage.upload_file(
+                    BytesIO(data), self.bucket, object_name, "image/jpeg"
+                )
+                return
+            except Exception as e:
+                if attempt >= self.retries:
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning(
+                    "Retrying crop upload",
+                    object_name=object_name,
+                    attempt=attempt + 1,
+                    delay=delay,
+                    error=str(e),
+                )
+                await asyncio.sleep(delay)
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from src.config import settings
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_ITEM = "item"
+_ERROR = "error"
+_DONE = "done"
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_detection_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        workers = settings.DETECTOR_THREADS or settings.WORKER_CONCURRENCY
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="detector")
+        logger.info("Detection executor started", threads=workers)
+    return _executor
+
+
+async def stream_detections(
+    generator_factory: Callable[[], Iterator[Any]],
+    maxsize: Optional[int] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> AsyncIterator[Any]:
+    """Run a blocking detection generator in a worker thread.
+
+    Items are handed to the event loop through a bounded queue: when the
+    consumer falls behind, the producer thread blocks instead of buffering
+    frames in memory. Exceptions raised by the generator are re-raised here.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize or settings.DETECTION_QUEUE_SIZE)
+    cancelled = threading.Event()
+
+    def put(kind: str, payload: Any) -> bool:
+        future = asyncio.run_coroutine_threadsafe(queue.put((kind, payload)), loop)
+        while True:
+            try:
+                future.result(timeout=0.5)
+                return True
+            except FutureTimeoutError:
+                if cancelled.is_set():
+                    future.cancel()
+                    return False
+
+    def produce() -> None:
+        generator = generator_factory()
+        try:
+            for item in generator:
+                if cancelled.is_set() or not put(_ITEM, item):
+                    return
+        except BaseException as e:
+            if not cancelled.is_set():
+                put(_ERROR, e)
+            return
+        finally:
+            close = getattr(generator, "close", None)
+            if close is not None:
+                close()
+        put(_DONE, None)
+
+    producer = loop.run_in_executor(executor or get_detection_executor(), produce)
+    try:
+        while True:
+            kind, payload = await queue.get()
+            if kind == _DONE:
+                break
+            if kind == _ERROR:
+                raise payload
+            yield payload
+    finally:
+        cancelled.set()
+        while not queue.empty():
+            queue.get_nowait()
+        await asyncio.shield(producer)
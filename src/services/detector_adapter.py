@@ -1,91 +1,293 @@
-from typing import Iterator, Dict, Any
-from pathlib import Path
+from typing import Callable, Iterator, Dict, Any, Optional, Sequence
 import cv2
 import re
+import threading
 from datetime import datetime
 
 from src.config import settings
+from src.detectors.motion import MotionGate
+from src.detectors.pipeline import FramePipeline
+from src.detectors.registry import DetectorPlugin, get_detector
+from src.detectors.roi import RegionOfInterest
+from src.detectors.sampling import FrameSampler
+from src.detectors.stream import StreamSampler, connect_stream, redact_url
+from src.detectors.tracker import PlateTracker, track_batch
 from src.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Key of the progress markers process_video(checkpoints=True) yields between detections
+CHECKPOINT_FRAME = "checkpoint_frame"
+
 
 def normalize_plate(plate: str) -> str:
     return re.sub(r'[^A-Z0-9]', '', plate.upper())
 
 
+class FailedBatches:
+    """Counts consecutive failed detection batches, across inference threads."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def failed(self) -> bool:
+        """Record a failure; True once `limit` batches in a row have failed."""
+        with self._lock:
+            self.count += 1
+            return self.count >= self.limit
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.count = 0
+
+
 class DetectorAdapter:
-    def __init__(self, confidence_threshold: float = None):
+    """Runs a detector plugin over a video.
+
+    This is the one video loop: frames are sampled at the job's rate,
+    cropped to the camera's ROI, motion-gated, batched and pipelined
+    through the plugin selected by DETECTOR_PLUGIN, then filtered by
+    confidence and collapsed into per-vehicle events by the tracker.
+    """
+
+    def __init__(
+        self,
+        confidence_threshold: float = None,
+        detector: Optional[DetectorPlugin] = None,
+    ):
         self.confidence_threshold = confidence_threshold or settings.DETECTION_CONFIDENCE_THRESHOLD
+        self._detector = detector
         logger.info("Detector adapter initialized", threshold=self.confidence_threshold)
 
+    @property
+    def detector(self) -> DetectorPlugin:
+        # Resolved lazily so importing the worker does not load model libraries
+        if self._detector is None:
+            self._detector = get_detector(settings.DETECTOR_PLUGIN)
+            self._detector.load()
+        return self._detector
+
     def process_video(
-        self, video_path: str, camera_id: str
+        self,
+        video_path: str,
+        camera_id: str,
+        stats: Optional[Dict[str, Any]] = None,
+        motion_sensitivity: Optional[float] = None,
+        roi: Optional[Sequence[Dict[str, Any]]] = None,
+        start_frame: int = 0,
+        end_frame: Optional[int] = None,
+        sampling_fps: Optional[float] = None,
+        checkpoints: bool = False,
     ) -> Iterator[Dict[str, Any]]:
-        logger.info("Processing video", video_path=video_path, camera_id=camera_id)
+        """Yield detections for the frames in `[start_frame, end_frame)`.
+
+        Frames are sampled at `sampling_fps` (default FRAME_EXTRACTION_FPS).
+        With `checkpoints`, a `{CHECKPOINT_FRAME: n}` marker follows each
+        batch: every detection for a vehicle first seen before frame n has
+        been yielded, so a job restarted with `start_frame=n` loses nothing.
 
+        For a segment of a longer video, decoding starts SEGMENT_OVERLAP_SECONDS
+        early (to settle the motion background and pick up vehicles already in
+        view) and runs as far past `end_frame` (to finish tracks still open
+        there). Only tracks that start inside the range are yielded, so
+        adjacent segments never report the same vehicle twice.
+        """
+        logger.info(
+            "Processing video",
+            video_path=video_path,
+            camera_id=camera_id,
+            start_frame=start_frame,
+            end_frame=end_frame,
+            sampling_fps=sampling_fps,
+        )
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             logger.error("Failed to open video file", video_path=video_path)
             raise ValueError(f"Cannot open video file: {video_path}")
 
         fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_interval = int(fps / settings.FRAME_EXTRACTION_FPS) if fps > 0 else 1
-        frame_no = 0
-        processed = 0
-
+        sampling_fps = sampling_fps or settings.FRAME_EXTRACTION_FPS
+        frame_interval = max(1, int(fps / sampling_fps)) if fps > 0 else 1
+        overlap = int(settings.SEGMENT_OVERLAP_SECONDS * fps) if fps > 0 else 0
+        sampler = FrameSampler(
+            cap,
+            frame_interval,
+            start_frame=max(0, start_frame - overlap) if start_frame > 0 else 0,
+            end_frame=end_frame + overlap if end_frame is not None else None,
+            seek_threshold=settings.FRAME_SEEK_THRESHOLD,
+        )
         try:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                if frame_no % frame_interval == 0:
-                    detections = self._detect_plates_in_frame(frame, frame_no)
+            yield from self._detect(
+                sampler,
+                camera_id,
+                frame_interval,
+                stats,
+                motion_sensitivity,
+                roi,
+                batch_size=settings.WORKER_BATCH_SIZE,
+                owns=lambda first_frame: start_frame <= first_frame
+                and (end_frame is None or first_frame < end_frame),
+                captured_at=lambda frame_no: datetime.utcnow(),
+                progress_from=start_frame if checkpoints else None,
+            )
+        finally:
+            cap.release()
 
-                    for detection in detections:
-                        if detection["confidence"] >= self.confidence_threshold:
-                            detection["camera_id"] = camera_id
-                            detection["captured_at"] = datetime.utcnow()
-                            yield detection
-                            processed += 1
+    def process_stream(
+        self,
+        url: str,
+        camera_id: str,
+        stats: Optional[Dict[str, Any]] = None,
+        motion_sensitivity: Optional[float] = None,
+        roi: Optional[Sequence[Dict[str, Any]]] = None,
+        stop: Optional[threading.Event] = None,
+        capture=None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield detections from a live camera until it drops or `stop` is set.
 
-                frame_no += 1
+        Frames are sampled at FRAME_EXTRACTION_FPS of wall-clock time and
+        detections are stamped with the time their frame was grabbed.
+        Tracks still open when the stream ends are flushed before returning.
+        `capture` is a stream already opened with `connect_stream`; it is
+        released when the stream ends.
+        """
+        logger.info("Attaching to stream", url=redact_url(url), camera_id=camera_id)
 
+        cap = capture if capture is not None else connect_stream(
+            url, timeout=settings.STREAM_TIMEOUT_SECONDS
+        )
+        sampler = StreamSampler(cap, settings.FRAME_EXTRACTION_FPS, stop=stop, camera_id=camera_id)
+        try:
+            yield from self._detect(
+                sampler,
+                camera_id,
+                sampler.interval,
+                stats,
+                motion_sensitivity,
+                roi,
+                batch_size=settings.STREAM_BATCH_SIZE,
+                owns=lambda first_frame: True,
+                captured_at=sampler.captured_at,
+            )
         finally:
             cap.release()
-            logger.info(
-                "Video processing complete",
-                total_frames=frame_no,
-                processed_detections=processed,
+
+    def _detect(
+        self,
+        sampler,
+        camera_id: str,
+        frame_interval: int,
+        stats: Optional[Dict[str, Any]],
+        motion_sensitivity: Optional[float],
+        roi: Optional[Sequence[Dict[str, Any]]],
+        batch_size: int,
+        owns: Callable[[int], bool],
+        captured_at: Callable[[int], datetime],
+        progress_from: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        detector = self.detector
+        frames = sampler
+        region = RegionOfInterest(roi) if roi else None
+        failures = FailedBatches(settings.DETECTION_MAX_FAILED_BATCHES)
+        if region is not None:
+            frames = ((frame_no, region.crop(frame)) for frame_no, frame in frames)
+        gate = None
+        if settings.MOTION_GATE_ENABLED:
+            gate = MotionGate(
+                settings.MOTION_SENSITIVITY if motion_sensitivity is None else motion_sensitivity,
+                camera_id=camera_id,
             )
+            frames = gate.filter(frames)
+        pipeline = FramePipeline(
+            frames,
+            infer=lambda batch: self._detect_plates_in_batch(batch, region, failures),
+            prepare=lambda frame_no, frame: (frame_no, detector.prepare(frame)),
+            batch_size=batch_size,
+            queue_depth=settings.DECODE_QUEUE_DEPTH,
+            consumers=settings.INFERENCE_CONSUMERS,
+        )
+        processed = 0
 
-    def _detect_plates_in_frame(self, frame, frame_no: int) -> list[Dict[str, Any]]:
-        from src.detectors.yolo_easyocr_adapter import detect_plates
+        batches = iter(pipeline)
+        tracker = None
+        if settings.TRACKING_ENABLED:
+            tracker = PlateTracker(
+                max_gap=frame_interval * settings.TRACK_MAX_MISSES,
+                iou_threshold=settings.TRACK_IOU_THRESHOLD,
+            )
+
+        def events() -> Iterator[Dict[str, Any]]:
+            for last_frame, batch in batches:
+                if tracker is None:
+                    yield from batch
+                    safe_frame = last_frame + 1
+                else:
+                    yield from track_batch(tracker, last_frame, batch)
+                    oldest = tracker.oldest_open_frame()
+                    safe_frame = last_frame + 1 if oldest is None else oldest
+                if progress_from is not None:
+                    # Every track starting before safe_frame has been yielded
+                    yield {CHECKPOINT_FRAME: max(progress_from, safe_frame)}
+            if tracker is not None:
+                yield from tracker.flush()
 
         try:
-            results = detect_plates(frame)
-
-            detections = []
-            for result in results:
-                crop = self._extract_crop(frame, result["bbox"])
-
-                detection = {
-                    "plate": result["plate"],
-                    "normalized_plate": normalize_plate(result["plate"]),
-                    "confidence": result["confidence"],
-                    "bbox": result["bbox"],
-                    "frame_no": frame_no,
-                    "crop": crop,
-                }
-                detections.append(detection)
-
-            return detections
+            for detection in events():
+                if CHECKPOINT_FRAME in detection:
+                    yield detection
+                    continue
+                if not owns(detection.get("first_frame_no", detection["frame_no"])):
+                    continue
+                detection["camera_id"] = camera_id
+                detection["captured_at"] = captured_at(detection["frame_no"])
+                yield detection
+                processed += 1
+
+        finally:
+            batches.close()
+            summary = {**sampler.stats, **pipeline.stats, **(gate.stats if gate else {})}
+            if stats is not None:
+                stats.update(summary)
+            logger.info("Video processing complete", processed_detections=processed, **summary)
+
+    def _detect_plates_in_batch(
+        self,
+        batch: list,
+        region: Optional[RegionOfInterest] = None,
+        failures: Optional[FailedBatches] = None,
+    ) -> tuple[int, list[Dict[str, Any]]]:
+        """Detect plates in one batch.
+
+        A failed batch is logged and skipped, unless it is the
+        DETECTION_MAX_FAILED_BATCHES-th failure in a row (or there is no
+        `failures` counter), in which case the error is raised.
+        """
+        detections = []
+        try:
+            results = self.detector.detect_batch(batch)
         except Exception as e:
-            logger.error("Detection failed for frame", frame_no=frame_no, error=str(e))
-            return []
+            logger.error(
+                "Detection failed for batch",
+                first_frame=batch[0][0],
+                last_frame=batch[-1][0],
+                error=str(e),
+            )
+            if failures is None or failures.failed():
+                raise
+            results = []
+        else:
+            if failures is not None:
+                failures.succeeded()
 
-    def _extract_crop(self, frame, bbox: dict) -> Any:
-        x1, y1, x2, y2 = bbox["x1"], bbox["y1"], bbox["x2"], bbox["y2"]
-        crop = frame[y1:y2, x1:x2]
-        return crop
+        for detection in results:
+            if detection["confidence"] < self.confidence_threshold:
+                continue
+            detection.setdefault("normalized_plate", normalize_plate(detection["plate"]))
+            # Plugins report boxes in the pixels of the frame they were given
+            detection["bbox_space"] = "source"
+            if region is not None:
+                detection["bbox"] = region.to_frame(detection["bbox"])
+            detections.append(detection)
+        return batch[-1][0], detections
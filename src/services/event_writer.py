@@ -0,0 +1,143 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.logging_config import get_logger
+from src.models.event import Event, ReviewState
+
+logger = get_logger(__name__)
+
+# Namespace for deterministic event ids, so a retried job produces the same
+# primary keys and re-inserted rows are skipped instead of duplicated (the
+# unique (upload_id, frame_no, bbox) index catches the same rows by value).
+EVENT_ID_NAMESPACE = uuid.UUID("5b0c3d6e-8f3a-4c1e-9a57-2f4d9b1e7c20")
+
+FlushCallback = Callable[[list[Event]], Awaitable[None]]
+
+
+def event_id_for(upload_id: uuid.UUID, frame_no: int, bbox: dict) -> uuid.UUID:
+    key = f"{upload_id}:{frame_no}:{bbox['x1']},{bbox['y1']},{bbox['x2']},{bbox['y2']}"
+    return uuid.uuid5(EVENT_ID_NAMESPACE, key)
+
+
+class EventWriter:
+    """Buffers event rows for one job and writes them with multi-row inserts.
+
+    A batch is flushed when it reaches `batch_size` rows or when its oldest
+    row has waited `flush_interval` seconds. Inserted events are passed to
+    `on_flush` (e.g. for BOLO matching) while the writer still owns the
+    session.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        on_flush: Optional[FlushCallback] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.db = db
+        self.on_flush = on_flush
+        self.batch_size = batch_size or settings.EVENT_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.EVENT_FLUSH_INTERVAL
+        self.rows_written = 0
+        self.rows_inserted = 0
+        self._rows: list[dict[str, Any]] = []
+        self._oldest: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._ticker: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "EventWriter":
+        self._ticker = asyncio.create_task(self._flush_periodically())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._ticker:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+        if exc_type is None:
+            await self.flush()
+
+    async def add(self, row: dict[str, Any]) -> list[Event]:
+        self._rows.append(row)
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        if len(self._rows) >= self.batch_size or self._due():
+            return await self.flush()
+        return []
+
+    async def flush(self) -> list[Event]:
+        async with self._lock:
+            if not self._rows:
+                return []
+            rows, self._rows, self._oldest = self._rows, [], None
+
+            stmt = (
+                pg_insert(Event)
+                .on_conflict_do_nothing()
+                .returning(Event)
+            )
+            try:
+                result = await self.db.scalars(stmt, rows)
+                events = list(result.all())
+                await self.db.commit()
+            except Exception:
+                await self.db.rollback()
+                self._rows[:0] = rows
+                self._oldest = self._oldest or time.monotonic()
+                raise
+
+            self.rows_written += len(rows)
+            self.rows_inserted += len(events)
+            logger.info("Events flushed", rows=len(rows), inserted=len(events))
+
+            if events and self.on_flush:
+                await self.on_flush(events)
+            return events
+
+    def _due(self) -> bool:
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._due():
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error("Periodic event flush failed", error=str(e))
+
+
+def build_event_row(
+    upload_id: uuid.UUID,
+    camera_id: uuid.UUID,
+    detection: dict[str, Any],
+    crop_path: str,
+    event_id: Optional[uuid.UUID] = None,
+) -> dict[str, Any]:
+    return {
+        "id": event_id or event_id_for(upload_id, detection["frame_no"], detection["bbox"]),
+        "upload_id": upload_id,
+        "camera_id": camera_id,
+        "plate": detection["plate"],
+        "normalized_plate": detection["normalized_plate"],
+        "confidence": detection["confidence"],
+        "bbox": detection["bbox"],
+        "bbox_space": detection.get("bbox_space"),
+        "frame_no": detection["frame_no"],
+        "first_frame_no": detection.get("first_frame_no"),
+        "last_frame_no": detection.get("last_frame_no"),
+        "captured_at": detection["captured_at"],
+        "crop_path": crop_path,
+        "review_state": ReviewState.UNREVIEWED,
+        "created_at": datetime.utcnow(),
+    }
@@ -0,0 +1,32 @@
+from typing import Optional
+
+import httpx
+
+from src.config import settings
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared, connection-pooled client for downloads, storage and webhooks."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=10.0),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("HTTP client closed")
+    _client = None
@@ -0,0 +1,99 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Any, BinaryIO, Optional
+
+from src.config import settings
+from src.detectors.sampling import probe_video
+from src.logging_config import get_logger
+from src.models.upload import Upload, UploadStatus
+
+logger = get_logger(__name__)
+
+
+def _file_path(fileobj: BinaryIO) -> Optional[str]:
+    """A path OpenCV can open to read `fileobj` in place, if there is one.
+
+    Large uploads are already spooled to an (unnamed) temporary file; its
+    descriptor is reachable through /proc on Linux.
+    """
+    try:
+        fileobj.flush()
+        path = f"/proc/self/fd/{fileobj.fileno()}"
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+    return path if os.path.exists(path) else None
+
+
+def probe_upload(fileobj: BinaryIO, filename: str) -> Optional[dict[str, Any]]:
+    """Probe an uploaded video's duration, frame rate, size and codec.
+
+    The upload is read where it was spooled when possible, else copied to a
+    temporary file for OpenCV; it is rewound afterwards. Returns None if the
+    container cannot be read.
+    """
+    try:
+        path = _file_path(fileobj)
+        if path is not None:
+            return probe_video(path)
+        suffix = os.path.splitext(filename)[1]
+        with tempfile.NamedTemporaryFile(suffix=suffix, dir=settings.WORKER_TEMP_DIR or None) as tmp:
+            fileobj.seek(0)
+            shutil.copyfileobj(fileobj, tmp, settings.DOWNLOAD_CHUNK_SIZE)
+            tmp.flush()
+            return probe_video(tmp.name)
+    except ValueError as e:
+        logger.warning("Could not probe upload", filename=filename, error=str(e))
+        return None
+    finally:
+        fileobj.seek(0)
+
+
+def estimate_cost(probe: Optional[dict[str, Any]], sampling_fps: Optional[float] = None) -> float:
+    """Estimated processing seconds for a video.
+
+    Detection on the sampled frames (JOB_COST_SECONDS_PER_FRAME each) plus
+    reading every frame of the source (JOB_COST_SECONDS_PER_MEGAPIXEL).
+    Videos that could not be probed cost JOB_COST_DEFAULT_SECONDS.
+    """
+    if not probe or not probe.get("duration"):
+        return settings.JOB_COST_DEFAULT_SECONDS
+
+    fps = sampling_fps or settings.FRAME_EXTRACTION_FPS
+    if probe.get("fps"):
+        fps = min(fps, probe["fps"])
+    sampled_frames = probe["duration"] * fps
+    megapixels = probe["frames"] * probe["width"] * probe["height"] / 1e6
+    return (
+        sampled_frames * settings.JOB_COST_SECONDS_PER_FRAME
+        + megapixels * settings.JOB_COST_SECONDS_PER_MEGAPIXEL
+    )
+
+
+def estimate_eta(
+    upload: Upload, work_ahead: Optional[float], now: Optional[datetime] = None
+) -> Optional[float]:
+    """Seconds until an upload is expected to finish, None once it has.
+
+    A queued upload waits for the work queued ahead of it, shared over
+    JOB_ETA_PARALLELISM job slots, then takes its own estimated cost. A
+    processing upload has its cost left minus the time it has been running.
+    """
+    if upload.status in (UploadStatus.DONE, UploadStatus.FAILED):
+        return None
+
+    cost = (upload.meta_data or {}).get("estimated_cost") or settings.JOB_COST_DEFAULT_SECONDS
+    if upload.status == UploadStatus.QUEUED or not upload.started_at:
+        return (work_ahead or 0.0) / max(1, settings.JOB_ETA_PARALLELISM) + cost
+
+    if upload.segments_total:
+        # Segments run side by side, so count what is left rather than elapsed time
+        left = max(0, upload.segments_total - upload.segments_done)
+        if not left:
+            return 0.0
+        segment_cost = cost / upload.segments_total
+        return segment_cost * left / min(left, max(1, settings.JOB_ETA_PARALLELISM))
+    elapsed = ((now or datetime.utcnow()) - upload.started_at).total_seconds()
+    return max(0.0, cost - elapsed)
@@ -1,4 +1,5 @@
 import json
+import time
 from typing import Optional
 
 import redis.asyncio as aioredis
@@ -7,10 +8,198 @@ from src.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Lanes from highest to lowest priority
+PRIORITIES = ("high", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+DEFAULT_FLOW = "default"
+DEFAULT_COST = 1.0
+
+# Enough wake-up tokens for every idle consumer; extra jobs are found anyway
+WAKE_TOKENS = 64
+# Above this many jobs ahead in its own lane, a job's work ahead is estimated
+# from the lane's mean cost instead of summed job by job
+EXACT_WORK_AHEAD_JOBS = 100
+
+# A job's payload is its member in the lane sorted sets and the key of its
+# bookkeeping: `<queue>:origin` (lane it came from) and `<queue>:costs` (its
+# cost) until it is acked, plus `<queue>:ids` (job_id -> payload) so its place
+# in the queue can be looked up. `<queue>:lane_costs` holds each lane's total
+# queued cost.
+
+# KEYS: lane, flows, origin, wake, costs, lane costs, ids
+# ARGV: payload, flow, cost, lane vtime field, wake tokens, job_id
+ENQUEUE_SCRIPT = """
+local vtime = tonumber(redis.call('HGET', KEYS[2], ARGV[4]) or 0)
+local start = math.max(vtime, tonumber(redis.call('HGET', KEYS[2], ARGV[2]) or 0))
+local finish = start + tonumber(ARGV[3])
+redis.call('HSET', KEYS[2], ARGV[2], finish)
+redis.call('ZADD', KEYS[1], finish, ARGV[1])
+redis.call('HSET', KEYS[3], ARGV[1], KEYS[1])
+redis.call('HSET', KEYS[5], ARGV[1], ARGV[3])
+redis.call('HINCRBYFLOAT', KEYS[6], KEYS[1], ARGV[3])
+if ARGV[6] ~= '' then
+    redis.call('HSET', KEYS[7], ARGV[6], ARGV[1])
+end
+redis.call('LPUSH', KEYS[4], 1)
+redis.call('LTRIM', KEYS[4], 0, tonumber(ARGV[5]) - 1)
+"""
+
+# Picks the lane by smooth weighted round robin over the lanes that have
+# work: each gains its weight in credit, the richest is served (ties go to
+# the higher lane) and pays back the weights of all of them.
+# KEYS: legacy list, processing, leases, flows, origin, costs, lane costs, lanes...
+# ARGV: lease deadline, '1' to lease, then per lane: vtime field, weight
+DEQUEUE_SCRIPT = """
+local best, best_credit
+local total = 0
+local credits = {}
+for i = 8, #KEYS do
+    local field = KEYS[i] .. ':credit'
+    if redis.call('ZCARD', KEYS[i]) > 0 then
+        local weight = tonumber(ARGV[2 * (i - 7) + 2])
+        local credit = tonumber(redis.call('HGET', KEYS[4], field) or 0) + weight
+        credits[i] = credit
+        total = total + weight
+        if not best or credit > best_credit then
+            best, best_credit = i, credit
+        end
+    else
+        redis.call('HDEL', KEYS[4], field)
+    end
+end
+local job
+if best then
+    for i, credit in pairs(credits) do
+        if i == best then
+            credit = credit - total
+        end
+        redis.call('HSET', KEYS[4], KEYS[i] .. ':credit', credit)
+    end
+    local popped = redis.call('ZPOPMIN', KEYS[best])
+    job = popped[1]
+    local vkey = ARGV[2 * (best - 7) + 1]
+    if tonumber(popped[2]) > tonumber(redis.call('HGET', KEYS[4], vkey) or 0) then
+        redis.call('HSET', KEYS[4], vkey, popped[2])
+    end
+    local cost = tonumber(redis.call('HGET', KEYS[6], job) or 0)
+    redis.call('HINCRBYFLOAT', KEYS[7], KEYS[best], -cost)
+end
+if not job then
+    -- Jobs pushed before priority lanes existed
+    job = redis.call('RPOP', KEYS[1])
+    if not job then
+        return false
+    end
+end
+if ARGV[2] == '1' then
+    redis.call('LPUSH', KEYS[2], job)
+    redis.call('ZADD', KEYS[3], ARGV[1], job)
+else
+    redis.call('HDEL', KEYS[5], job)
+    redis.call('HDEL', KEYS[6], job)
+end
+return job
+"""
+
+# KEYS: processing, leases, attempts, origin, costs, ids. ARGV: payload, job_id
+ACK_SCRIPT = """
+redis.call('LREM', KEYS[1], 1, ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('HDEL', KEYS[4], ARGV[1])
+redis.call('HDEL', KEYS[5], ARGV[1])
+if redis.call('HGET', KEYS[6], ARGV[2]) == ARGV[1] then
+    redis.call('HDEL', KEYS[6], ARGV[2])
+end
+return redis.call('ZREM', KEYS[2], ARGV[1])
+"""
+
+# Puts a job back at the head of the lane it came from, or the default lane
+# for jobs that have none. The lanes are the KEYS from `first_lane` on.
+# KEYS: processing, leases, flows, origin, costs, lane costs, ... ARGV: payload, default lane
+REQUEUE_FUNCTION = """
+local function requeue(job, first_lane)
+    local origin = redis.call('HGET', KEYS[4], job)
+    local lane = ARGV[2]
+    for i = first_lane, #KEYS do
+        if KEYS[i] == origin then
+            lane = KEYS[i]
+        end
+    end
+    local vtime = redis.call('HGET', KEYS[3], lane .. ':vtime') or 0
+    redis.call('ZADD', lane, vtime, job)
+    redis.call('HINCRBYFLOAT', KEYS[6], lane, tonumber(redis.call('HGET', KEYS[5], job) or 0))
+end
+"""
+
+# KEYS: processing, leases, flows, origin, costs, lane costs, lanes...
+RELEASE_SCRIPT = REQUEUE_FUNCTION + """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+requeue(ARGV[1], 7)
+return 1
+"""
+
+# KEYS: processing, leases, flows, origin, costs, lane costs, attempts, dead, ids, lanes...
+# ARGV: now, default lane, lease seconds, max attempts
+RECLAIM_SCRIPT = REQUEUE_FUNCTION + """
+local now = tonumber(ARGV[1])
+for _, job in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+    if not redis.call('ZSCORE', KEYS[2], job) then
+        -- Moved by a consumer that died before it could lease the job
+        redis.call('ZADD', KEYS[2], now + tonumber(ARGV[3]), job)
+    end
+end
+local requeued, dead = 0, 0
+for _, job in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)) do
+    redis.call('ZREM', KEYS[2], job)
+    redis.call('LREM', KEYS[1], 1, job)
+    if redis.call('HINCRBY', KEYS[7], job, 1) >= tonumber(ARGV[4]) then
+        redis.call('HDEL', KEYS[7], job)
+        redis.call('HDEL', KEYS[4], job)
+        redis.call('HDEL', KEYS[5], job)
+        local job_id = string.match(job, '"job_id": "([^"]*)"')
+        if job_id and redis.call('HGET', KEYS[9], job_id) == job then
+            redis.call('HDEL', KEYS[9], job_id)
+        end
+        redis.call('LPUSH', KEYS[8], job)
+        dead = dead + 1
+    else
+        requeue(job, 10)
+        requeued = requeued + 1
+    end
+end
+return {requeued, dead}
+"""
+
 
 class QueueService:
+    """Job queues on Redis, with priority lanes and fair sharing.
+
+    Each queue has one sorted set per priority (`<queue>:lane:<priority>`).
+    While several lanes have work they share the dequeues by
+    QUEUE_LANE_WEIGHTS (by default high 8, normal 4, low 1 of every 13), so
+    a busy high lane delays a low one but never starves it. Within a lane jobs are ordered by
+    start-time fair queueing over flows (the `flow` of the job payload, e.g.
+    one uploader and camera): a job's score is its flow's previous score or
+    the lane's virtual time (the score of the last job dequeued), whichever
+    is later, plus its `cost` (estimated processing seconds). A flow that
+    enqueues a burst takes turns with the others instead of holding up the
+    lane, and short jobs go ahead of long ones queued before them until the
+    lane has served about the long job's cost of other work.
+
+    With QUEUE_RELIABLE, `dequeue` atomically moves a job to
+    `<queue>:processing` and leases it for QUEUE_LEASE_SECONDS
+    (`<queue>:leases`, payloads scored by deadline) instead of dropping it.
+    The consumer calls `ack` when done and `renew` while working; `reclaim`
+    puts jobs whose lease expired back at the head of their lane, and after
+    QUEUE_MAX_ATTEMPTS expired leases moves them to `<queue>:dead`.
+    """
+
     def __init__(self):
         self.redis: Optional[aioredis.Redis] = None
+        self._leased: dict[tuple[str, str], str] = {}
 
     async def connect(self):
         self.redis = await aioredis.from_url(settings.REDIS_URL, decode_responses=True)
@@ -22,28 +211,223 @@ class QueueService:
             logger.info("Disconnected from Redis queue")
 
     async def enqueue(self, queue_name: str, data: dict) -> str:
+        """Add a job to the lane of its `priority`, in turn with other flows."""
         if not self.redis:
             raise RuntimeError("Redis not connected")
 
-        job_data = json.dumps(data)
-        await self.redis.lpush(queue_name, job_data)
-        logger.info("Job enqueued", queue=queue_name, job_id=data.get("job_id"))
+        priority = data.get("priority") or DEFAULT_PRIORITY
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        lane = self._lane(queue_name, priority)
+
+        job_data = json.dumps({**data, "enqueued_at": time.time()})
+        await self.redis.eval(
+            ENQUEUE_SCRIPT,
+            7,
+            lane,
+            *self._keys(queue_name, "flows", "origin", "wake", "costs", "lane_costs", "ids"),
+            job_data,
+            data.get("flow") or DEFAULT_FLOW,
+            data.get("cost") or DEFAULT_COST,
+            f"{lane}:vtime",
+            WAKE_TOKENS,
+            data.get("job_id") or "",
+        )
+        logger.info("Job enqueued", queue=queue_name, job_id=data.get("job_id"), priority=priority)
         return data.get("job_id", "unknown")
 
     async def dequeue(self, queue_name: str, timeout: int = 0) -> Optional[dict]:
         if not self.redis:
             raise RuntimeError("Redis not connected")
 
-        result = await self.redis.brpop(queue_name, timeout=timeout)
-        if result:
-            _, job_data = result
-            return json.loads(job_data)
-        return None
+        job_data = await self._pop(queue_name)
+        if job_data is None:
+            # Wait for an enqueue; a token only says some lane may have work
+            if await self.redis.blpop(f"{queue_name}:wake", timeout=timeout):
+                job_data = await self._pop(queue_name)
+        if job_data is None:
+            return None
+
+        job = json.loads(job_data)
+        if settings.QUEUE_RELIABLE:
+            self._leased[self._lease_key(queue_name, job)] = job_data
+        elif job.get("job_id"):
+            ids = f"{queue_name}:ids"
+            if await self.redis.hget(ids, job["job_id"]) == job_data:
+                await self.redis.hdel(ids, job["job_id"])
+        return job
+
+    async def ack(self, queue_name: str, job: dict) -> bool:
+        """Mark a dequeued job done. False if it was not leased by this process."""
+        job_data = self._leased.pop(self._lease_key(queue_name, job), None)
+        if job_data is None:
+            return False
+        await self.redis.eval(
+            ACK_SCRIPT,
+            6,
+            *self._keys(queue_name, "processing", "leases", "attempts", "origin", "costs", "ids"),
+            job_data,
+            job.get("job_id") or "",
+        )
+        return True
+
+    async def renew(self, queue_name: str, job: dict) -> bool:
+        """Extend a job's lease. False if the lease was lost (the job was reclaimed)."""
+        job_data = self._leased.get(self._lease_key(queue_name, job))
+        if job_data is None:
+            return False
+        deadline = time.time() + settings.QUEUE_LEASE_SECONDS
+        return bool(
+            await self.redis.zadd(f"{queue_name}:leases", {job_data: deadline}, xx=True, ch=True)
+        )
+
+    async def release(self, queue_name: str, job: dict) -> bool:
+        """Give a job back unfinished (e.g. on shutdown) without counting an attempt."""
+        job_data = self._leased.pop(self._lease_key(queue_name, job), None)
+        if job_data is None:
+            return False
+        lanes = [self._lane(queue_name, priority) for priority in PRIORITIES]
+        released = await self.redis.eval(
+            RELEASE_SCRIPT,
+            6 + len(lanes),
+            *self._keys(queue_name, "processing", "leases", "flows", "origin", "costs", "lane_costs"),
+            *lanes,
+            job_data,
+            self._lane(queue_name, DEFAULT_PRIORITY),
+        )
+        if released:
+            logger.info("Job released", queue=queue_name, job_id=job.get("job_id"))
+        return bool(released)
+
+    async def fail(self, queue_name: str, job: dict) -> bool:
+        """Give up on a job now; the next `reclaim` retries or dead-letters it."""
+        job_data = self._leased.pop(self._lease_key(queue_name, job), None)
+        if job_data is None:
+            return False
+        return bool(await self.redis.zadd(f"{queue_name}:leases", {job_data: 0}, xx=True, ch=True))
+
+    async def retries_left(self, queue_name: str, job: dict) -> int:
+        """How many more times a job leased by this process will be retried if it fails."""
+        job_data = self._leased.get(self._lease_key(queue_name, job))
+        if job_data is None:
+            return 0
+        attempts = int(await self.redis.hget(f"{queue_name}:attempts", job_data) or 0)
+        return max(0, settings.QUEUE_MAX_ATTEMPTS - attempts - 1)
+
+    async def reclaim(self, queue_name: str) -> tuple[int, int]:
+        """Requeue jobs whose lease expired; return (requeued, dead-lettered)."""
+        if not self.redis:
+            raise RuntimeError("Redis not connected")
+
+        lanes = [self._lane(queue_name, priority) for priority in PRIORITIES]
+        requeued, dead = await self.redis.eval(
+            RECLAIM_SCRIPT,
+            9 + len(lanes),
+            *self._keys(
+                queue_name,
+                "processing", "leases", "flows", "origin", "costs", "lane_costs", "attempts", "dead", "ids",
+            ),
+            *lanes,
+            time.time(),
+            self._lane(queue_name, DEFAULT_PRIORITY),
+            settings.QUEUE_LEASE_SECONDS,
+            settings.QUEUE_MAX_ATTEMPTS,
+        )
+        if requeued or dead:
+            logger.warning("Reclaimed expired jobs", queue=queue_name, requeued=requeued, dead=dead)
+        return requeued, dead
 
     async def get_queue_length(self, queue_name: str) -> int:
         if not self.redis:
             raise RuntimeError("Redis not connected")
-        return await self.redis.llen(queue_name)
+        lanes = await self.get_lane_lengths(queue_name)
+        return sum(lanes.values()) + await self.redis.llen(queue_name)
+
+    async def get_lane_lengths(self, queue_name: str) -> dict[str, int]:
+        if not self.redis:
+            raise RuntimeError("Redis not connected")
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for priority in PRIORITIES:
+                pipe.zcard(self._lane(queue_name, priority))
+            lengths = await pipe.execute()
+        return dict(zip(PRIORITIES, lengths, strict=True))
+
+    async def get_dead_letter_length(self, queue_name: str) -> int:
+        if not self.redis:
+            raise RuntimeError("Redis not connected")
+        return await self.redis.llen(f"{queue_name}:dead")
+
+    async def get_oldest_job_age(self, queue_name: str) -> float:
+        """Seconds the longest-waiting job at the head of a lane has waited (0 if empty)."""
+        if not self.redis:
+            raise RuntimeError("Redis not connected")
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for priority in PRIORITIES:
+                pipe.zrange(self._lane(queue_name, priority), 0, 0)
+            pipe.lindex(queue_name, -1)
+            *heads, legacy = await pipe.execute()
+        jobs = [head[0] for head in heads if head] + ([legacy] if legacy else [])
+        times = [json.loads(job).get("enqueued_at") for job in jobs]
+        times = [enqueued_at for enqueued_at in times if enqueued_at]
+        return max(0.0, time.time() - min(times)) if times else 0.0
+
+    async def get_work_ahead(self, queue_name: str, job_id: str) -> Optional[float]:
+        """Total cost of the jobs that will be dequeued before `job_id`.
+
+        Higher lanes count with their total cost (an upper bound, as lanes
+        share turns by weight). In the job's own lane the
+        jobs ahead are summed up to EXACT_WORK_AHEAD_JOBS of them, beyond
+        that estimated from the lane's mean cost. None if the job is not
+        waiting in a lane.
+        """
+        if not self.redis:
+            raise RuntimeError("Redis not connected")
+        job_data = await self.redis.hget(f"{queue_name}:ids", job_id)
+        lane = await self.redis.hget(f"{queue_name}:origin", job_data) if job_data else None
+        rank = await self.redis.zrank(lane, job_data) if lane else None
+        if rank is None:
+            return None
+
+        lanes = [self._lane(queue_name, priority) for priority in PRIORITIES]
+        lane_costs = await self.redis.hmget(f"{queue_name}:lane_costs", lanes)
+        ahead = sum(max(0.0, float(cost or 0)) for cost in lane_costs[:lanes.index(lane)])
+        if rank == 0:
+            return ahead
+        if rank <= EXACT_WORK_AHEAD_JOBS:
+            jobs = await self.redis.zrange(lane, 0, rank - 1)
+            costs = await self.redis.hmget(f"{queue_name}:costs", jobs)
+            return ahead + sum(float(cost) if cost else DEFAULT_COST for cost in costs)
+        lane_cost = max(0.0, float(lane_costs[lanes.index(lane)] or 0))
+        return ahead + rank * lane_cost / await self.redis.zcard(lane)
+
+    async def _pop(self, queue_name: str) -> Optional[str]:
+        lanes = [self._lane(queue_name, priority) for priority in PRIORITIES]
+        weights = settings.queue_lane_weights
+        lane_args = []
+        for priority, lane in zip(PRIORITIES, lanes, strict=True):
+            lane_args += [f"{lane}:vtime", weights.get(priority, 1)]
+        return await self.redis.eval(
+            DEQUEUE_SCRIPT,
+            7 + len(lanes),
+            queue_name,
+            *self._keys(queue_name, "processing", "leases", "flows", "origin", "costs", "lane_costs"),
+            *lanes,
+            time.time() + settings.QUEUE_LEASE_SECONDS,
+            "1" if settings.QUEUE_RELIABLE else "0",
+            *lane_args,
+        )
+
+    @staticmethod
+    def _lane(queue_name: str, priority: str) -> str:
+        return f"{queue_name}:lane:{priority}"
+
+    @staticmethod
+    def _keys(queue_name: str, *suffixes: str) -> list[str]:
+        return [f"{queue_name}:{suffix}" for suffix in suffixes]
+
+    @staticmethod
+    def _lease_key(queue_name: str, job: dict) -> tuple[str, str]:
+        return queue_name, job.get("job_id") or json.dumps(job, sort_keys=True)
 
 
 queue_service = QueueService()
@@ -0,0 +1,51 @@
+from typing import Optional
+
+from prometheus_client import Gauge
+
+from src.config import settings
+
+sampling_fps_gauge = Gauge('anpr_sampling_fps', 'Frame sampling rate chosen for the latest job')
+sampling_pressure_gauge = Gauge(
+    'anpr_sampling_pressure', 'Queue load relative to the adaptive sampling targets'
+)
+
+
+def queue_pressure(depth: int, oldest_age: float) -> float:
+    """How far the queue is over its targets: 1.0 means exactly at target.
+
+    The larger of depth/SAMPLING_TARGET_QUEUE_DEPTH and
+    oldest_age/SAMPLING_TARGET_WAIT_SECONDS, so either a long queue or a
+    long-waiting job counts as load.
+    """
+    pressure = 0.0
+    if settings.SAMPLING_TARGET_QUEUE_DEPTH > 0:
+        pressure = depth / settings.SAMPLING_TARGET_QUEUE_DEPTH
+    if settings.SAMPLING_TARGET_WAIT_SECONDS > 0:
+        pressure = max(pressure, oldest_age / settings.SAMPLING_TARGET_WAIT_SECONDS)
+    return pressure
+
+
+def choose_sampling_fps(
+    depth: int,
+    oldest_age: float,
+    min_fps: Optional[float] = None,
+    max_fps: Optional[float] = None,
+) -> float:
+    """Pick a frame sampling rate for the next job from the queue backlog.
+
+    Below target load the camera's maximum rate is used. Above it the rate
+    drops in proportion to the load (twice the target depth or wait halves
+    it), never below the camera's minimum. Bounds default to
+    SAMPLING_MIN_FPS and FRAME_EXTRACTION_FPS.
+    """
+    max_fps = max_fps or settings.FRAME_EXTRACTION_FPS
+    min_fps = min(min_fps or settings.SAMPLING_MIN_FPS, max_fps)
+    if not settings.ADAPTIVE_SAMPLING_ENABLED:
+        return max_fps
+
+    pressure = queue_pressure(depth, oldest_age)
+    fps = max(min_fps, max_fps / max(1.0, pressure))
+
+    sampling_pressure_gauge.set(pressure)
+    sampling_fps_gauge.set(fps)
+    return fps
@@ -0,0 +1,146 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+JobHandler = Callable[[dict], Awaitable[Any]]
+JobFetcher = Callable[[], Awaitable[Optional[dict]]]
+
+DEFAULT_JOB_TYPE = "video"
+
+
+def job_type_of(job: dict) -> str:
+    return job.get("type") or DEFAULT_JOB_TYPE
+
+
+class JobScheduler:
+    """Keeps up to `concurrency` jobs in flight, with optional per-type caps.
+
+    A slot is reserved before a job is fetched, so the worker never pulls
+    more work off the queue than it can start. A failing job only affects
+    its own task. `keepalive`, if given, runs alongside each job from the
+    moment it is fetched (including while it waits for its type's slot)
+    until it ends, e.g. to renew the job's queue lease.
+    """
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        concurrency: int,
+        type_limits: Optional[dict[str, int]] = None,
+        keepalive: Optional[JobHandler] = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.handler = handler
+        self.keepalive = keepalive
+        self.concurrency = concurrency
+        self.type_limits = {
+            job_type: max(1, min(limit, concurrency))
+            for job_type, limit in (type_limits or {}).items()
+        }
+        self._slots = asyncio.Semaphore(concurrency)
+        self._type_slots = {
+            job_type: asyncio.Semaphore(limit) for job_type, limit in self.type_limits.items()
+        }
+        self._tasks: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping.is_set()
+
+    def stop(self) -> None:
+        if not self._stopping.is_set():
+            logger.info("Scheduler stopping", in_flight=self.in_flight)
+        self._stopping.set()
+
+    async def run(self, fetch: JobFetcher, idle_sleep: float = 1.0) -> None:
+        while not self.stopping:
+            if not await self._acquire_slot():
+                break
+
+            try:
+                job = await fetch()
+            except Exception as e:
+                self._slots.release()
+                logger.error("Failed to fetch job", error=str(e))
+                await self._sleep(5)
+                continue
+
+            if not job:
+                self._slots.release()
+                await self._sleep(idle_sleep)
+                continue
+
+            self.submit(job)
+
+    def submit(self, job: dict) -> asyncio.Task:
+        """Start a job whose global slot has already been acquired."""
+        task = asyncio.create_task(self._run_job(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def shutdown(self, timeout: Optional[float] = None) -> None:
+        self.stop()
+        if not self._tasks:
+            return
+
+        logger.info("Waiting for in-flight jobs", in_flight=self.in_flight, timeout=timeout)
+        done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        if pending:
+            logger.warning("Cancelling unfinished jobs", count=len(pending))
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _acquire_slot(self) -> bool:
+        acquire = asyncio.ensure_future(self._slots.acquire())
+        stop = asyncio.ensure_future(self._stopping.wait())
+        await asyncio.wait({acquire, stop}, return_when=asyncio.FIRST_COMPLETED)
+        stop.cancel()
+
+        if not acquire.done():
+            acquire.cancel()
+            return False
+        if self.stopping:
+            self._slots.release()
+            return False
+        return True
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run_job(self, job: dict) -> None:
+        job_type = job_type_of(job)
+        type_slot = self._type_slots.get(job_type)
+        keepalive = asyncio.create_task(self.keepalive(job)) if self.keepalive else None
+        try:
+            if type_slot is not None:
+                # Holds the global slot while waiting, so a saturated job type
+                # throttles how much this worker pulls from the queue.
+                async with type_slot:
+                    await self.handler(job)
+            else:
+                await self.handler(job)
+        except asyncio.CancelledError:
+            logger.warning("Job cancelled", job_id=job.get("job_id"), job_type=job_type)
+            raise
+        except Exception as e:
+            logger.error(
+                "Job crashed", job_id=job.get("job_id"), job_type=job_type, error=str(e)
+            )
+        finally:
+            if keepalive is not None:
+                keepalive.cancel()
+            self._slots.release()
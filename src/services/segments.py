@@ -0,0 +1,44 @@
+from typing import List, Optional, Tuple
+
+from src.config import settings
+
+SEGMENT_JOB_TYPE = "segment"
+
+Segment = Tuple[int, Optional[int]]
+
+
+def plan_segments(frame_count: int, fps: float, segment_seconds: Optional[float] = None) -> List[Segment]:
+    """Split a video into `[start_frame, end_frame)` ranges of about `segment_seconds`.
+
+    The last range is open-ended (`end_frame` None) because container frame
+    counts are not always exact. Videos shorter than one and a half
+    segments, or of unknown length, are not split.
+    """
+    if segment_seconds is None:
+        segment_seconds = settings.SEGMENT_SECONDS
+    if segment_seconds <= 0 or fps <= 0 or frame_count <= 0:
+        return [(0, None)]
+
+    segment_frames = segment_seconds * fps
+    count = int(frame_count / segment_frames + 0.5)
+    if count < 2:
+        return [(0, None)]
+
+    bounds = [round(i * frame_count / count) for i in range(count)]
+    return [
+        (start, bounds[i + 1] if i + 1 < count else None)
+        for i, start in enumerate(bounds)
+    ]
+
+
+def segment_job(job_data: dict, index: int, segment: Segment) -> dict:
+    """Build the queue payload for one segment of an upload's job."""
+    start_frame, end_frame = segment
+    return {
+        **job_data,
+        "type": SEGMENT_JOB_TYPE,
+        "job_id": f"{job_data['job_id']}:{index}",
+        "segment": index,
+        "start_frame": start_frame,
+        "end_frame": end_frame,
+    }
@@ -1,22 +1,48 @@
+import asyncio
+import shutil
 from abc import ABC, abstractmethod
 from datetime import timedelta
-from io import BytesIO
-from typing import BinaryIO, TYPE_CHECKING
-import uuid
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Optional, Union
+from urllib.parse import quote
 
 from minio import Minio
-import httpx
 
 from src.config import settings
 from src.logging_config import get_logger
-
-if TYPE_CHECKING:
-    from supabase import Client
+from src.services.http import get_http_client
 
 logger = get_logger(__name__)
 
 
+def _file_size(file: BinaryIO) -> int:
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+async def _iter_file(file: BinaryIO, chunk_size: int) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await asyncio.to_thread(file.read, chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def _request_body(file: BinaryIO, size: int) -> Union[bytes, AsyncIterator[bytes]]:
+    # Small objects such as crops are sent in one piece; large videos are
+    # streamed so they never have to fit in memory.
+    chunk_size = settings.DOWNLOAD_CHUNK_SIZE
+    if size <= chunk_size:
+        return await asyncio.to_thread(file.read)
+    return _iter_file(file, chunk_size)
+
+
 class StorageService(ABC):
+    def __init__(self):
+        self._limit = asyncio.Semaphore(settings.STORAGE_MAX_CONCURRENCY)
+
     @abstractmethod
     async def upload_file(
         self, file: BinaryIO, bucket: str, object_name: str, content_type: str = "application/octet-stream"
@@ -33,23 +59,38 @@ class StorageService(ABC):
 
 
 class SupabaseStorageService(StorageService):
+    """Talks to the Supabase Storage REST API over the shared async HTTP client."""
+
     def __init__(self):
-        try:
-            from supabase import create_client
-            self.client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
-        except ImportError:
-            raise ImportError("supabase-py is required for Supabase mode. Install it with: pip install supabase")
+        super().__init__()
+        self.base_url = f"{settings.SUPABASE_URL.rstrip('/')}/storage/v1"
+        self.headers = {
+            "Authorization": f"Bearer {settings.SUPABASE_SERVICE_KEY}",
+            "apikey": settings.SUPABASE_SERVICE_KEY,
+        }
+
+    def _object_url(self, bucket: str, object_name: str) -> str:
+        return f"{self.base_url}/object/{bucket}/{quote(object_name)}"
 
     async def upload_file(
         self, file: BinaryIO, bucket: str, object_name: str, content_type: str = "application/octet-stream"
     ) -> str:
         try:
-            file_bytes = file.read()
-            result = self.client.storage.from_(bucket).upload(
-                object_name,
-                file_bytes,
-                {"content-type": content_type}
-            )
+            size = _file_size(file)
+            async with self._limit:
+                response = await get_http_client().post(
+                    self._object_url(bucket, object_name),
+                    content=await _request_body(file, size),
+                    headers={
+                        **self.headers,
+                        "Content-Type": content_type,
+                        "Content-Length": str(size),
+                        # Overwrite like an S3 PUT does, so a retried job can
+                        # re-upload the crops it stored before it was interrupted
+                        "x-upsert": "true",
+                    },
+                )
+                response.raise_for_status()
             logger.info("File uploaded to Supabase", bucket=bucket, object_name=object_name)
             return object_name
         except Exception as e:
@@ -58,15 +99,28 @@ class SupabaseStorageService(StorageService):
 
     async def get_presigned_url(self, bucket: str, object_name: str, expiry: int = 3600) -> str:
         try:
-            url = self.client.storage.from_(bucket).create_signed_url(object_name, expiry)
-            return url['signedURL']
+            async with self._limit:
+                response = await get_http_client().post(
+                    f"{self.base_url}/object/sign/{bucket}/{quote(object_name)}",
+                    json={"expiresIn": expiry},
+                    headers=self.headers,
+                )
+                response.raise_for_status()
+            return f"{self.base_url}{response.json()['signedURL']}"
         except Exception as e:
             logger.error("Failed to generate signed URL", error=str(e))
             raise
 
     async def delete_file(self, bucket: str, object_name: str) -> None:
         try:
-            self.client.storage.from_(bucket).remove([object_name])
+            async with self._limit:
+                response = await get_http_client().request(
+                    "DELETE",
+                    f"{self.base_url}/object/{bucket}",
+                    json={"prefixes": [object_name]},
+                    headers=self.headers,
+                )
+                response.raise_for_status()
             logger.info("File deleted from Supabase", bucket=bucket, object_name=object_name)
         except Exception as e:
             logger.error("Failed to delete from Supabase", error=str(e))
@@ -74,12 +128,21 @@ class SupabaseStorageService(StorageService):
 
 
 class MinioStorageService(StorageService):
+    """S3/MinIO backend.
+
+    The MinIO SDK is only used to sign requests, which is a local operation
+    once the region is fixed; the requests themselves go through the shared
+    async HTTP client.
+    """
+
     def __init__(self):
+        super().__init__()
         self.client = Minio(
             settings.MINIO_ENDPOINT,
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
             secure=settings.MINIO_SECURE,
+            region=settings.MINIO_REGION,
         )
         self._ensure_buckets()
 
@@ -90,21 +153,23 @@ class MinioStorageService(StorageService):
                 self.client.make_bucket(bucket)
                 logger.info("Created MinIO bucket", bucket=bucket)
 
+    def _sign(self, method: str, bucket: str, object_name: str, expiry: int = 900) -> str:
+        return self.client.get_presigned_url(
+            method, bucket, object_name, expires=timedelta(seconds=expiry)
+        )
+
     async def upload_file(
         self, file: BinaryIO, bucket: str, object_name: str, content_type: str = "application/octet-stream"
     ) -> str:
         try:
-            file.seek(0, 2)
-            file_size = file.tell()
-            file.seek(0)
-
-            self.client.put_object(
-                bucket,
-                object_name,
-                file,
-                file_size,
-                content_type=content_type,
-            )
+            size = _file_size(file)
+            async with self._limit:
+                response = await get_http_client().put(
+                    self._sign("PUT", bucket, object_name),
+                    content=await _request_body(file, size),
+                    headers={"Content-Type": content_type, "Content-Length": str(size)},
+                )
+                response.raise_for_status()
             logger.info("File uploaded to MinIO", bucket=bucket, object_name=object_name)
             return object_name
         except Exception as e:
@@ -113,28 +178,86 @@ class MinioStorageService(StorageService):
 
     async def get_presigned_url(self, bucket: str, object_name: str, expiry: int = 3600) -> str:
         try:
-            url = self.client.presigned_get_object(
-                bucket, object_name, expires=timedelta(seconds=expiry)
-            )
-            return url
+            return self._sign("GET", bucket, object_name, expiry)
         except Exception as e:
             logger.error("Failed to generate presigned URL", error=str(e))
             raise
 
     async def delete_file(self, bucket: str, object_name: str) -> None:
         try:
-            self.client.remove_object(bucket, object_name)
+            async with self._limit:
+                response = await get_http_client().delete(
+                    self._sign("DELETE", bucket, object_name)
+                )
+                response.raise_for_status()
             logger.info("File deleted from MinIO", bucket=bucket, object_name=object_name)
         except Exception as e:
             logger.error("Failed to delete from MinIO", error=str(e))
             raise
 
-            
+
+class LocalStorageService(StorageService):
+    """Stores objects under a local directory; a stand-in for S3 in tests and benchmarks."""
+
+    def __init__(self, root: Optional[str] = None):
+        super().__init__()
+        self.root = Path(root or settings.LOCAL_STORAGE_PATH).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, bucket: str, object_name: str) -> Path:
+        path = (self.root / bucket / object_name).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid object name: {object_name}")
+        return path
+
+    def _write(self, file: BinaryIO, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file.seek(0)
+        with open(path, "wb") as f:
+            shutil.copyfileobj(file, f, settings.DOWNLOAD_CHUNK_SIZE)
+
+    async def upload_file(
+        self, file: BinaryIO, bucket: str, object_name: str, content_type: str = "application/octet-stream"
+    ) -> str:
+        try:
+            async with self._limit:
+                await asyncio.to_thread(self._write, file, self._path(bucket, object_name))
+            logger.info("File stored locally", bucket=bucket, object_name=object_name)
+            return object_name
+        except Exception as e:
+            logger.error("Failed to store file locally", error=str(e))
+            raise
+
+    async def get_presigned_url(self, bucket: str, object_name: str, expiry: int = 3600) -> str:
+        path = self._path(bucket, object_name)
+        if not path.exists():
+            raise FileNotFoundError(f"Object not found: {bucket}/{object_name}")
+        return path.as_uri()
+
+    async def delete_file(self, bucket: str, object_name: str) -> None:
+        self._path(bucket, object_name).unlink(missing_ok=True)
+        logger.info("File deleted locally", bucket=bucket, object_name=object_name)
+
+
+_storage_service: Optional[StorageService] = None
+
+
 def get_storage_service():
-    use_supabase = (
-        settings.MODE.lower() == "supabase"
-        and bool(settings.SUPABASE_URL)
-        and bool(settings.SUPABASE_SERVICE_KEY)
-    )
-    return SupabaseStorageService() if use_supabase else MinioStorageService()
+    global _storage_service
+    if _storage_service is None:
+        backend = settings.STORAGE_BACKEND
+        if backend == "auto":
+            use_supabase = (
+                settings.MODE.lower() == "supabase"
+                and bool(settings.SUPABASE_URL)
+                and bool(settings.SUPABASE_SERVICE_KEY)
+            )
+            backend = "supabase" if use_supabase else "minio"
 
+        if backend == "supabase":
+            _storage_service = SupabaseStorageService()
+        elif backend == "local":
+            _storage_service = LocalStorageService()
+        else:
+            _storage_service = MinioStorageService()
+    return _storage_service
@@ -0,0 +1,260 @@
+import asyncio
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.detectors.stream import Backoff, connect_stream, redact_url
+from src.logging_config import get_logger
+from src.models.camera import Camera
+from src.models.upload import Upload, UploadStatus
+from src.services.detection_stage import stream_detections
+from src.services.http import close_http_client
+from src.worker import AsyncSessionLocal, detector, job_summary, store_detections
+
+logger = get_logger(__name__)
+
+stream_sessions = Gauge('anpr_stream_sessions', 'Live camera streams currently attached')
+stream_reconnects = Counter(
+    'anpr_stream_reconnects', 'Live stream reconnect attempts', ['camera_id']
+)
+
+
+def owns_camera(camera_id: uuid.UUID) -> bool:
+    """Whether this worker's shard (STREAM_SHARD_INDEX of STREAM_SHARD_COUNT) serves the camera."""
+    count = max(1, settings.STREAM_SHARD_COUNT)
+    return camera_id.int % count == settings.STREAM_SHARD_INDEX % count
+
+
+class CameraStream:
+    """Keeps one camera's stream attached, reconnecting with backoff.
+
+    Each connection is recorded as an Upload row (a "session") that owns the
+    events it produces. The row is only created once the camera has sent a
+    frame, so an unreachable camera leaves no rows behind however often it
+    is retried. The session is closed as done when the stream drops or the
+    worker stops, and as failed when reading it broke.
+    """
+
+    def __init__(self, camera: Camera, executor: ThreadPoolExecutor):
+        self.camera_id = camera.id
+        self.name = camera.name
+        self.url = camera.rtsp_url
+        self.executor = executor
+        self.backoff = Backoff(settings.STREAM_RECONNECT_MIN_SECONDS, settings.STREAM_RECONNECT_MAX_SECONDS)
+        # Set from the event loop; read by the frame sampler's thread
+        self._stop = threading.Event()
+        self._stopping = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self.run(), name=f"stream-{self.camera_id}")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._stopping.set()
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            try:
+                await self.run_session()
+            except Exception as e:
+                logger.error("Stream session failed", camera_id=str(self.camera_id), error=str(e))
+
+            if self._stopping.is_set():
+                break
+            # A session that stayed up for a while resets the backoff
+            if time.monotonic() - started >= settings.STREAM_RECONNECT_MAX_SECONDS:
+                self.backoff.reset()
+            delay = self.backoff.next()
+            stream_reconnects.labels(camera_id=str(self.camera_id)).inc()
+            logger.info("Reconnecting stream", camera_id=str(self.camera_id), delay=delay)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def connect(self):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, connect_stream, self.url, settings.STREAM_TIMEOUT_SECONDS
+        )
+
+    async def run_session(self) -> None:
+        async with AsyncSessionLocal() as db:
+            camera = await db.get(Camera, self.camera_id)
+            if camera is None:
+                return
+
+            capture = await self.connect()
+            try:
+                await self.record_session(db, camera, capture)
+            finally:
+                # Normally released by the detection loop; not if it never started
+                capture.release()
+
+    async def record_session(self, db: AsyncSession, camera: Camera, capture) -> None:
+        started_at = datetime.utcnow()
+        upload = Upload(
+            job_id=f"stream:{self.camera_id}:{started_at:%Y%m%dT%H%M%S%f}",
+            camera_id=self.camera_id,
+            uploaded_by=None,
+            filename=self.name,
+            storage_path=redact_url(self.url),
+            file_size=0,
+            status=UploadStatus.PROCESSING,
+            started_at=started_at,
+            meta_data={"source": "stream"},
+        )
+        db.add(upload)
+        await db.commit()
+
+        stats: dict = {}
+        stream_sessions.inc()
+        try:
+            detections = stream_detections(
+                lambda: detector.process_stream(
+                    self.url,
+                    str(self.camera_id),
+                    stats,
+                    motion_sensitivity=camera.motion_sensitivity,
+                    roi=camera.roi,
+                    stop=self._stop,
+                    capture=capture,
+                ),
+                executor=self.executor,
+            )
+            events_count = await store_detections(db, upload, detections)
+        except Exception as e:
+            await db.rollback()
+            upload.status = UploadStatus.FAILED
+            upload.error_message = str(e)
+            upload.completed_at = datetime.utcnow()
+            upload.meta_data = {**(upload.meta_data or {}), "summary": job_summary(stats)}
+            await db.commit()
+            raise
+        finally:
+            stream_sessions.dec()
+
+        upload.status = UploadStatus.DONE
+        upload.completed_at = datetime.utcnow()
+        upload.events_detected = events_count
+        upload.meta_data = {**(upload.meta_data or {}), "summary": job_summary(stats)}
+        await db.commit()
+        logger.info(
+            "Stream session ended",
+            camera_id=str(self.camera_id),
+            events=events_count,
+            **stats,
+        )
+
+
+class StreamSupervisor:
+    """Runs a CameraStream for every active camera with an RTSP URL.
+
+    The camera list is re-read every STREAM_REFRESH_SECONDS: new cameras
+    are attached, and deactivated, deleted or re-pointed ones are stopped.
+    """
+
+    def __init__(self):
+        self.streams: dict[uuid.UUID, CameraStream] = {}
+        # Stopped streams still flushing their last session
+        self._retiring: set[asyncio.Task] = set()
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.STREAM_MAX_CAMERAS, thread_name_prefix="stream"
+        )
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def active_cameras(self) -> list[Camera]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Camera)
+                .where(Camera.active.is_(True), Camera.rtsp_url.isnot(None), Camera.rtsp_url != "")
+                .order_by(Camera.created_at)
+            )
+            return [camera for camera in result.scalars().all() if owns_camera(camera.id)]
+
+    async def sync(self) -> None:
+        cameras = {camera.id: camera for camera in await self.active_cameras()}
+
+        for camera_id, stream in list(self.streams.items()):
+            camera = cameras.get(camera_id)
+            if camera is None or camera.rtsp_url != stream.url or stream.task.done():
+                stream.stop()
+                del self.streams[camera_id]
+                if not stream.task.done():
+                    self._retiring.add(stream.task)
+                    stream.task.add_done_callback(self._retiring.discard)
+
+        for camera_id, camera in cameras.items():
+            if camera_id in self.streams:
+                continue
+            if len(self.streams) >= settings.STREAM_MAX_CAMERAS:
+                logger.warning(
+                    "Stream capacity reached",
+                    max_cameras=settings.STREAM_MAX_CAMERAS,
+                    skipped=len(cameras) - len(self.streams),
+                )
+                break
+            stream = CameraStream(camera, self.executor)
+            stream.start()
+            self.streams[camera_id] = stream
+            logger.info("Stream attached", camera_id=str(camera_id), url=redact_url(camera.rtsp_url))
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error("Failed to refresh camera list", error=str(e))
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=settings.STREAM_REFRESH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def shutdown(self) -> None:
+        for stream in self.streams.values():
+            stream.stop()
+        tasks = [stream.task for stream in self.streams.values() if stream.task]
+        tasks.extend(self._retiring)
+        if tasks:
+            await asyncio.wait(tasks, timeout=settings.WORKER_SHUTDOWN_TIMEOUT)
+        self.executor.shutdown(wait=False)
+
+
+async def main():
+    supervisor = StreamSupervisor()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, supervisor.stop)
+        except NotImplementedError:
+            pass
+
+    logger.info(
+        "Stream worker started",
+        max_cameras=settings.STREAM_MAX_CAMERAS,
+        shard=f"{settings.STREAM_SHARD_INDEX}/{settings.STREAM_SHARD_COUNT}",
+    )
+    try:
+        await supervisor.run()
+    finally:
+        await supervisor.shutdown()
+        await close_http_client()
+        logger.info("Stream worker stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
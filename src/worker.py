@@ -1,29 +1,52 @@
 import asyncio
+import hashlib
+import os
+import signal
 import uuid
-import cv2
+from contextlib import aclosing
 from datetime import datetime
-from io import BytesIO
 from pathlib import Path
 import tempfile
 import re
+import shutil
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 
+import httpx
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from redis.exceptions import RedisError
 
 from src.config import settings
 from src.logging_config import setup_logging, get_logger
-from src.models.upload import Upload, UploadStatus
-from src.models.event import Event, ReviewState
+from src.models.camera import Camera
+from src.models.upload import Upload, UploadSegment, UploadStatus
+from src.models.event import Event
 from src.models.bolo import BOLO, BOLOMatch
+from src.detectors.sampling import probe_video
 from src.services.queue import queue_service
 from src.services.storage import get_storage_service
-from src.services.detector_adapter import DetectorAdapter
+from src.services.detector_adapter import CHECKPOINT_FRAME, DetectorAdapter
+from src.services.detection_stage import stream_detections
+from src.services.http import get_http_client, close_http_client
+from src.services.event_writer import EventWriter, build_event_row, event_id_for
+from src.services.crop_uploader import CropUploader
+from src.services.scheduler import JobScheduler, job_type_of
+from src.services.segments import SEGMENT_JOB_TYPE, plan_segments, segment_job
+from src.services.sampling_policy import choose_sampling_fps
+from src.services.checkpoints import JobProgress, checkpoint_store
 from prometheus_client import Counter, Gauge
 
 setup_logging()
 logger = get_logger(__name__)
 
-engine = create_async_engine(settings.DATABASE_URL)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    pool_size=max(5, settings.WORKER_CONCURRENCY + 1),
+    max_overflow=settings.WORKER_CONCURRENCY,
+)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
 storage_service = get_storage_service()
@@ -34,6 +57,9 @@ events_failed = Counter('anpr_events_failed', 'Total events failed')
 jobs_processed = Counter('anpr_jobs_processed', 'Total jobs processed')
 jobs_failed = Counter('anpr_jobs_failed', 'Total jobs failed')
 queue_size = Gauge('anpr_queue_size', 'Current queue size')
+queue_lane_depth = Gauge('anpr_queue_lane_depth', 'Queued jobs per priority lane', ['lane'])
+jobs_in_flight = Gauge('anpr_jobs_in_flight', 'Jobs currently being processed by this worker')
+jobs_dead_lettered = Counter('anpr_jobs_dead_lettered', 'Jobs dead-lettered after repeated failures')
 
 
 async def process_job(job_data: dict):
@@ -48,155 +74,568 @@ async def process_job(job_data: dict):
             logger.error("Upload not found", upload_id=str(upload_id))
             return
 
+        if upload.status in (UploadStatus.DONE, UploadStatus.FAILED):
+            # Delivered again after it finished, e.g. a crash before the ack
+            logger.info("Upload already finished", job_id=job_id, status=upload.status.value)
+            await checkpoint_store.clear(job_id)
+            return
+
+        if job_type_of(job_data) == SEGMENT_JOB_TYPE:
+            await process_segment_job(db, upload, job_data)
+            return
+
+        if upload.segments_total is not None:
+            # An earlier attempt already split the upload; its segments carry on
+            logger.info("Upload already split", job_id=job_id, segments=upload.segments_total)
+            await checkpoint_store.clear(job_id)
+            return
+
+        video_path = None
         try:
+            camera = await db.get(Camera, upload.camera_id) if upload.camera_id else None
+            if not job_data.get("sampling_fps"):
+                # A retry keeps the rate its checkpoint was recorded at
+                fps = upload.sampling_fps or await job_sampling_fps(camera)
+                job_data = {**job_data, "sampling_fps": fps}
+            if await checkpoint_store.begin(job_data) is None:
+                logger.info("Requeued job already finished", job_id=job_id)
+                return
+            upload.sampling_fps = job_data["sampling_fps"]
             upload.status = UploadStatus.PROCESSING
-            upload.started_at = datetime.utcnow()
+            upload.started_at = upload.started_at or datetime.utcnow()
             await db.commit()
 
             logger.info("Processing upload", job_id=job_id, upload_id=str(upload_id))
 
             video_path = await download_video(job_data["storage_path"])
 
-            events_count = 0
-            for detection in detector.process_video(video_path, job_data.get("camera_id")):
-                event = await save_event(db, upload, detection)
-                if event:
-                    events_count += 1
-                    events_processed.inc()
-                    await check_bolos(db, event)
+            probe = await asyncio.to_thread(probe_video, video_path)
+            segments = plan_segments(probe["frames"], probe["fps"])
+            if len(segments) > 1:
+                await split_upload(db, upload, job_data, segments)
+                return
 
+            stats: dict = {}
+            events_count = await detect_and_save(db, upload, job_data, video_path, stats)
             upload.status = UploadStatus.DONE
             upload.completed_at = datetime.utcnow()
             upload.events_detected = events_count
+            upload.meta_data = {**(upload.meta_data or {}), "summary": job_summary(stats)}
             await db.commit()
 
-            Path(video_path).unlink(missing_ok=True)
+            await checkpoint_store.clear(job_id)
 
-            logger.info("Upload processed", job_id=job_id, events=events_count)
+            logger.info("Upload processed", job_id=job_id, events=events_count, **stats)
             jobs_processed.inc()
 
         except Exception as e:
+            if await should_retry(job_data, e):
+                # Keep the checkpoint; the retry resumes from it
+                logger.warning("Job failed, will retry", job_id=job_id, error=str(e))
+                await db.rollback()
+                raise
             logger.error("Job processing failed", job_id=job_id, error=str(e))
             upload.status = UploadStatus.FAILED
             upload.error_message = str(e)
             upload.completed_at = datetime.utcnow()
             await db.commit()
+            await checkpoint_store.clear(job_id)
             jobs_failed.inc()
 
+        finally:
+            if video_path:
+                Path(video_path).unlink(missing_ok=True)
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether an error is a dependency being briefly unavailable rather than a bad job."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    if isinstance(error, DBAPIError):
+        return error.connection_invalidated
+    return isinstance(error, (httpx.TransportError, RedisError, ConnectionError, TimeoutError))
 
-async def download_video(storage_path: str) -> str:
-    url = await storage_service.get_presigned_url(settings.STORAGE_BUCKET, storage_path)
 
-    import httpx
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url)
-        response.raise_for_status()
+async def should_retry(job_data: dict, error: Exception) -> bool:
+    """Whether to hand a failed job back to the queue instead of failing its upload.
 
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
-        temp_file.write(response.content)
-        temp_file.close()
+    Only leased jobs (QUEUE_RELIABLE) are retried, and only while they have
+    attempts left, so the last attempt still records the failure.
+    """
+    if not is_transient(error):
+        return False
+    try:
+        return await queue_service.retries_left("video_processing", job_data) > 0
+    except Exception:
+        return False
+
+
+async def job_sampling_fps(camera: Camera | None) -> float:
+    """Frame sampling rate for a job starting now, given the queue backlog."""
+    depth = await queue_service.get_queue_length("video_processing")
+    oldest_age = await queue_service.get_oldest_job_age("video_processing")
+    fps = choose_sampling_fps(
+        depth,
+        oldest_age,
+        min_fps=camera.min_sampling_fps if camera else None,
+        max_fps=camera.max_sampling_fps if camera else None,
+    )
+    logger.info("Sampling rate chosen", fps=fps, queue_depth=depth, oldest_age=round(oldest_age, 1))
+    return fps
+
+
+async def detect_and_save(
+    db: AsyncSession,
+    upload: Upload,
+    job_data: dict,
+    video_path: str,
+    stats: dict,
+) -> int:
+    """Run detection over the job's frame range and store its events.
+
+    Resumes from the job's checkpoint when an earlier attempt left one, and
+    returns the job's total event count including the checkpointed events.
+    """
+    camera = await db.get(Camera, upload.camera_id) if upload.camera_id else None
+    checkpoint = await checkpoint_store.begin(job_data) or {"frame": 0, "events": 0}
+    start_frame = max(job_data.get("start_frame") or 0, checkpoint["frame"])
+    if start_frame > (job_data.get("start_frame") or 0):
+        logger.info("Resuming job", job_id=job_data["job_id"], frame=start_frame, events=checkpoint["events"])
+    progress = JobProgress(checkpoint_store, job_data["job_id"], start_frame, checkpoint["events"])
+
+    detections = stream_detections(
+        lambda: detector.process_video(
+            video_path,
+            job_data.get("camera_id"),
+            stats,
+            motion_sensitivity=camera.motion_sensitivity if camera else None,
+            roi=camera.roi if camera else None,
+            start_frame=start_frame,
+            end_frame=job_data.get("end_frame"),
+            sampling_fps=job_data.get("sampling_fps"),
+            checkpoints=True,
+        )
+    )
+    return checkpoint["events"] + await store_detections(db, upload, detections, progress)
+
+
+async def store_detections(
+    db: AsyncSession,
+    upload: Upload,
+    detections,
+    progress: JobProgress | None = None,
+) -> int:
+    """Upload crops and write events for a detection stream; return rows written.
+
+    With `progress`, checkpoint markers in the stream are saved every
+    CHECKPOINT_INTERVAL_SECONDS, after the rows before them are committed.
+    """
+    writer = EventWriter(db, on_flush=lambda events: on_events_saved(db, events))
+    uploader = CropUploader(storage_service)
+    async with writer, uploader, aclosing(detections):
+        async for detection in detections:
+            if CHECKPOINT_FRAME in detection:
+                if progress is not None and progress.due():
+                    await persist_uploaded(writer, await uploader.drain(), progress)
+                    await writer.flush()
+                    await progress.save(detection[CHECKPOINT_FRAME])
+                continue
+            await save_event(uploader, upload, detection)
+            await persist_uploaded(writer, uploader.completed(), progress)
+        await persist_uploaded(writer, await uploader.drain(), progress)
+
+    return writer.rows_written
+
+
+async def split_upload(db: AsyncSession, upload: Upload, job_data: dict, segments: list) -> None:
+    """Enqueue every segment of an upload as a sub-job.
+
+    The segment count is committed only once all of them are queued: a
+    job that dies before then is split again when it is redelivered
+    (segments queued twice are merged once), and one redelivered after
+    it finds the upload split and leaves the segments to carry on.
+    """
+    jobs = [segment_job(job_data, i, segment) for i, segment in enumerate(segments)]
+    if job_data.get("cost"):
+        for job in jobs:
+            job["cost"] = job_data["cost"] / len(jobs)
+    for job in jobs:
+        await queue_service.enqueue("video_processing", job)
+
+    upload.segments_total = len(segments)
+    upload.segments_done = 0
+    upload.segments_failed = 0
+    await db.commit()
+    await checkpoint_store.clear(job_data["job_id"])
+
+    logger.info("Upload split into segments", job_id=job_data["job_id"], segments=len(segments))
 
-        logger.info("Video downloaded", path=temp_file.name)
-        return temp_file.name
 
+async def process_segment_job(db: AsyncSession, upload: Upload, job_data: dict):
+    if await db.get(UploadSegment, (upload.id, job_data["segment"])) is not None:
+        logger.info("Segment already finished", job_id=job_data["job_id"])
+        await checkpoint_store.clear(job_data["job_id"])
+        return
+    if await checkpoint_store.begin(job_data) is None:
+        logger.info("Requeued segment already finished", job_id=job_data["job_id"])
+        return
 
-async def save_event(db: AsyncSession, upload: Upload, detection: dict) -> Event:
-    crop_path = f"crops/{upload.id}/{uuid.uuid4()}.jpg"
+    video_path = None
+    try:
+        video_path = await download_video(job_data["storage_path"])
+    except Exception as e:
+        if await should_retry(job_data, e):
+            logger.warning("Segment download failed, will retry", job_id=job_data["job_id"], error=str(e))
+            raise
+        logger.error("Segment download failed", job_id=job_data["job_id"], error=str(e))
+        await complete_segment(db, upload, job_data, 0, str(e))
+        return
+
+    try:
+        await run_segment(db, upload, job_data, video_path)
+    finally:
+        Path(video_path).unlink(missing_ok=True)
 
-    crop_bytes = cv2.imencode('.jpg', detection["crop"])[1].tobytes()
-    crop_file = BytesIO(crop_bytes)
 
-    await storage_service.upload_file(
-        crop_file,
-        settings.STORAGE_CROPS_BUCKET,
-        crop_path,
-        "image/jpeg"
+async def run_segment(db: AsyncSession, upload: Upload, job_data: dict, video_path: str):
+    job_id = job_data["job_id"]
+    logger.info(
+        "Processing segment",
+        job_id=job_id,
+        start_frame=job_data["start_frame"],
+        end_frame=job_data["end_frame"],
     )
+    stats: dict = {}
+    try:
+        events_count = await detect_and_save(db, upload, job_data, video_path, stats)
+    except Exception as e:
+        await db.rollback()
+        if await should_retry(job_data, e):
+            logger.warning("Segment failed, will retry", job_id=job_id, error=str(e))
+            raise
+        logger.error("Segment processing failed", job_id=job_id, error=str(e))
+        await complete_segment(db, upload, job_data, 0, str(e))
+        return
+
+    logger.info("Segment processed", job_id=job_id, events=events_count, **stats)
+    await complete_segment(db, upload, job_data, events_count)
+
+
+async def complete_segment(
+    db: AsyncSession,
+    upload: Upload,
+    job_data: dict,
+    events_count: int,
+    error: str | None = None,
+):
+    """Merge one segment's result into its upload; the last one finishes it.
+
+    The segment's row in upload_segments is inserted first: a segment
+    delivered twice finds its row there and is not counted again. Counts
+    are merged with a single UPDATE so segments finishing at the same time
+    on different workers cannot overwrite each other.
+    """
+    recorded = await db.execute(
+        insert(UploadSegment)
+        .values(
+            upload_id=upload.id,
+            segment=job_data["segment"],
+            events_detected=events_count,
+            error_message=error,
+        )
+        .on_conflict_do_nothing()
+        .returning(UploadSegment.segment)
+    )
+    if recorded.scalar_one_or_none() is None:
+        await db.rollback()
+        await checkpoint_store.clear(job_data["job_id"])
+        logger.info("Segment result already merged", job_id=job_data["job_id"])
+        return
+
+    values = {
+        "events_detected": Upload.events_detected + events_count,
+        "segments_done": Upload.segments_done + 1,
+    }
+    if error is not None:
+        values["segments_failed"] = Upload.segments_failed + 1
+        values["error_message"] = f"Segment {job_data['segment']} failed: {error}"
 
-    event = Event(
-        upload_id=upload.id,
-        camera_id=detection["camera_id"] or upload.camera_id,
-        plate=detection["plate"],
-        normalized_plate=detection["normalized_plate"],
-        confidence=detection["confidence"],
-        bbox=detection["bbox"],
-        frame_no=detection["frame_no"],
-        captured_at=detection["captured_at"],
-        crop_path=crop_path,
-        review_state=ReviewState.UNREVIEWED,
+    result = await db.execute(
+        update(Upload)
+        .where(Upload.id == upload.id)
+        .values(**values)
+        .returning(Upload.segments_done, Upload.segments_total, Upload.segments_failed)
+        .execution_options(synchronize_session=False)
     )
-    db.add(event)
+    done, total, failed = result.one()
+
+    if total is not None and done >= total:
+        await db.execute(
+            update(Upload)
+            .where(Upload.id == upload.id)
+            .values(
+                status=UploadStatus.FAILED if failed else UploadStatus.DONE,
+                completed_at=datetime.utcnow(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if failed:
+            jobs_failed.inc()
+        else:
+            jobs_processed.inc()
+        logger.info("Segmented upload finished", upload_id=str(upload.id), segments=total, failed=failed)
     await db.commit()
-    await db.refresh(event)
+    await checkpoint_store.clear(job_data["job_id"])
 
-    logger.info("Event saved", event_id=str(event.id), plate=event.plate)
-    return event
 
+def job_summary(stats: dict) -> dict:
+    """Pick the per-job counters worth keeping on the upload row."""
+    keys = ("frames_decoded", "frames_motion", "frames_skipped_static", "batches", "frames")
+    return {key: stats[key] for key in keys if key in stats}
 
-async def check_bolos(db: AsyncSession, event: Event):
-    result = await db.execute(
-        select(BOLO).where(BOLO.active == True)
+
+async def download_video(storage_path: str) -> str:
+    url = await storage_service.get_presigned_url(settings.STORAGE_BUCKET, storage_path)
+
+    fd, path = tempfile.mkstemp(
+        suffix=Path(storage_path).suffix or ".mp4",
+        dir=settings.WORKER_TEMP_DIR or None,
     )
-    bolos = result.scalars().all()
+    chunk_size = settings.DOWNLOAD_CHUNK_SIZE
+    # Owns the descriptor from here on, so every path below closes it
+    f = os.fdopen(fd, "wb", buffering=chunk_size)
+    digest = hashlib.md5()
+    written = 0
+
+    if url.startswith("file://"):
+        f.close()
+        try:
+            await asyncio.to_thread(shutil.copyfile, url2pathname(urlparse(url).path), path)
+        except BaseException:
+            Path(path).unlink(missing_ok=True)
+            raise
+        logger.info("Video copied from local storage", path=path)
+        return path
+
+    try:
+        with f:
+            client = get_http_client()
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                expected_size = response.headers.get("content-length")
+                encoded = "content-encoding" in response.headers
+                etag = response.headers.get("etag", "").strip('"')
+
+                async for chunk in response.aiter_bytes(chunk_size):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+
+        if expected_size is not None and not encoded and int(expected_size) != written:
+            raise ValueError(
+                f"Incomplete download: expected {expected_size} bytes, got {written}"
+            )
+
+        # Single-part S3/MinIO ETags are the MD5 of the object; multipart ones
+        # carry a "-<parts>" suffix and cannot be checked this way.
+        if (
+            settings.DOWNLOAD_VERIFY_ETAG
+            and re.fullmatch(r"[0-9a-fA-F]{32}", etag)
+            and digest.hexdigest() != etag.lower()
+        ):
+            raise ValueError(f"Checksum mismatch for {storage_path}: ETag {etag}")
+
+    except BaseException:
+        Path(path).unlink(missing_ok=True)
+        raise
 
-    for bolo in bolos:
-        if bolo.expires_at and bolo.expires_at < datetime.utcnow():
+    logger.info("Video downloaded", path=path, bytes=written)
+    return path
+
+
+async def save_event(uploader: CropUploader, upload: Upload, detection: dict) -> None:
+    event_id = event_id_for(upload.id, detection["frame_no"], detection["bbox"])
+    crop_path = f"crops/{upload.id}/{event_id}.jpg"
+
+    camera_id = detection["camera_id"] or upload.camera_id
+    if isinstance(camera_id, str):
+        camera_id = uuid.UUID(camera_id)
+
+    row = build_event_row(upload.id, camera_id, detection, crop_path, event_id)
+    await uploader.submit(detection["crop"], crop_path, row)
+
+
+async def persist_uploaded(
+    writer: EventWriter, uploaded: list, progress: JobProgress | None = None
+) -> None:
+    for row, error in uploaded:
+        if error is not None:
+            events_failed.inc()
             continue
+        await writer.add(row)
+        if progress is not None:
+            progress.written(row)
 
-        if re.search(bolo.plate_pattern, event.normalized_plate, re.IGNORECASE):
-            match = BOLOMatch(
-                bolo_id=bolo.id,
-                event_id=event.id,
-            )
-            db.add(match)
-            await db.commit()
 
-            logger.warning(
-                "BOLO match detected",
-                bolo_id=str(bolo.id),
-                event_id=str(event.id),
-                plate=event.plate,
-            )
+async def on_events_saved(db: AsyncSession, events: list[Event]):
+    events_processed.inc(len(events))
+    await check_bolos(db, events)
+
 
-            await send_bolo_notification(bolo, event)
+async def check_bolos(db: AsyncSession, events: list[Event]):
+    result = await db.execute(
+        select(BOLO).where(BOLO.active == True)
+    )
+    now = datetime.utcnow()
+    bolos = [
+        bolo for bolo in result.scalars().all()
+        if not (bolo.expires_at and bolo.expires_at < now)
+    ]
+    if not bolos:
+        return
+
+    matches = []
+    for event in events:
+        for bolo in bolos:
+            if re.search(bolo.plate_pattern, event.normalized_plate, re.IGNORECASE):
+                db.add(BOLOMatch(bolo_id=bolo.id, event_id=event.id))
+                matches.append((bolo, event))
+
+                logger.warning(
+                    "BOLO match detected",
+                    bolo_id=str(bolo.id),
+                    event_id=str(event.id),
+                    plate=event.plate,
+                )
+
+    if matches:
+        await db.commit()
+        await asyncio.gather(*(send_bolo_notification(bolo, event) for bolo, event in matches))
 
 
 async def send_bolo_notification(bolo: BOLO, event: Event):
     try:
         if bolo.notification_webhook:
-            import httpx
-            async with httpx.AsyncClient() as client:
-                await client.post(
-                    bolo.notification_webhook,
-                    json={
-                        "bolo_id": str(bolo.id),
-                        "event_id": str(event.id),
-                        "plate": event.plate,
-                        "confidence": event.confidence,
-                        "captured_at": event.captured_at.isoformat(),
-                    },
-                    timeout=10.0,
-                )
+            client = get_http_client()
+            await client.post(
+                bolo.notification_webhook,
+                json={
+                    "bolo_id": str(bolo.id),
+                    "event_id": str(event.id),
+                    "plate": event.plate,
+                    "confidence": event.confidence,
+                    "captured_at": event.captured_at.isoformat(),
+                },
+                timeout=10.0,
+            )
             logger.info("BOLO webhook sent", bolo_id=str(bolo.id))
 
     except Exception as e:
         logger.error("Failed to send BOLO notification", error=str(e))
 
 
-async def worker_loop():
-    logger.info("Worker started", concurrency=settings.WORKER_CONCURRENCY)
+async def fetch_job() -> dict | None:
+    job = await queue_service.dequeue("video_processing", timeout=5)
+    if job:
+        queue_size.set(await queue_service.get_queue_length("video_processing"))
+        for lane, depth in (await queue_service.get_lane_lengths("video_processing")).items():
+            queue_lane_depth.labels(lane=lane).set(depth)
+    return job
 
+
+async def run_job(job: dict):
+    jobs_in_flight.inc()
+    try:
+        await process_job(job)
+    except asyncio.CancelledError:
+        await queue_service.release("video_processing", job)
+        raise
+    except Exception:
+        await queue_service.fail("video_processing", job)
+        raise
+    else:
+        await queue_service.ack("video_processing", job)
+    finally:
+        jobs_in_flight.dec()
+
+
+async def keep_lease(job: dict):
+    """Renew a job's queue lease until it ends; runs from dequeue, see JobScheduler."""
     while True:
+        await asyncio.sleep(settings.QUEUE_LEASE_SECONDS / 3)
+        try:
+            if not await queue_service.renew("video_processing", job):
+                logger.warning("Job lease lost", job_id=job.get("job_id"))
+                return
+        except Exception as e:
+            logger.error("Job lease renewal failed", job_id=job.get("job_id"), error=str(e))
+
+
+async def requeue_stalled_jobs() -> int:
+    """Requeue jobs whose checkpoint went stale because their worker died."""
+    requeued = 0
+    for payload in await checkpoint_store.stalled(settings.CHECKPOINT_STALE_SECONDS):
+        job_id = payload["job_id"]
+        if not await checkpoint_store.claim(job_id):
+            continue
+        await queue_service.enqueue("video_processing", {**payload, "resume": True})
+        logger.warning("Requeued stalled job", job_id=job_id)
+        requeued += 1
+    return requeued
+
+
+async def watch_stalled_jobs(scheduler: JobScheduler):
+    """Put jobs of dead workers back on the queue.
+
+    With the reliable queue that is any job whose lease expired; otherwise
+    a job whose checkpoint stopped moving. In that mode this worker's own
+    running jobs get a heartbeat on every pass, so they never look stalled.
+    """
+    if settings.QUEUE_RELIABLE:
+        interval = settings.QUEUE_LEASE_SECONDS / 4
+    else:
+        interval = min(settings.CHECKPOINT_INTERVAL_SECONDS, settings.CHECKPOINT_STALE_SECONDS / 4)
+    while not scheduler.stopping:
         try:
-            job = await queue_service.dequeue("video_processing", timeout=5)
-            if job:
-                queue_size.set(await queue_service.get_queue_length("video_processing"))
-                await process_job(job)
+            if settings.QUEUE_RELIABLE:
+                _, dead = await queue_service.reclaim("video_processing")
+                jobs_dead_lettered.inc(dead)
             else:
-                await asyncio.sleep(1)
+                await checkpoint_store.heartbeat()
+                await requeue_stalled_jobs()
         except Exception as e:
-            logger.error("Worker error", error=str(e))
-            await asyncio.sleep(5)
+            logger.error("Stalled job check failed", error=str(e))
+        await asyncio.sleep(interval)
+
+
+async def worker_loop():
+    logger.info(
+        "Worker started",
+        concurrency=settings.WORKER_CONCURRENCY,
+        type_limits=settings.worker_job_type_limits,
+    )
+
+    scheduler = JobScheduler(
+        run_job,
+        concurrency=settings.WORKER_CONCURRENCY,
+        type_limits=settings.worker_job_type_limits,
+        keepalive=keep_lease if settings.QUEUE_RELIABLE else None,
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, scheduler.stop)
+        except NotImplementedError:
+            pass
+
+    watcher = asyncio.create_task(watch_stalled_jobs(scheduler))
+    try:
+        await scheduler.run(fetch_job)
+    finally:
+        watcher.cancel()
+        await scheduler.shutdown(timeout=settings.WORKER_SHUTDOWN_TIMEOUT)
+        logger.info("Worker stopped")
 
 
 async def main():
@@ -204,6 +643,7 @@ async def main():
     try:
         await worker_loop()
     finally:
+        await close_http_client()
         await queue_service.disconnect()
 
 
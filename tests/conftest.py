@@ -1,7 +1,12 @@
+import os
+
 import pytest
 import asyncio
 from typing import AsyncGenerator
 
+# The worker builds its storage client at import; tests never talk to MinIO
+os.environ.setdefault("STORAGE_BACKEND", "local")
+
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
@@ -53,3 +53,81 @@ async def test_list_cameras(client: AsyncClient, admin_token):
     data = response.json()
     assert len(data) >= 1
     assert data[0]["name"] == "Camera 1"
+
+
+@pytest.mark.asyncio
+async def test_camera_motion_sensitivity(client: AsyncClient, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await client.post(
+        "/api/cameras",
+        headers=headers,
+        json={"name": "Gate Camera", "lat": 40.0, "lon": -74.0, "motion_sensitivity": 0.8},
+    )
+    assert response.status_code == 201
+    assert response.json()["motion_sensitivity"] == 0.8
+
+    response = await client.patch(
+        f"/api/cameras/{response.json()['id']}",
+        headers=headers,
+        json={"motion_sensitivity": 1.5},
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_camera_roi(client: AsyncClient, admin_token, clerk_token):
+    response = await client.post(
+        "/api/cameras",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"name": "Lane Camera", "lat": 40.0, "lon": -74.0},
+    )
+    camera_id = response.json()["id"]
+    roi = {"regions": [{"type": "rect", "x1": 0.0, "y1": 0.5, "x2": 1.0, "y2": 1.0}]}
+
+    response = await client.put(
+        f"/api/cameras/{camera_id}/roi",
+        headers={"Authorization": f"Bearer {clerk_token}"},
+        json=roi,
+    )
+    assert response.status_code == 403
+
+    response = await client.put(
+        f"/api/cameras/{camera_id}/roi",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json=roi,
+    )
+    assert response.status_code == 200
+
+    response = await client.get(
+        f"/api/cameras/{camera_id}/roi",
+        headers={"Authorization": f"Bearer {clerk_token}"},
+    )
+    assert response.status_code == 200
+    assert response.json() == roi
+
+
+@pytest.mark.asyncio
+async def test_camera_sampling_bounds(client: AsyncClient, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await client.post(
+        "/api/cameras",
+        headers=headers,
+        json={"name": "Gate Camera", "lat": 40.0, "lon": -74.0, "min_sampling_fps": 5, "max_sampling_fps": 2},
+    )
+    assert response.status_code == 422
+
+    response = await client.post(
+        "/api/cameras",
+        headers=headers,
+        json={"name": "Gate Camera", "lat": 40.0, "lon": -74.0, "max_sampling_fps": 2},
+    )
+    assert response.status_code == 201
+
+    # A partial update is checked against the stored bounds
+    camera_url = f"/api/cameras/{response.json()['id']}"
+    response = await client.patch(camera_url, headers=headers, json={"min_sampling_fps": 5})
+    assert response.status_code == 422
+
+    response = await client.patch(camera_url, headers=headers, json={"min_sampling_fps": 1})
+    assert response.status_code == 200
+    assert response.json()["min_sampling_fps"] == 1
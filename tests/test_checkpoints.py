@@ -0,0 +1,149 @@
+import time
+
+import cv2
+import fakeredis
+import fakeredis.aioredis
+import numpy as np
+import pytest
+
+from src.config import settings
+from src.detectors.registry import DetectorPlugin
+from src.services.checkpoints import CheckpointStore, JobProgress
+from src.services.detector_adapter import CHECKPOINT_FRAME, DetectorAdapter
+
+
+def fake_redis():
+    return fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+
+class Vehicles(DetectorPlugin):
+    """Three vehicles passing one after another."""
+
+    name = "vehicles"
+    spans = [("ABC123", 0, 30, 2, 4), ("KLM456", 36, 70, 40, 34), ("XYZ789", 80, 120, 2, 4)]
+
+    def load(self):
+        pass
+
+    def detect_batch(self, frames):
+        detections = []
+        for frame_no, frame in frames:
+            for plate, first, last, x, y in self.spans:
+                if first <= frame_no <= last:
+                    detections.append({
+                        "plate": plate,
+                        "confidence": 0.9,
+                        "bbox": {"x1": x, "y1": y, "x2": x + 20, "y2": y + 10},
+                        "frame_no": frame_no,
+                        "crop": frame[y:y + 10, x:x + 20],
+                    })
+        return detections
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = str(tmp_path / "checkpoint.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 24, (64, 48))
+    for i in range(120):
+        writer.write(np.full((48, 64, 3), i * 2, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_resume_from_checkpoint_yields_the_rest(monkeypatch, video_path):
+    monkeypatch.setattr(settings, "FRAME_EXTRACTION_FPS", 4)
+    monkeypatch.setattr(settings, "WORKER_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "MOTION_GATE_ENABLED", False)
+    monkeypatch.setattr(settings, "TRACKING_ENABLED", True)
+    monkeypatch.setattr(settings, "SEGMENT_OVERLAP_SECONDS", 1.0)
+    adapter = DetectorAdapter(confidence_threshold=0.5, detector=Vehicles())
+
+    items = list(adapter.process_video(video_path, "cam-1", checkpoints=True))
+    markers = [item[CHECKPOINT_FRAME] for item in items if CHECKPOINT_FRAME in item]
+    events = [(item["plate"], item["first_frame_no"]) for item in items if CHECKPOINT_FRAME not in item]
+
+    assert events == [("ABC123", 0), ("KLM456", 36), ("XYZ789", 84)]
+    assert markers == sorted(markers)
+
+    for marker in set(markers):
+        resumed = [
+            (d["plate"], d["first_frame_no"])
+            for d in adapter.process_video(video_path, "cam-1", start_frame=marker)
+        ]
+        assert resumed == [event for event in events if event[1] >= marker]
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_store_round_trip():
+    store = CheckpointStore(fake_redis())
+    job = {"job_id": "job-1", "upload_id": "u", "start_frame": 100}
+
+    assert await store.begin(job) == {"frame": 100, "events": 0}
+    await store.save("job-1", 250, 7)
+    assert await store.begin(job) == {"frame": 250, "events": 7}
+
+    await store.clear("job-1")
+    assert await store.begin({**job, "resume": True}) is None
+
+
+@pytest.mark.asyncio
+async def test_stalled_jobs_are_claimed_once(monkeypatch):
+    redis = fake_redis()
+    store = CheckpointStore(redis)
+    await store.begin({"job_id": "old", "upload_id": "u"})
+    await store.begin({"job_id": "fresh", "upload_id": "u"})
+    await redis.hset("checkpoint:old", mapping={"updated_at": time.time() - 1000})
+
+    stalled = await store.stalled(600)
+
+    assert [payload["job_id"] for payload in stalled] == ["old"]
+    assert await store.claim("old")
+    assert not await store.claim("old")
+    # The claim does not show up as a checkpoint of its own
+    assert [payload["job_id"] for payload in await store.stalled(600)] == ["old"]
+
+
+@pytest.mark.asyncio
+async def test_claim_holds_until_the_requeued_job_starts():
+    redis = fake_redis()
+    store = CheckpointStore(redis)
+    job = {"job_id": "old", "upload_id": "u"}
+    await store.begin(job)
+    assert await store.claim("old")
+
+    # Still waiting in the queue long after the stale window
+    await redis.hset("checkpoint:old", mapping={"updated_at": time.time() - 5000})
+    assert not await store.claim("old")
+
+    await store.begin({**job, "resume": True})
+    await redis.hset("checkpoint:old", mapping={"updated_at": time.time() - 1000})
+    assert await store.claim("old")
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_keeps_running_jobs_fresh():
+    redis = fake_redis()
+    store = CheckpointStore(redis)
+    await store.begin({"job_id": "running", "upload_id": "u"})
+    await store.begin({"job_id": "done", "upload_id": "u"})
+    await store.clear("done")
+    # Downloading or motion-gated: no checkpoint saved for a long time
+    await redis.hset("checkpoint:running", mapping={"updated_at": time.time() - 1000})
+
+    await store.heartbeat()
+
+    assert await store.stalled(600) == []
+    assert not await redis.exists("checkpoint:done")
+
+
+@pytest.mark.asyncio
+async def test_job_progress_counts_events_before_the_checkpoint():
+    redis = fake_redis()
+    progress = JobProgress(CheckpointStore(redis), "job-1", frame=0, events=3)
+    for first_frame in (10, 40, 55):
+        progress.written({"frame_no": first_frame + 5, "first_frame_no": first_frame})
+
+    await progress.save(50)
+
+    assert (progress.frame, progress.events) == (50, 5)
+    assert await redis.hget("checkpoint:job-1", "events") == "5"
@@ -0,0 +1,90 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.services.crop_uploader import CropUploader
+
+
+class FakeStorage:
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.uploaded = []
+        self.active = 0
+        self.peak = 0
+
+    async def upload_file(self, file, bucket, object_name, content_type="application/octet-stream"):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("storage unavailable")
+            self.uploaded.append((bucket, object_name, file.read()[:2]))
+            return object_name
+        finally:
+            self.active -= 1
+
+
+def crop():
+    return np.zeros((20, 60, 3), dtype=np.uint8)
+
+
+@pytest.mark.asyncio
+async def test_crop_uploader_bounds_concurrency():
+    storage = FakeStorage(delay=0.02)
+    uploader = CropUploader(storage, bucket="crops", concurrency=2, retries=0)
+
+    for i in range(6):
+        await uploader.submit(crop(), f"crops/{i}.jpg", payload=i)
+    results = await uploader.drain()
+
+    assert sorted(payload for payload, _ in results) == list(range(6))
+    assert all(error is None for _, error in results)
+    assert storage.peak == 2
+    assert all(data == b"\xff\xd8" for _, _, data in storage.uploaded)
+
+
+@pytest.mark.asyncio
+async def test_crop_uploader_retries_then_succeeds():
+    storage = FakeStorage(failures=2)
+    uploader = CropUploader(storage, bucket="crops", retries=2, retry_backoff=0.001)
+
+    await uploader.submit(crop(), "crops/a.jpg", payload="a")
+    results = await uploader.drain()
+
+    assert results == [("a", None)]
+    assert len(storage.uploaded) == 1
+
+
+@pytest.mark.asyncio
+async def test_crop_uploader_reports_failure_after_retries():
+    storage = FakeStorage(failures=5)
+    uploader = CropUploader(storage, bucket="crops", retries=1, retry_backoff=0.001)
+
+    await uploader.submit(crop(), "crops/a.jpg", payload="a")
+    [(payload, error)] = await uploader.drain()
+
+    assert payload == "a"
+    assert isinstance(error, ConnectionError)
+    assert storage.uploaded == []
+
+
+@pytest.mark.asyncio
+async def test_crop_uploader_cancel_before_start_frees_slots():
+    storage = FakeStorage()
+    uploader = CropUploader(storage, bucket="crops", concurrency=2, retries=0)
+
+    # Cancelled before the tasks get to run
+    await uploader.submit(crop(), "crops/a.jpg")
+    await uploader.submit(crop(), "crops/b.jpg")
+    await uploader.cancel()
+
+    await asyncio.wait_for(uploader.submit(crop(), "crops/c.jpg", payload="c"), timeout=1)
+    await asyncio.wait_for(uploader.submit(crop(), "crops/d.jpg", payload="d"), timeout=1)
+    results = await uploader.drain()
+
+    assert sorted(payload for payload, _ in results) == ["c", "d"]
+    assert [name for _, name, _ in storage.uploaded] == ["crops/c.jpg", "crops/d.jpg"]
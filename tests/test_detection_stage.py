@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.services.detection_stage import stream_detections
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=2)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+@pytest.mark.asyncio
+async def test_stream_detections_yields_in_order(executor):
+    def generate():
+        for i in range(5):
+            time.sleep(0.01)
+            yield i
+
+    items = [item async for item in stream_detections(generate, maxsize=2, executor=executor)]
+    assert items == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_stream_detections_does_not_block_event_loop(executor):
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    def generate():
+        time.sleep(0.2)
+        yield "done"
+
+    task = asyncio.create_task(ticker())
+    items = [item async for item in stream_detections(generate, executor=executor)]
+    task.cancel()
+
+    assert items == ["done"]
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_stream_detections_applies_backpressure(executor):
+    produced = 0
+
+    def generate():
+        nonlocal produced
+        for i in range(100):
+            produced += 1
+            yield i
+
+    stream = stream_detections(generate, maxsize=3, executor=executor)
+    assert await stream.__anext__() == 0
+    await asyncio.sleep(0.1)
+    assert produced <= 5
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_detections_propagates_errors_and_closes_generator(executor):
+    closed = threading.Event()
+
+    def generate():
+        try:
+            yield 1
+            raise ValueError("decode failed")
+        finally:
+            closed.set()
+
+    with pytest.raises(ValueError):
+        async for _ in stream_detections(generate, executor=executor):
+            pass
+    assert closed.is_set()
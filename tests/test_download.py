@@ -0,0 +1,107 @@
+import hashlib
+import os
+from pathlib import Path
+
+import httpx
+import pytest
+
+from src import worker
+from src.config import settings
+
+VIDEO = bytes(range(256)) * 40
+
+
+class Presigner:
+    async def get_presigned_url(self, bucket, object_name, expiry=3600):
+        return f"http://storage.test/{bucket}/{object_name}"
+
+
+@pytest.fixture
+def serve(monkeypatch, tmp_path):
+    """Serve downloads from `handler` and keep the temp files in tmp_path."""
+    monkeypatch.setattr(settings, "WORKER_TEMP_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "DOWNLOAD_CHUNK_SIZE", 1024)
+    monkeypatch.setattr(worker, "storage_service", Presigner())
+
+    def serve(handler):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(worker, "get_http_client", lambda: client)
+
+    return serve
+
+
+def open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+async def chunks(data, size=1000):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+@pytest.mark.asyncio
+async def test_download_streams_and_verifies_the_etag(serve, tmp_path):
+    etag = hashlib.md5(VIDEO).hexdigest()
+    serve(lambda request: httpx.Response(
+        200,
+        headers={"Content-Length": str(len(VIDEO)), "ETag": f'"{etag}"'},
+        content=chunks(VIDEO),
+    ))
+
+    path = await worker.download_video("uploads/a.mp4")
+
+    assert Path(path).parent == tmp_path
+    assert Path(path).suffix == ".mp4"
+    assert Path(path).read_bytes() == VIDEO
+
+
+@pytest.mark.asyncio
+async def test_short_download_is_rejected(serve, tmp_path):
+    serve(lambda request: httpx.Response(
+        200, headers={"Content-Length": str(len(VIDEO) + 10)}, content=chunks(VIDEO)
+    ))
+
+    with pytest.raises(ValueError, match="Incomplete download"):
+        await worker.download_video("uploads/a.mp4")
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_checksum_mismatch_is_rejected(serve, tmp_path):
+    serve(lambda request: httpx.Response(
+        200,
+        headers={"ETag": f'"{hashlib.md5(b"other").hexdigest()}"'},
+        content=chunks(VIDEO),
+    ))
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        await worker.download_video("uploads/a.mp4")
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_multipart_etag_is_not_checked(serve):
+    serve(lambda request: httpx.Response(200, headers={"ETag": '"abc-3"'}, content=VIDEO))
+
+    assert Path(await worker.download_video("uploads/a.mp4")).read_bytes() == VIDEO
+
+
+def unavailable(request):
+    return httpx.Response(503)
+
+
+def refused(request):
+    raise httpx.ConnectError("connection refused", request=request)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fail", [unavailable, refused])
+async def test_failed_request_leaves_no_file_or_descriptor(serve, tmp_path, fail):
+    serve(fail)
+    before = open_fds()
+
+    with pytest.raises(httpx.HTTPError):
+        await worker.download_video("uploads/a.mp4")
+
+    assert list(tmp_path.iterdir()) == []
+    assert open_fds() == before
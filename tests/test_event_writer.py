@@ -0,0 +1,96 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, func
+
+from src.models.camera import Camera
+from src.models.event import Event
+from src.models.upload import Upload, UploadStatus
+from src.services.event_writer import EventWriter, build_event_row
+
+
+async def make_upload(db_session, admin_user):
+    camera = Camera(name="Writer Cam", lat=40.0, lon=-74.0)
+    db_session.add(camera)
+    await db_session.flush()
+
+    upload = Upload(
+        job_id="writer-job",
+        camera_id=camera.id,
+        uploaded_by=admin_user.id,
+        filename="test.mp4",
+        storage_path="uploads/test.mp4",
+        file_size=1000,
+        status=UploadStatus.PROCESSING,
+    )
+    db_session.add(upload)
+    await db_session.commit()
+    return upload
+
+
+def make_detection(frame_no):
+    return {
+        "plate": "ABC123",
+        "normalized_plate": "ABC123",
+        "confidence": 0.9,
+        "bbox": {"x1": 10, "y1": 20, "x2": 110, "y2": 60},
+        "frame_no": frame_no,
+        "captured_at": datetime(2024, 1, 1, 12, 0, 0),
+    }
+
+
+@pytest.mark.asyncio
+async def test_event_writer_flushes_in_batches(db_session, admin_user):
+    upload = await make_upload(db_session, admin_user)
+    flushed = []
+
+    async def on_flush(events):
+        flushed.append(len(events))
+
+    async with EventWriter(db_session, on_flush=on_flush, batch_size=3) as writer:
+        for frame_no in range(7):
+            detection = make_detection(frame_no)
+            await writer.add(build_event_row(upload.id, upload.camera_id, detection, "crops/x.jpg"))
+
+    assert flushed == [3, 3, 1]
+    assert writer.rows_written == 7
+    count = await db_session.scalar(select(func.count()).select_from(Event))
+    assert count == 7
+
+
+@pytest.mark.asyncio
+async def test_event_writer_is_idempotent_on_retry(db_session, admin_user):
+    upload = await make_upload(db_session, admin_user)
+    rows = [
+        build_event_row(upload.id, upload.camera_id, make_detection(n), "crops/x.jpg")
+        for n in range(3)
+    ]
+
+    async with EventWriter(db_session) as writer:
+        for row in rows:
+            await writer.add(dict(row))
+    async with EventWriter(db_session) as retry:
+        for row in rows:
+            await retry.add(dict(row))
+
+    assert writer.rows_inserted == 3
+    assert retry.rows_inserted == 0
+    count = await db_session.scalar(select(func.count()).select_from(Event))
+    assert count == 3
+
+
+def test_build_event_row_carries_track_and_bbox_space():
+    upload_id, camera_id = uuid.uuid4(), uuid.uuid4()
+    detection = {
+        **make_detection(12),
+        "bbox_space": "source",
+        "first_frame_no": 4,
+        "last_frame_no": 20,
+    }
+
+    row = build_event_row(upload_id, camera_id, detection, "crops/x.jpg")
+
+    assert row["bbox_space"] == "source"
+    assert (row["first_frame_no"], row["frame_no"], row["last_frame_no"]) == (4, 12, 20)
+    assert build_event_row(upload_id, camera_id, make_detection(12), "c.jpg")["bbox_space"] is None
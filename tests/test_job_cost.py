@@ -0,0 +1,94 @@
+import io
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+import pytest
+
+from src.config import settings
+from src.models.upload import Upload, UploadStatus
+from src.services import job_cost
+from src.services.job_cost import estimate_cost, estimate_eta, probe_upload
+
+
+@pytest.fixture
+def video_bytes(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 20, (64, 48))
+    for i in range(40):
+        writer.write(np.full((48, 64, 3), i * 5, dtype=np.uint8))
+    writer.release()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_probe_upload_reads_the_container(video_bytes):
+    fileobj = io.BytesIO(video_bytes)
+    fileobj.seek(100)
+
+    probe = probe_upload(fileobj, "clip.avi")
+
+    assert probe["frames"] == 40
+    assert probe["fps"] == 20
+    assert (probe["width"], probe["height"]) == (64, 48)
+    assert probe["duration"] == 2.0
+    assert probe["codec"] == "MJPG"
+    assert fileobj.tell() == 0
+
+
+def test_probe_upload_reads_a_spooled_upload_in_place(video_bytes, monkeypatch):
+    fileobj = tempfile.SpooledTemporaryFile(max_size=1024)
+    fileobj.write(video_bytes)
+
+    def no_copy(*args, **kwargs):
+        raise AssertionError("upload was copied")
+
+    monkeypatch.setattr(job_cost.tempfile, "NamedTemporaryFile", no_copy)
+    probe = probe_upload(fileobj, "clip.avi")
+
+    assert probe["frames"] == 40
+    assert fileobj.tell() == 0
+
+
+def test_probe_upload_rejects_garbage():
+    assert probe_upload(io.BytesIO(os.urandom(1024)), "clip.mp4") is None
+
+
+def test_cost_grows_with_length_and_resolution(monkeypatch):
+    monkeypatch.setattr(settings, "FRAME_EXTRACTION_FPS", 2)
+    monkeypatch.setattr(settings, "JOB_COST_SECONDS_PER_FRAME", 0.05)
+    monkeypatch.setattr(settings, "JOB_COST_SECONDS_PER_MEGAPIXEL", 0.001)
+    probe = {"frames": 25 * 600, "fps": 25.0, "width": 1920, "height": 1080, "duration": 600.0}
+
+    cost = estimate_cost(probe)
+
+    assert cost == pytest.approx(600 * 2 * 0.05 + 15000 * 2.0736 * 0.001)
+    assert estimate_cost({**probe, "width": 640, "height": 360}) < cost
+    assert estimate_cost({**probe, "frames": 25 * 60, "duration": 60.0}) < cost
+    assert estimate_cost(probe, sampling_fps=1) < cost
+    assert estimate_cost(None) == settings.JOB_COST_DEFAULT_SECONDS
+
+
+def test_eta_follows_the_upload(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_ETA_PARALLELISM", 4)
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    upload = Upload(
+        status=UploadStatus.QUEUED,
+        meta_data={"estimated_cost": 120.0},
+        segments_done=0,
+    )
+
+    assert estimate_eta(upload, work_ahead=400.0) == 220.0
+
+    upload.status = UploadStatus.PROCESSING
+    upload.started_at = now - timedelta(seconds=90)
+    assert estimate_eta(upload, None, now=now) == 30.0
+    assert estimate_eta(upload, None, now=now + timedelta(minutes=5)) == 0.0
+
+    upload.segments_total, upload.segments_done = 4, 2
+    assert estimate_eta(upload, None, now=now) == 30.0
+
+    upload.status = UploadStatus.DONE
+    assert estimate_eta(upload, None) is None
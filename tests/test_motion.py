@@ -0,0 +1,50 @@
+import numpy as np
+
+from src.detectors.motion import MotionGate
+
+
+def frame(value=0, box=None):
+    image = np.full((360, 640, 3), value, dtype=np.uint8)
+    if box is not None:
+        x, y = box
+        image[y:y + 80, x:x + 160] = 255
+    return image
+
+
+def test_static_frames_are_skipped():
+    gate = MotionGate(sensitivity=0.5, hold=0)
+    frames = [(i, frame(40)) for i in range(10)]
+
+    passed = [frame_no for frame_no, _ in gate.filter(frames)]
+
+    # The first frame seeds the background and always passes
+    assert passed == [0]
+    assert gate.stats == {"frames_motion": 1, "frames_skipped_static": 9}
+
+
+def test_moving_object_passes_with_hold():
+    gate = MotionGate(sensitivity=0.5, hold=1)
+    frames = [(i, frame(40)) for i in range(3)]
+    frames += [(3, frame(40, (100, 100))), (4, frame(40, (300, 100)))]
+    # The vehicle stops: the background catches up and the gate closes again
+    frames += [(i, frame(40, (300, 100))) for i in range(5, 14)]
+
+    passed = [frame_no for frame_no, _ in gate.filter(frames)]
+
+    # Frame 1 is passed by the hold after the seed frame, frame 2 is static
+    assert passed[:5] == [0, 1, 3, 4, 5]
+    assert 2 not in passed
+    assert 12 not in passed and 13 not in passed
+
+
+def test_sensitivity_controls_small_changes():
+    small_change = frame(40)
+    small_change[:12, :24] = 255  # ~0.1% of the frame
+
+    strict = MotionGate(sensitivity=0.0, hold=0)
+    strict.is_moving(frame(40))
+    assert not strict.is_moving(small_change)
+
+    sensitive = MotionGate(sensitivity=1.0, hold=0)
+    sensitive.is_moving(frame(40))
+    assert sensitive.is_moving(small_change)
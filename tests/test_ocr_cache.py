@@ -0,0 +1,70 @@
+import cv2
+import numpy as np
+
+from src.detectors.ocr_cache import OcrCache, dhash, hamming
+
+
+def plate(text, noise=0, seed=0):
+    image = np.full((48, 200), 230, dtype=np.uint8)
+    cv2.putText(image, text, (6, 36), cv2.FONT_HERSHEY_SIMPLEX, 1.1, 20, 2)
+    if noise:
+        rng = np.random.default_rng(seed)
+        image = np.clip(image + rng.integers(-noise, noise + 1, image.shape), 0, 255).astype(np.uint8)
+    return image
+
+
+def test_dhash_tolerates_noise_but_separates_plates():
+    base = dhash(plate("AB12CD"))
+    assert hamming(base, dhash(plate("AB12CD", noise=12, seed=1))) <= 4
+    # A single differing character is well outside the match distance
+    assert hamming(base, dhash(plate("AB12CO"))) > 8
+    assert hamming(base, dhash(plate("XY98ZW"))) > 100
+
+
+def test_cache_reuses_readings_of_similar_crops():
+    cache = OcrCache(max_distance=4)
+    calls = []
+
+    def recognize(grays):
+        calls.append(len(grays))
+        return [("AB12CD", 0.9) if i == 0 else None for i in range(len(grays))]
+
+    first = cache.recognize("v1", [plate("AB12CD"), plate("XY98ZW")], recognize)
+    again = cache.recognize("v1", [plate("AB12CD", noise=12, seed=2), plate("XY98ZW")], recognize)
+    other_version = cache.recognize("v2", [plate("AB12CD")], recognize)
+
+    assert first == [("AB12CD", 0.9), None]
+    assert again == first
+    assert other_version == [("AB12CD", 0.9)]
+    assert calls == [2, 1]  # second batch fully cached; v2 is a separate namespace
+
+
+def test_lru_eviction_drops_index_entries():
+    cache = OcrCache(max_entries=2, max_distance=4)
+    ones = (1 << 1024) - 1
+    values = [0, ones, int("10" * 512, 2)]  # pairwise distances >= 512 bits
+    for value in values:
+        cache.put("v", value, ("P", 1.0))
+
+    assert len(cache) == 2
+    assert cache.get("v", values[0]) == (False, None)
+    assert cache.get("v", values[2]) == (True, ("P", 1.0))
+    assert all(values[0] not in band for band in cache._bands.values())
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def test_redis_tier_is_shared_between_caches():
+    redis = FakeRedis()
+    OcrCache(redis_client=redis).put("v", 42, ("AB12CD", 0.8))
+
+    assert OcrCache(redis_client=redis).get("v", 42) == (True, ("AB12CD", 0.8))
@@ -0,0 +1,67 @@
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+from src.detectors import onnx_backend
+from src.detectors.onnx_backend import letterbox, nms, postprocess, unletterbox
+
+
+def test_letterbox_roundtrip():
+    frame = np.zeros((360, 640, 3), dtype=np.uint8)
+    image, gain, pad = letterbox(frame, 320)
+
+    assert image.shape == (320, 320, 3)
+    assert gain == 0.5
+    assert pad == (0, 70)
+    assert image[0, 0].tolist() == [114, 114, 114]
+
+    boxes = np.array([[10.0, 80.0, 60.0, 100.0]])
+    assert unletterbox(boxes, gain, pad, frame.shape[:2]).tolist() == [[20.0, 20.0, 120.0, 60.0]]
+
+
+def test_nms_keeps_best_of_overlapping_boxes():
+    boxes = np.array([[0, 0, 10, 10], [1, 0, 11, 10], [50, 50, 60, 60]], dtype=np.float32)
+    scores = np.array([0.6, 0.9, 0.5], dtype=np.float32)
+
+    assert nms(boxes, scores, iou_threshold=0.5).tolist() == [1, 2]
+
+
+def test_postprocess_decodes_yolov8_output():
+    # (4 box + 1 class, 3 anchors): centre x, centre y, width, height, score
+    output = np.array([
+        [320, 322, 100],
+        [320, 320, 100],
+        [100, 100, 50],
+        [40, 40, 20],
+        [0.9, 0.8, 0.1],
+    ], dtype=np.float32)
+
+    boxes = postprocess(output, conf=0.3, iou_threshold=0.7)
+
+    assert boxes.shape == (1, 5)
+    assert boxes[0].tolist() == [270.0, 300.0, 370.0, 340.0, np.float32(0.9)]
+
+
+def test_prebuilt_model_is_quantized_when_int8(tmp_path, monkeypatch):
+    weights = numpy_helper.from_array(np.ones((4, 4), dtype=np.float32), "w")
+    graph = helper.make_graph(
+        [helper.make_node("MatMul", ["x", "w"], ["y"])],
+        "plate",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 4])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 4])],
+        [weights],
+    )
+    model_path = tmp_path / "plates.onnx"
+    onnx.save(helper.make_model(graph), str(model_path))
+    monkeypatch.setattr(onnx_backend, "OnnxPlateDetector", lambda path, threads: path)
+
+    model_dir = str(tmp_path / "models")
+    args = ("unused", str(model_path), model_dir)
+    assert onnx_backend.load_detector(*args, imgsz=640, int8=False) == str(model_path)
+    int8_path = onnx_backend.load_detector(*args, imgsz=640, int8=True)
+
+    assert int8_path == str(tmp_path / "models" / "plates.int8.onnx")
+    initializers = {t.name: t.data_type for t in onnx.load(int8_path).graph.initializer}
+    assert initializers["w_quantized"] == TensorProto.UINT8
+    # An already quantized model is loaded as given
+    assert onnx_backend.load_detector("unused", int8_path, model_dir, imgsz=640, int8=True) == int8_path
@@ -0,0 +1,62 @@
+import random
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.detectors.pipeline import FramePipeline
+
+
+def frames(count):
+    for i in range(count):
+        yield i, np.full((4, 4), i, dtype=np.uint8)
+
+
+def test_pipeline_batches_and_preserves_order():
+    def infer(batch):
+        time.sleep(random.uniform(0, 0.01))
+        return [frame_no for frame_no, _ in batch]
+
+    pipeline = FramePipeline(frames(23), infer=infer, batch_size=5, consumers=3)
+    results = list(pipeline)
+
+    assert results == [list(range(i, min(i + 5, 23))) for i in range(0, 23, 5)]
+    assert pipeline.stats["batches"] == 5
+    assert pipeline.stats["frames"] == 23
+
+
+def test_pipeline_applies_prepare_in_decoder_thread():
+    threads = set()
+
+    def prepare(frame_no, frame):
+        threads.add(threading.current_thread().name)
+        return frame_no, frame * 2
+
+    pipeline = FramePipeline(
+        frames(4), infer=lambda batch: [int(f[0, 0]) for _, f in batch], prepare=prepare
+    )
+
+    assert [r for batch in pipeline for r in batch] == [0, 2, 4, 6]
+    assert threads == {"frame-decoder"}
+
+
+def test_pipeline_propagates_inference_errors():
+    def infer(batch):
+        if batch[0][0] == 4:
+            raise RuntimeError("model crashed")
+        return batch
+
+    with pytest.raises(RuntimeError, match="model crashed"):
+        list(FramePipeline(frames(10), infer=infer, batch_size=2, consumers=2))
+
+
+def test_pipeline_stops_threads_when_closed_early():
+    before = threading.active_count()
+    pipeline = FramePipeline(frames(1000), infer=lambda batch: batch, queue_depth=4)
+
+    batches = iter(pipeline)
+    next(batches)
+    batches.close()
+
+    assert threading.active_count() == before
@@ -0,0 +1,244 @@
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from src.config import settings
+from src.services import queue as queue_module
+from src.services.queue import QueueService
+
+QUEUE = "video_processing"
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    monkeypatch.setattr(settings, "QUEUE_RELIABLE", True)
+    monkeypatch.setattr(settings, "QUEUE_LEASE_SECONDS", 60)
+    monkeypatch.setattr(settings, "QUEUE_MAX_ATTEMPTS", 2)
+    service = QueueService()
+    service.redis = fakeredis.aioredis.FakeRedis(
+        server=fakeredis.FakeServer(), decode_responses=True
+    )
+    return service
+
+
+async def expire_leases(queue):
+    leases = await queue.redis.zrange(f"{QUEUE}:leases", 0, -1)
+    await queue.redis.zadd(f"{QUEUE}:leases", {job: 0 for job in leases})
+
+
+@pytest.mark.asyncio
+async def test_dequeued_job_stays_leased_until_acked(queue):
+    await queue.enqueue(QUEUE, {"job_id": "a"})
+
+    job = await queue.dequeue(QUEUE, timeout=1)
+
+    assert job["job_id"] == "a"
+    assert await queue.get_queue_length(QUEUE) == 0
+    assert await queue.redis.llen(f"{QUEUE}:processing") == 1
+    assert await queue.redis.zcard(f"{QUEUE}:leases") == 1
+
+    assert await queue.ack(QUEUE, job)
+    assert await queue.redis.llen(f"{QUEUE}:processing") == 0
+    assert await queue.redis.zcard(f"{QUEUE}:leases") == 0
+    assert await queue.reclaim(QUEUE) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_retried_then_dead_lettered(queue):
+    await queue.enqueue(QUEUE, {"job_id": "a"})
+    await queue.enqueue(QUEUE, {"job_id": "b"})
+
+    await queue.dequeue(QUEUE, timeout=1)
+    await expire_leases(queue)
+    assert await queue.reclaim(QUEUE) == (1, 0)
+
+    # Back at the head of the queue, ahead of "b"
+    job = await queue.dequeue(QUEUE, timeout=1)
+    assert job["job_id"] == "a"
+    await expire_leases(queue)
+    assert await queue.reclaim(QUEUE) == (0, 1)
+
+    assert await queue.get_dead_letter_length(QUEUE) == 1
+    assert await queue.redis.hkeys(f"{QUEUE}:ids") == ["b"]
+    assert (await queue.dequeue(QUEUE, timeout=1))["job_id"] == "b"
+
+
+@pytest.mark.asyncio
+async def test_reclaimed_job_goes_back_to_its_lane(queue):
+    await queue.enqueue(QUEUE, {"job_id": "a", "priority": "low"})
+
+    await queue.dequeue(QUEUE, timeout=1)
+    await expire_leases(queue)
+    assert await queue.reclaim(QUEUE) == (1, 0)
+
+    assert await queue.get_lane_lengths(QUEUE) == {"high": 0, "normal": 0, "low": 1}
+
+
+@pytest.mark.asyncio
+async def test_renew_fail_and_release(queue):
+    await queue.enqueue(QUEUE, {"job_id": "a"})
+    job = await queue.dequeue(QUEUE, timeout=1)
+
+    assert await queue.renew(QUEUE, job)
+    assert await queue.reclaim(QUEUE) == (0, 0)
+
+    # Releasing on shutdown requeues without counting an attempt
+    assert await queue.release(QUEUE, job)
+    assert not await queue.renew(QUEUE, job)
+    assert await queue.get_queue_length(QUEUE) == 1
+    assert await queue.redis.hlen(f"{QUEUE}:attempts") == 0
+
+    job = await queue.dequeue(QUEUE, timeout=1)
+    assert await queue.fail(QUEUE, job)
+    assert await queue.reclaim(QUEUE) == (1, 0)
+    assert await queue.redis.hlen(f"{QUEUE}:attempts") == 1
+
+
+@pytest.mark.asyncio
+async def test_orphaned_job_gets_a_lease(queue):
+    # A consumer died between moving the job and leasing it
+    await queue.redis.lpush(f"{QUEUE}:processing", '{"job_id": "a"}')
+
+    assert await queue.reclaim(QUEUE) == (0, 0)
+    assert await queue.redis.zcard(f"{QUEUE}:leases") == 1
+
+    await expire_leases(queue)
+    assert await queue.reclaim(QUEUE) == (1, 0)
+    assert await queue.get_queue_length(QUEUE) == 1
+
+
+@pytest.mark.asyncio
+async def test_plain_mode_pops_without_lease(queue, monkeypatch):
+    monkeypatch.setattr(settings, "QUEUE_RELIABLE", False)
+    await queue.enqueue(QUEUE, {"job_id": "a"})
+
+    job = await queue.dequeue(QUEUE, timeout=1)
+
+    assert job["job_id"] == "a"
+    assert await queue.redis.llen(f"{QUEUE}:processing") == 0
+    assert not await queue.ack(QUEUE, job)
+
+
+async def drain(queue):
+    jobs = []
+    while job := await queue.dequeue(QUEUE, timeout=1):
+        jobs.append(job)
+        await queue.ack(QUEUE, job)
+    return jobs
+
+
+@pytest.mark.asyncio
+async def test_higher_lane_is_served_first(queue):
+    await queue.enqueue(QUEUE, {"job_id": "archive", "priority": "low"})
+    await queue.enqueue(QUEUE, {"job_id": "routine"})
+    await queue.enqueue(QUEUE, {"job_id": "bolo", "priority": "high"})
+
+    assert await queue.get_lane_lengths(QUEUE) == {"high": 1, "normal": 1, "low": 1}
+    assert [job["job_id"] for job in await drain(queue)] == ["bolo", "routine", "archive"]
+
+    with pytest.raises(ValueError):
+        await queue.enqueue(QUEUE, {"job_id": "x", "priority": "urgent"})
+
+
+@pytest.mark.asyncio
+async def test_flows_take_turns_within_a_lane(queue):
+    for i in range(6):
+        await queue.enqueue(QUEUE, {"job_id": f"bulk-{i}", "flow": "user-a/cam-1"})
+    first = await queue.dequeue(QUEUE, timeout=1)
+    await queue.ack(QUEUE, first)
+    await queue.enqueue(QUEUE, {"job_id": "clip-0", "flow": "user-b/cam-2"})
+    await queue.enqueue(QUEUE, {"job_id": "clip-1", "flow": "user-b/cam-2"})
+
+    order = [job["job_id"] for job in await drain(queue)]
+
+    # The late flow is interleaved with the burst rather than queued behind it
+    assert order.index("clip-0") <= 1
+    assert order.index("clip-1") <= 3
+    assert [job for job in order if job.startswith("bulk")] == [f"bulk-{i}" for i in range(1, 6)]
+
+
+@pytest.mark.asyncio
+async def test_jobs_from_the_old_list_are_still_served(queue):
+    await queue.redis.lpush(QUEUE, '{"job_id": "old"}')
+    await queue.enqueue(QUEUE, {"job_id": "new"})
+
+    assert await queue.get_queue_length(QUEUE) == 2
+    assert [job["job_id"] for job in await drain(queue)] == ["new", "old"]
+
+
+@pytest.mark.asyncio
+async def test_short_jobs_go_first_but_long_ones_age_in(queue):
+    await queue.enqueue(QUEUE, {"job_id": "long", "flow": "a", "cost": 600})
+    await queue.enqueue(QUEUE, {"job_id": "short", "flow": "b", "cost": 30})
+
+    assert await queue.get_work_ahead(QUEUE, "long") == 30
+    assert await queue.get_work_ahead(QUEUE, "missing") is None
+    assert (await queue.dequeue(QUEUE, timeout=1))["job_id"] == "short"
+
+    # A steady stream of shorter jobs only delays the long one by about its cost
+    served = []
+    for i in range(20):
+        await queue.enqueue(QUEUE, {"job_id": f"clip-{i}", "flow": f"c{i}", "cost": 100})
+        job = await queue.dequeue(QUEUE, timeout=1)
+        served.append(job["job_id"])
+        if job["job_id"] == "long":
+            break
+    assert served[-1] == "long"
+    assert len(served) <= 7
+
+
+@pytest.mark.asyncio
+async def test_work_ahead_counts_higher_lanes_and_tracks_the_queue(queue, monkeypatch):
+    await queue.enqueue(QUEUE, {"job_id": "bolo", "priority": "high", "cost": 50})
+    for i in range(4):
+        await queue.enqueue(QUEUE, {"job_id": f"clip-{i}", "flow": f"f{i}", "cost": 10 * (i + 1)})
+
+    assert await queue.get_work_ahead(QUEUE, "bolo") == 0
+    assert await queue.get_work_ahead(QUEUE, "clip-2") == 50 + 10 + 20
+
+    # Far back in a lane the jobs ahead are estimated from its mean cost
+    monkeypatch.setattr(queue_module, "EXACT_WORK_AHEAD_JOBS", 1)
+    assert await queue.get_work_ahead(QUEUE, "clip-2") == 50 + 2 * 100 / 4
+
+    # Served and requeued jobs leave and re-enter the lane totals
+    monkeypatch.setattr(queue_module, "EXACT_WORK_AHEAD_JOBS", 100)
+    bolo = await queue.dequeue(QUEUE, timeout=1)
+    first = await queue.dequeue(QUEUE, timeout=1)
+    assert await queue.get_work_ahead(QUEUE, "clip-2") == 20
+    assert await queue.get_work_ahead(QUEUE, "bolo") is None
+    await queue.release(QUEUE, bolo)
+    assert await queue.get_work_ahead(QUEUE, "clip-2") == 50 + 20
+
+    await queue.ack(QUEUE, first)
+    assert await queue.redis.hget(f"{QUEUE}:ids", first["job_id"]) is None
+    assert await queue.redis.hlen(f"{QUEUE}:costs") == 4
+
+
+@pytest.mark.asyncio
+async def test_lanes_share_turns_by_weight(queue, monkeypatch):
+    monkeypatch.setattr(settings, "QUEUE_LANE_WEIGHTS", "high:3,normal:2,low:1")
+    for priority in ("high", "normal", "low"):
+        for i in range(12):
+            await queue.enqueue(QUEUE, {"job_id": f"{priority}-{i}", "priority": priority, "flow": f"f{i}"})
+
+    served = [job["job_id"].split("-")[0] for job in (await drain(queue))[:12]]
+
+    # Every lane is served in each round of six, the low one included
+    assert served[:6].count("high") == 3
+    assert served[:6].count("normal") == 2
+    assert served[:6].count("low") == 1
+    assert served[6:12] == served[:6]
+
+
+@pytest.mark.asyncio
+async def test_oldest_job_age_looks_at_every_lane(queue, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.services.queue.time.time", lambda: clock[0])
+    await queue.enqueue(QUEUE, {"job_id": "archive", "priority": "low"})
+    clock[0] += 50
+    await queue.enqueue(QUEUE, {"job_id": "bolo", "priority": "high"})
+    clock[0] += 10
+
+    assert await queue.get_oldest_job_age(QUEUE) == 60
+    await queue.redis.delete(f"{QUEUE}:lane:low")
+    assert await queue.get_oldest_job_age(QUEUE) == 10
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from src.detectors.recognizers import CrnnRecognizer, EasyOcrRecognizer, ctc_greedy_decode
+
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def one_hot(indices, classes=len(ALPHABET) + 1, p=0.9):
+    probs = np.full((len(indices), classes), (1 - p) / (classes - 1), dtype=np.float32)
+    probs[np.arange(len(indices)), indices] = p
+    return probs
+
+
+def test_ctc_greedy_decode_collapses_repeats_and_blanks():
+    a, b, one = ALPHABET.index("A") + 1, ALPHABET.index("B") + 1, ALPHABET.index("1") + 1
+    text, confidence = ctc_greedy_decode(one_hot([a, a, 0, a, b, 0, 0, one, one]), ALPHABET)
+
+    assert text == "AAB1"
+    assert confidence == pytest.approx(0.9)
+    assert ctc_greedy_decode(one_hot([0, 0, 0]), ALPHABET) is None
+
+
+class FakeReader:
+    def __init__(self):
+        self.recognize_calls = 0
+
+    def recognize(self, canvas, horizontal_list, free_list, batch_size, detail):
+        self.recognize_calls += 1
+        return [
+            ([[x1, top], [x2, top], [x2, bottom], [x1, bottom]], f"P{top}", 0.8)
+            for x1, x2, top, bottom in horizontal_list
+        ]
+
+    def readtext(self, gray):
+        return [([], "LOOSE", 0.5), ([], "OTHER", 0.4)]
+
+
+def test_easyocr_recognizer_batches_tight_crops():
+    reader = FakeReader()
+    recognizer = EasyOcrRecognizer(reader=reader)
+    tight = np.zeros((20, 80), dtype=np.uint8)
+    loose = np.zeros((60, 60), dtype=np.uint8)
+
+    results = recognizer.recognize([tight, loose, tight])
+
+    assert results == [("P0", 0.8), ("LOOSE", 0.5), ("P20", 0.8)]
+    assert reader.recognize_calls == 1
+
+
+class CanvasReader:
+    """Reads each canvas row back by the crop drawn there, out of order and split in pieces."""
+
+    def recognize(self, canvas, horizontal_list, free_list, batch_size, detail):
+        results = []
+        for x1, x2, top, bottom in reversed(horizontal_list):
+            value = int(canvas[top, 0])
+            if value == 0:
+                continue
+            box = [[x1, top + 1], [x2, top + 1], [x2, bottom - 1], [x1, bottom - 1]]
+            # A weaker partial reading of the same row, then the real one
+            results.append((box, f"X{value}", 0.3))
+            results.append((box, f"C{value}", 0.9))
+        return results
+
+
+def test_easyocr_canvas_rows_map_back_to_their_crops():
+    recognizer = EasyOcrRecognizer(reader=CanvasReader())
+    # Tight crops of different sizes; the third has no readable text
+    crops = [
+        np.full((20, 80), 11, dtype=np.uint8),
+        np.full((36, 120), 22, dtype=np.uint8),
+        np.zeros((10, 40), dtype=np.uint8),
+        np.full((12, 30), 44, dtype=np.uint8),
+    ]
+
+    results = recognizer.recognize(crops)
+
+    assert results == [("C11", 0.9), ("C22", 0.9), None, ("C44", 0.9)]
+
+
+def test_crnn_recognizer_runs_onnx_model(tmp_path):
+    onnx = pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    from onnx import TensorProto, helper, numpy_helper
+
+    # Ignores the image and always emits "AB1" as log-probabilities
+    a, b, one = ALPHABET.index("A") + 1, ALPHABET.index("B") + 1, ALPHABET.index("1") + 1
+    scores = np.log(one_hot([a, 0, b, b, one, 0]))[None]
+    graph = helper.make_graph(
+        [
+            helper.make_node("ReduceMean", ["images"], ["mean"], axes=[1, 2, 3], keepdims=1),
+            helper.make_node("Reshape", ["mean", "shape"], ["mean3"]),
+            helper.make_node("Mul", ["mean3", "zero"], ["zeros"]),
+            helper.make_node("Add", ["zeros", "scores"], ["output"]),
+        ],
+        "crnn",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, ["batch", 1, 32, 128])],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, ["batch", 6, len(ALPHABET) + 1])],
+        [
+            numpy_helper.from_array(scores.astype(np.float32), "scores"),
+            numpy_helper.from_array(np.zeros((1, 1, 1), dtype=np.float32), "zero"),
+            numpy_helper.from_array(np.array([-1, 1, 1], dtype=np.int64), "shape"),
+        ],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    path = tmp_path / "crnn.onnx"
+    onnx.save(model, str(path))
+
+    recognizer = CrnnRecognizer(str(path), alphabet=ALPHABET)
+    crops = [np.full((24, 100), 128, dtype=np.uint8), np.zeros((40, 400), dtype=np.uint8)]
+
+    assert recognizer.preprocess(crops).shape == (2, 1, 32, 128)
+    results = recognizer.recognize(crops)
+    assert [text for text, _ in results] == ["AB1", "AB1"]
+    assert results[0][1] == pytest.approx(0.9)
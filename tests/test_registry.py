@@ -0,0 +1,122 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.config import settings
+from src.detectors.registry import DetectorPlugin, get_detector, register_detector
+from src.services.detector_adapter import DetectorAdapter
+
+
+class FakeDetector(DetectorPlugin):
+    name = "fake"
+
+    def __init__(self):
+        self.loaded = False
+        self.batches = []
+
+    def load(self):
+        self.loaded = True
+
+    def prepare(self, frame):
+        return frame[::2, ::2]
+
+    def detect_batch(self, frames):
+        self.batches.append([frame_no for frame_no, _ in frames])
+        return [
+            {
+                "plate": "ab-12 cd",
+                "confidence": 0.9 if frame_no < 40 else 0.1,
+                "bbox": {"x1": 4, "y1": 4, "x2": 20, "y2": 12},
+                "frame_no": frame_no,
+                "crop": small[2:6, 2:10],
+            }
+            for frame_no, small in frames
+        ]
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = str(tmp_path / "plates.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 24, (64, 48))
+    for i in range(60):
+        writer.write(np.full((48, 64, 3), i * 4, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def fake_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DETECTOR_PLUGIN", "fake")
+    monkeypatch.setattr(settings, "FRAME_EXTRACTION_FPS", 2)
+    monkeypatch.setattr(settings, "WORKER_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "MOTION_GATE_ENABLED", False)
+    monkeypatch.setattr(settings, "TRACKING_ENABLED", True)
+    register_detector("fake", FakeDetector)
+
+
+def test_adapter_runs_registered_plugin(fake_settings, video_path):
+    adapter = DetectorAdapter(confidence_threshold=0.5)
+    stats = {}
+
+    detections = list(adapter.process_video(video_path, "cam-1", stats))
+
+    plugin = get_detector("fake")
+    assert plugin.loaded
+    assert plugin.batches == [[0, 12], [24, 36], [48]]
+    assert len(detections) == 1
+    detection = detections[0]
+    assert detection["normalized_plate"] == "AB12CD"
+    assert detection["camera_id"] == "cam-1"
+    assert detection["bbox_space"] == "source"
+    assert (detection["first_frame_no"], detection["last_frame_no"]) == (0, 36)
+    assert stats["frames_decoded"] == 5
+
+
+def test_adapter_maps_roi_boxes_to_frame(fake_settings, monkeypatch, video_path):
+    monkeypatch.setattr(settings, "TRACKING_ENABLED", False)
+    adapter = DetectorAdapter(confidence_threshold=0.5)
+    roi = [{"type": "rect", "x1": 0.5, "y1": 0.5, "x2": 1.0, "y2": 1.0}]
+
+    detections = list(adapter.process_video(video_path, "cam-1", roi=roi))
+
+    assert [d["frame_no"] for d in detections] == [0, 12, 24, 36]
+    assert detections[0]["bbox"] == {"x1": 36, "y1": 28, "x2": 52, "y2": 36}
+
+
+def test_unknown_and_path_plugins():
+    with pytest.raises(ValueError, match="Unknown detector plugin"):
+        get_detector("missing")
+
+    plugin = get_detector("tests.test_registry:FakeDetector")
+    assert isinstance(plugin, FakeDetector)
+
+
+class FlakyDetector(FakeDetector):
+    """Fails for the batches starting at the given frames."""
+
+    def __init__(self, failing):
+        super().__init__()
+        self.failing = failing
+
+    def detect_batch(self, frames):
+        if frames[0][0] in self.failing:
+            raise RuntimeError("CUDA out of memory")
+        return super().detect_batch(frames)
+
+
+def test_adapter_skips_a_failed_batch(fake_settings, monkeypatch, video_path):
+    monkeypatch.setattr(settings, "TRACKING_ENABLED", False)
+    monkeypatch.setattr(settings, "DETECTION_MAX_FAILED_BATCHES", 2)
+    adapter = DetectorAdapter(confidence_threshold=0.5, detector=FlakyDetector({0, 48}))
+
+    detections = list(adapter.process_video(video_path, "cam-1"))
+
+    assert [d["frame_no"] for d in detections] == [24, 36]
+
+
+def test_adapter_fails_after_consecutive_failed_batches(fake_settings, monkeypatch, video_path):
+    monkeypatch.setattr(settings, "DETECTION_MAX_FAILED_BATCHES", 2)
+    adapter = DetectorAdapter(confidence_threshold=0.5, detector=FlakyDetector({0, 24}))
+
+    with pytest.raises(RuntimeError, match="out of memory"):
+        list(adapter.process_video(video_path, "cam-1"))
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from src.detectors.roi import RegionOfInterest
+from src.schemas.camera import CameraRoi
+
+
+def test_rect_crop_and_mapping():
+    frame = np.arange(100 * 200, dtype=np.uint32).reshape(100, 200)
+    region = RegionOfInterest([{"type": "rect", "x1": 0.25, "y1": 0.5, "x2": 0.75, "y2": 1.0}])
+
+    crop = region.crop(frame)
+
+    assert crop.shape == (50, 100)
+    assert crop[0, 0] == frame[50, 50]
+    assert region.to_frame({"x1": 10, "y1": 5, "x2": 30, "y2": 15}) == {
+        "x1": 60, "y1": 55, "x2": 80, "y2": 65
+    }
+    assert region.to_frame({"x1": 10, "y1": 5, "x2": 30, "y2": 15}, scale=0.5) == {
+        "x1": 35, "y1": 30, "x2": 55, "y2": 40
+    }
+
+
+def test_union_of_regions_masks_outside_pixels():
+    frame = np.full((100, 100, 3), 200, dtype=np.uint8)
+    region = RegionOfInterest([
+        {"type": "rect", "x1": 0.0, "y1": 0.0, "x2": 0.2, "y2": 0.2},
+        {"type": "polygon", "points": [[0.6, 0.6], [1.0, 0.6], [1.0, 1.0]]},
+    ])
+
+    crop = region.crop(frame)
+
+    assert crop.shape == (100, 100, 3)
+    assert crop[10, 10].tolist() == [200, 200, 200]
+    assert crop[50, 50].tolist() == [0, 0, 0]
+    assert crop[65, 95].tolist() == [200, 200, 200]
+    assert frame[50, 50].tolist() == [200, 200, 200]
+
+
+def test_roi_schema_validation():
+    roi = CameraRoi(regions=[
+        {"type": "rect", "x1": 0.1, "y1": 0.2, "x2": 0.9, "y2": 0.8},
+        {"type": "polygon", "points": [[0, 0], [1, 0], [1, 1]]},
+    ])
+    assert roi.regions[1].points[2] == (1.0, 1.0)
+
+    with pytest.raises(ValidationError):
+        CameraRoi(regions=[{"type": "rect", "x1": 0.5, "y1": 0.2, "x2": 0.4, "y2": 0.8}])
+    with pytest.raises(ValidationError):
+        CameraRoi(regions=[{"type": "polygon", "points": [[0, 0], [1.5, 0], [1, 1]]}])
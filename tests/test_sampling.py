@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.detectors.sampling import FrameSampler
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = str(tmp_path / "counter.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (64, 48))
+    for i in range(60):
+        writer.write(np.full((48, 64, 3), i * 4, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def sample(video_path, **kwargs):
+    cap = cv2.VideoCapture(video_path)
+    try:
+        sampler = FrameSampler(cap, **kwargs)
+        frames = [(position, int(frame.mean())) for position, frame in sampler]
+    finally:
+        cap.release()
+    return sampler, frames
+
+
+def test_sampler_decodes_only_sampled_frames(video_path):
+    sampler, frames = sample(video_path, interval=10)
+
+    assert [position for position, _ in frames] == [0, 10, 20, 30, 40, 50]
+    assert all(abs(value - position * 4) <= 2 for position, value in frames)
+    assert sampler.stats["frames_decoded"] == 6
+    assert sampler.stats["seeks"] == 0
+
+
+def test_sampler_phase_and_range(video_path):
+    _, frames = sample(video_path, interval=5, phase=4, start_frame=12, end_frame=40)
+
+    assert [position for position, _ in frames] == [14, 19, 24, 29, 34, 39]
+
+
+def test_sampler_seeks_across_large_gaps(video_path):
+    sampler, frames = sample(video_path, interval=20, seek_threshold=5)
+
+    assert [position for position, _ in frames] == [0, 20, 40]
+    assert all(abs(value - position * 4) <= 2 for position, value in frames)
+    assert sampler.stats["seeks"] >= 1
@@ -0,0 +1,36 @@
+import pytest
+
+from src.config import settings
+from src.services.sampling_policy import choose_sampling_fps, queue_pressure
+
+
+@pytest.fixture(autouse=True)
+def policy_settings(monkeypatch):
+    monkeypatch.setattr(settings, "ADAPTIVE_SAMPLING_ENABLED", True)
+    monkeypatch.setattr(settings, "FRAME_EXTRACTION_FPS", 4)
+    monkeypatch.setattr(settings, "SAMPLING_MIN_FPS", 0.5)
+    monkeypatch.setattr(settings, "SAMPLING_TARGET_QUEUE_DEPTH", 10)
+    monkeypatch.setattr(settings, "SAMPLING_TARGET_WAIT_SECONDS", 60)
+
+
+def test_queue_pressure_uses_depth_or_age():
+    assert queue_pressure(0, 0) == 0
+    assert queue_pressure(20, 30) == 2.0
+    assert queue_pressure(5, 180) == 3.0
+
+
+def test_sampling_rate_follows_load():
+    assert choose_sampling_fps(0, 0) == 4
+    assert choose_sampling_fps(10, 60) == 4
+    assert choose_sampling_fps(20, 0) == 2
+    assert choose_sampling_fps(0, 240) == 1
+    assert choose_sampling_fps(1000, 0) == 0.5
+
+
+def test_sampling_rate_respects_camera_bounds(monkeypatch):
+    assert choose_sampling_fps(0, 0, min_fps=1, max_fps=8) == 8
+    assert choose_sampling_fps(1000, 0, min_fps=1, max_fps=8) == 1
+    assert choose_sampling_fps(1000, 0, min_fps=3, max_fps=2) == 2
+
+    monkeypatch.setattr(settings, "ADAPTIVE_SAMPLING_ENABLED", False)
+    assert choose_sampling_fps(1000, 0, max_fps=6) == 6
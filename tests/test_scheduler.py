@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from src.services.scheduler import JobScheduler
+
+
+def make_fetcher(jobs):
+    jobs = list(jobs)
+
+    async def fetch():
+        return jobs.pop(0) if jobs else None
+
+    return fetch
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_jobs_concurrently():
+    running = 0
+    peak = 0
+    done = []
+
+    async def handler(job):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        done.append(job["job_id"])
+
+    scheduler = JobScheduler(handler, concurrency=3)
+    runner = asyncio.create_task(
+        scheduler.run(make_fetcher({"job_id": str(i)} for i in range(6)), idle_sleep=0.01)
+    )
+    await asyncio.sleep(0.3)
+    await scheduler.shutdown(timeout=1)
+    await runner
+
+    assert sorted(done) == [str(i) for i in range(6)]
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_scheduler_caps_job_type():
+    running = {"segment": 0}
+    peak = {"segment": 0}
+
+    async def handler(job):
+        running[job["type"]] += 1
+        peak[job["type"]] = max(peak[job["type"]], running[job["type"]])
+        await asyncio.sleep(0.05)
+        running[job["type"]] -= 1
+
+    scheduler = JobScheduler(handler, concurrency=4, type_limits={"segment": 1})
+    jobs = [{"job_id": str(i), "type": "segment"} for i in range(3)]
+    runner = asyncio.create_task(scheduler.run(make_fetcher(jobs), idle_sleep=0.01))
+    await asyncio.sleep(0.3)
+    await scheduler.shutdown(timeout=1)
+    await runner
+
+    assert peak["segment"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_keepalive_covers_the_type_slot_wait():
+    events = []
+
+    async def handler(job):
+        events.append(("start", job["job_id"]))
+        await asyncio.sleep(0.05)
+
+    async def keepalive(job):
+        events.append(("keepalive", job["job_id"]))
+        try:
+            await asyncio.sleep(10)
+        finally:
+            events.append(("stopped", job["job_id"]))
+
+    scheduler = JobScheduler(handler, concurrency=2, type_limits={"segment": 1}, keepalive=keepalive)
+    jobs = [{"job_id": str(i), "type": "segment"} for i in range(2)]
+    runner = asyncio.create_task(scheduler.run(make_fetcher(jobs), idle_sleep=0.01))
+    await asyncio.sleep(0.02)
+    # The second job waits for the segment slot with its keepalive already running
+    assert ("keepalive", "1") in events and ("start", "1") not in events
+    await asyncio.sleep(0.2)
+    await scheduler.shutdown(timeout=1)
+    await runner
+
+    assert ("start", "1") in events
+    assert ("stopped", "0") in events and ("stopped", "1") in events
+
+
+@pytest.mark.asyncio
+async def test_scheduler_isolates_failures():
+    done = []
+
+    async def handler(job):
+        if job["job_id"] == "bad":
+            raise RuntimeError("boom")
+        done.append(job["job_id"])
+
+    scheduler = JobScheduler(handler, concurrency=2)
+    jobs = [{"job_id": "bad"}, {"job_id": "good"}]
+    runner = asyncio.create_task(scheduler.run(make_fetcher(jobs), idle_sleep=0.01))
+    await asyncio.sleep(0.1)
+    await scheduler.shutdown(timeout=1)
+    await runner
+
+    assert done == ["good"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_shutdown_cancels_after_timeout():
+    cancelled = asyncio.Event()
+
+    async def handler(job):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    scheduler = JobScheduler(handler, concurrency=1)
+    runner = asyncio.create_task(scheduler.run(make_fetcher([{"job_id": "long"}])))
+    await asyncio.sleep(0.05)
+    await scheduler.shutdown(timeout=0.05)
+    await runner
+
+    assert cancelled.is_set()
+    assert scheduler.in_flight == 0
@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.config import settings
+from src.detectors.registry import DetectorPlugin
+from src.services.detector_adapter import DetectorAdapter
+from src.services.segments import SEGMENT_JOB_TYPE, plan_segments, segment_job
+
+
+class TwoVehicles(DetectorPlugin):
+    """One plate on the left for frames < 20, another on the right from 30."""
+
+    name = "two_vehicles"
+
+    def load(self):
+        pass
+
+    def detect_batch(self, frames):
+        detections = []
+        for frame_no, frame in frames:
+            if 20 <= frame_no < 30:
+                continue
+            x = 2 if frame_no < 20 else 40
+            detections.append({
+                "plate": "AAA111" if frame_no < 20 else "BBB222",
+                "confidence": 0.9,
+                "bbox": {"x1": x, "y1": 10, "x2": x + 20, "y2": 20},
+                "frame_no": frame_no,
+                "crop": frame[10:20, x:x + 20],
+            })
+        return detections
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = str(tmp_path / "long.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 24, (64, 48))
+    for i in range(60):
+        writer.write(np.full((48, 64, 3), i * 4, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_plan_segments():
+    assert plan_segments(0, 25.0, 600) == [(0, None)]
+    assert plan_segments(25 * 800, 25.0, 600) == [(0, None)]
+    assert plan_segments(25 * 1800, 25.0, 600) == [(0, 15000), (15000, 30000), (30000, None)]
+    assert plan_segments(25 * 1800, 25.0, 0) == [(0, None)]
+
+
+def test_segment_job_payload():
+    job = segment_job({"job_id": "abc", "upload_id": "u"}, 2, (100, None))
+
+    assert job == {
+        "job_id": "abc:2",
+        "upload_id": "u",
+        "type": SEGMENT_JOB_TYPE,
+        "segment": 2,
+        "start_frame": 100,
+        "end_frame": None,
+    }
+
+
+def test_segments_report_each_vehicle_once(monkeypatch, video_path):
+    monkeypatch.setattr(settings, "FRAME_EXTRACTION_FPS", 2)
+    monkeypatch.setattr(settings, "MOTION_GATE_ENABLED", False)
+    monkeypatch.setattr(settings, "TRACKING_ENABLED", True)
+    monkeypatch.setattr(settings, "SEGMENT_OVERLAP_SECONDS", 1.0)
+    adapter = DetectorAdapter(confidence_threshold=0.5, detector=TwoVehicles())
+
+    def plates(**kwargs):
+        return [
+            (d["plate"], d["first_frame_no"])
+            for d in adapter.process_video(video_path, "cam-1", **kwargs)
+        ]
+
+    segments = plan_segments(60, 24.0, segment_seconds=1)
+    assert segments == [(0, 20), (20, 40), (40, None)]
+
+    per_segment = [plates(start_frame=start, end_frame=end) for start, end in segments]
+
+    assert per_segment == [[("AAA111", 0)], [("BBB222", 36)], []]
+    assert sorted(sum(per_segment, [])) == sorted(plates())
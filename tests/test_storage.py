@@ -0,0 +1,141 @@
+import json
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+from src.config import settings
+from src.services import storage
+from src.services.storage import LocalStorageService, MinioStorageService, SupabaseStorageService
+
+
+@pytest.mark.asyncio
+async def test_local_storage_round_trip(tmp_path):
+    storage = LocalStorageService(root=str(tmp_path))
+
+    name = await storage.upload_file(BytesIO(b"crop-bytes"), "anpr-crops", "crops/a/b.jpg", "image/jpeg")
+    assert name == "crops/a/b.jpg"
+
+    url = await storage.get_presigned_url("anpr-crops", "crops/a/b.jpg")
+    assert url.startswith("file://")
+    assert Path(urlparse(url).path).read_bytes() == b"crop-bytes"
+
+    await storage.delete_file("anpr-crops", "crops/a/b.jpg")
+    with pytest.raises(FileNotFoundError):
+        await storage.get_presigned_url("anpr-crops", "crops/a/b.jpg")
+
+
+@pytest.mark.asyncio
+async def test_local_storage_rejects_paths_outside_root(tmp_path):
+    storage = LocalStorageService(root=str(tmp_path / "store"))
+
+    with pytest.raises(ValueError):
+        await storage.upload_file(BytesIO(b"x"), "bucket", "../../etc/passwd")
+
+
+class Sent(list):
+    """Requests sent, with their bodies; `responses` overrides the reply per method."""
+
+    def __init__(self):
+        super().__init__()
+        self.responses = {}
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    sent = Sent()
+
+    async def handler(request):
+        sent.append((request, await request.aread()))
+        return sent.responses.get(request.method, httpx.Response(200))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(storage, "get_http_client", lambda: client)
+    monkeypatch.setattr(settings, "DOWNLOAD_CHUNK_SIZE", 1024)
+    return sent
+
+
+@pytest.fixture
+def minio(monkeypatch):
+    monkeypatch.setattr(MinioStorageService, "_ensure_buckets", lambda self: None)
+    return MinioStorageService()
+
+
+@pytest.mark.asyncio
+async def test_minio_uploads_through_a_presigned_put(minio, requests):
+    video = bytes(range(256)) * 20
+
+    await minio.upload_file(BytesIO(video), "anpr-uploads", "uploads/j/clip.mp4", "video/mp4")
+
+    [(request, body)] = requests
+    assert request.method == "PUT"
+    assert request.url.host == "localhost" and request.url.path == "/anpr-uploads/uploads/j/clip.mp4"
+    assert "X-Amz-Signature" in parse_qs(request.url.query.decode())
+    assert request.headers["Content-Type"] == "video/mp4"
+    assert request.headers["Content-Length"] == str(len(video))
+    # Larger than a chunk, so it was streamed rather than read whole
+    assert body == video
+
+
+@pytest.mark.asyncio
+async def test_minio_presigned_get_and_delete(minio, requests):
+    url = await minio.get_presigned_url("anpr-crops", "crops/a/b.jpg", expiry=600)
+
+    query = parse_qs(urlparse(url).query)
+    assert urlparse(url).path == "/anpr-crops/crops/a/b.jpg"
+    assert query["X-Amz-Expires"] == ["600"]
+    assert requests == []
+
+    await minio.delete_file("anpr-crops", "crops/a/b.jpg")
+    [(request, _)] = requests
+    assert request.method == "DELETE"
+    assert request.url.path == "/anpr-crops/crops/a/b.jpg"
+
+
+@pytest.mark.asyncio
+async def test_minio_upload_error_is_raised(minio, requests):
+    requests.responses["PUT"] = httpx.Response(503)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await minio.upload_file(BytesIO(b"crop"), "anpr-crops", "crops/a/b.jpg", "image/jpeg")
+
+
+@pytest.fixture
+def supabase(monkeypatch):
+    monkeypatch.setattr(settings, "SUPABASE_URL", "https://project.supabase.test/")
+    monkeypatch.setattr(settings, "SUPABASE_SERVICE_KEY", "service-key")
+    return SupabaseStorageService()
+
+
+@pytest.mark.asyncio
+async def test_supabase_upload_posts_to_the_object_api(supabase, requests):
+    await supabase.upload_file(BytesIO(b"crop-bytes"), "anpr-crops", "crops/a/b c.jpg", "image/jpeg")
+
+    [(request, body)] = requests
+    assert request.method == "POST"
+    assert str(request.url) == "https://project.supabase.test/storage/v1/object/anpr-crops/crops/a/b%20c.jpg"
+    assert request.headers["Authorization"] == "Bearer service-key"
+    assert request.headers["apikey"] == "service-key"
+    assert request.headers["Content-Type"] == "image/jpeg"
+    assert request.headers["x-upsert"] == "true"
+    assert body == b"crop-bytes"
+
+
+@pytest.mark.asyncio
+async def test_supabase_signed_url_and_delete(supabase, requests):
+    requests.responses["POST"] = httpx.Response(
+        200, json={"signedURL": "/object/sign/anpr-crops/crops/a/b.jpg?token=t"}
+    )
+
+    url = await supabase.get_presigned_url("anpr-crops", "crops/a/b.jpg", expiry=600)
+    await supabase.delete_file("anpr-crops", "crops/a/b.jpg")
+
+    assert url == "https://project.supabase.test/storage/v1/object/sign/anpr-crops/crops/a/b.jpg?token=t"
+    (sign, sign_body), (delete, delete_body) = requests
+    assert sign.url.path == "/storage/v1/object/sign/anpr-crops/crops/a/b.jpg"
+    assert json.loads(sign_body) == {"expiresIn": 600}
+    assert delete.method == "DELETE" and delete.url.path == "/storage/v1/object/anpr-crops"
+    assert json.loads(delete_body) == {"prefixes": ["crops/a/b.jpg"]}
+    assert delete.headers["Authorization"] == "Bearer service-key"
@@ -0,0 +1,146 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src import stream_worker, worker
+from src.config import settings
+from src.models.camera import Camera
+from src.models.upload import Upload, UploadStatus
+from src.services.detector_adapter import DetectorAdapter
+from src.services.storage import LocalStorageService
+from tests.test_stream import CenterPlate
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = str(tmp_path / "camera.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 40, (64, 48))
+    for i in range(20):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def stream_env(db_session, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "FRAME_EXTRACTION_FPS", 10)
+    monkeypatch.setattr(settings, "MOTION_GATE_ENABLED", False)
+    monkeypatch.setattr(settings, "TRACKING_ENABLED", True)
+    monkeypatch.setattr(
+        stream_worker, "AsyncSessionLocal", async_sessionmaker(db_session.bind, expire_on_commit=False)
+    )
+    monkeypatch.setattr(
+        stream_worker, "detector", DetectorAdapter(confidence_threshold=0.5, detector=CenterPlate())
+    )
+    monkeypatch.setattr(worker, "storage_service", LocalStorageService(root=str(tmp_path / "store")))
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+async def add_camera(db_session, url, name="Gate"):
+    camera = Camera(name=name, lat=1.0, lon=2.0, rtsp_url=url)
+    db_session.add(camera)
+    await db_session.commit()
+    return camera
+
+
+async def sessions(db_session):
+    result = await db_session.execute(
+        select(Upload).order_by(Upload.started_at).execution_options(populate_existing=True)
+    )
+    return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_session_row_records_the_stream(db_session, stream_env, video_path):
+    camera = await add_camera(db_session, f"file://{video_path}")
+
+    await stream_worker.CameraStream(camera, stream_env).run_session()
+
+    [upload] = await sessions(db_session)
+    assert upload.status == UploadStatus.DONE
+    assert upload.camera_id == camera.id
+    assert upload.job_id.startswith(f"stream:{camera.id}:")
+    assert upload.events_detected == 1
+    assert upload.meta_data["source"] == "stream"
+
+
+@pytest.mark.asyncio
+async def test_unreachable_camera_leaves_no_session_rows(db_session, stream_env, tmp_path):
+    camera = await add_camera(db_session, f"file://{tmp_path}/missing.avi")
+    stream = stream_worker.CameraStream(camera, stream_env)
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await stream.run_session()
+
+    assert await sessions(db_session) == []
+
+
+@pytest.mark.asyncio
+async def test_reconnects_with_backoff_reset_by_a_long_session(monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_RECONNECT_MIN_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "STREAM_RECONNECT_MAX_SECONDS", 0.08)
+    stream = stream_worker.CameraStream(Camera(name="Gate", rtsp_url="rtsp://gate/live"), None)
+    # Two dead connects, one session that stays up, then dead again
+    outcomes = ["dead", "dead", "up", "dead", "dead"]
+    delays = []
+
+    async def run_session():
+        if outcomes.pop(0) == "up":
+            await asyncio.sleep(0.1)
+        else:
+            raise ConnectionError("Cannot open stream")
+
+    next_delay = stream.backoff.next
+
+    def record_delay():
+        delays.append(next_delay())
+        if not outcomes:
+            stream.stop()
+        return delays[-1]
+
+    monkeypatch.setattr(stream, "run_session", run_session)
+    monkeypatch.setattr(stream.backoff, "next", record_delay)
+    await asyncio.wait_for(stream.run(), timeout=5)
+
+    assert delays == [0.01, 0.02, 0.01, 0.02, 0.04]
+
+
+@pytest.mark.asyncio
+async def test_supervisor_sync_adds_and_removes_streams(db_session, stream_env, monkeypatch):
+    started = []
+
+    async def run(self):
+        started.append(self.url)
+        await self._stopping.wait()
+
+    monkeypatch.setattr(stream_worker.CameraStream, "run", run)
+    gate = await add_camera(db_session, "rtsp://gate/live")
+    yard = await add_camera(db_session, "rtsp://yard/live", name="Yard")
+    await add_camera(db_session, None, name="No stream")
+    supervisor = stream_worker.StreamSupervisor()
+
+    await supervisor.sync()
+    await asyncio.sleep(0)
+    assert set(supervisor.streams) == {gate.id, yard.id}
+    assert sorted(started) == ["rtsp://gate/live", "rtsp://yard/live"]
+    old_yard = supervisor.streams[yard.id]
+
+    gate.active = False
+    yard.rtsp_url = "rtsp://yard/live2"
+    await db_session.commit()
+    await supervisor.sync()
+    await asyncio.sleep(0)
+
+    assert set(supervisor.streams) == {yard.id}
+    assert supervisor.streams[yard.id].url == "rtsp://yard/live2"
+    assert old_yard.task.done()
+    await supervisor.shutdown()
+    assert all(stream.task.done() for stream in supervisor.streams.values())
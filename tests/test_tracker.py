@@ -0,0 +1,65 @@
+from src.detectors.tracker import PlateTracker, iou, track_detections
+
+
+def _detection(frame_no, x, plate="MH12AB1234", confidence=0.8, y=100):
+    return {
+        "plate": plate,
+        "normalized_plate": plate.replace(" ", ""),
+        "confidence": confidence,
+        "bbox": {"x1": x, "y1": y, "x2": x + 100, "y2": y + 30},
+        "frame_no": frame_no,
+    }
+
+
+def test_iou():
+    assert iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert iou((0, 0, 10, 10), (20, 20, 30, 30)) == 0.0
+    assert abs(iou((0, 0, 10, 10), (5, 0, 15, 10)) - 1 / 3) < 1e-9
+
+
+def test_moving_plate_collapses_to_one_event():
+    tracker = PlateTracker(max_gap=10)
+    frames = [
+        (5, [_detection(5, 100, confidence=0.6, plate="MH12AB1284")]),
+        (10, [_detection(10, 120, confidence=0.9)]),
+        (15, [_detection(15, 140, confidence=0.7)]),
+        (20, [_detection(20, 160, confidence=0.5)]),
+    ]
+
+    events = list(track_detections(frames, tracker))
+
+    assert len(events) == 1
+    event = events[0]
+    assert event["normalized_plate"] == "MH12AB1234"
+    assert event["frame_no"] == 10
+    assert event["confidence"] == 0.9
+    assert (event["first_frame_no"], event["last_frame_no"]) == (5, 20)
+    assert event["track_hits"] == 4
+
+
+def test_separate_vehicles_and_gaps_make_separate_events():
+    tracker = PlateTracker(max_gap=10)
+    frames = [
+        (5, [_detection(5, 100, plate="AAA111"), _detection(5, 900, plate="BBB222")]),
+        (10, [_detection(10, 110, plate="AAA111"), _detection(10, 910, plate="BBB222")]),
+        (15, []),
+        (40, [_detection(40, 110, plate="AAA111")]),
+    ]
+
+    events = list(track_detections(frames, tracker))
+
+    assert [(e["normalized_plate"], e["first_frame_no"]) for e in events] == [
+        ("AAA111", 5),
+        ("BBB222", 5),
+        ("AAA111", 40),
+    ]
+    assert tracker.open_tracks == 0
+
+
+def test_tracks_expire_on_batches_without_detections():
+    tracker = PlateTracker(max_gap=10)
+    assert tracker.update(5, [_detection(5, 100)]) == []
+    assert tracker.oldest_open_frame() == 5
+    assert tracker.expire(10) == []
+    assert len(tracker.expire(16)) == 1
+    assert tracker.oldest_open_frame() is None
@@ -0,0 +1,257 @@
+import fakeredis
+import fakeredis.aioredis
+import httpx
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src import worker
+from src.models.upload import Upload, UploadSegment, UploadStatus
+from src.services.checkpoints import CheckpointStore
+from src.services.queue import QueueService
+from src.services.segments import segment_job
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    jobs = []
+
+    async def enqueue(queue_name, job):
+        jobs.append(job)
+        return job["job_id"]
+
+    monkeypatch.setattr(worker.queue_service, "enqueue", enqueue)
+    monkeypatch.setattr(
+        worker,
+        "checkpoint_store",
+        CheckpointStore(fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)),
+    )
+    return jobs
+
+
+@pytest.fixture
+async def upload(db_session, admin_user):
+    upload = Upload(
+        job_id="segmented-job",
+        uploaded_by=admin_user.id,
+        filename="long.mp4",
+        storage_path="uploads/long.mp4",
+        file_size=1000,
+        status=UploadStatus.PROCESSING,
+    )
+    db_session.add(upload)
+    await db_session.commit()
+    return upload
+
+
+def job_for(upload):
+    return {
+        "job_id": upload.job_id,
+        "upload_id": str(upload.id),
+        "storage_path": upload.storage_path,
+        "cost": 90.0,
+    }
+
+
+async def reload(db_session, upload):
+    await db_session.refresh(upload)
+    return upload
+
+
+@pytest.mark.asyncio
+async def test_split_upload_enqueues_every_segment(db_session, upload, enqueued):
+    segments = [(0, 100), (100, 200), (200, None)]
+
+    await worker.split_upload(db_session, upload, job_for(upload), segments)
+
+    assert [job["job_id"] for job in enqueued] == ["segmented-job:0", "segmented-job:1", "segmented-job:2"]
+    assert [job["cost"] for job in enqueued] == [30.0, 30.0, 30.0]
+    assert enqueued[2]["start_frame"] == 200 and enqueued[2]["end_frame"] is None
+    assert (await reload(db_session, upload)).segments_total == 3
+
+
+@pytest.mark.asyncio
+async def test_interrupted_split_is_split_again(db_session, upload, enqueued, monkeypatch):
+    segments = [(0, 100), (100, None)]
+    enqueue = worker.queue_service.enqueue
+
+    async def enqueue_once(queue_name, job):
+        if enqueued:
+            raise ConnectionError("redis went away")
+        return await enqueue(queue_name, job)
+
+    monkeypatch.setattr(worker.queue_service, "enqueue", enqueue_once)
+    with pytest.raises(ConnectionError):
+        await worker.split_upload(db_session, upload, job_for(upload), segments)
+    # Not marked split, so the redelivered job splits it again
+    assert (await reload(db_session, upload)).segments_total is None
+
+    monkeypatch.setattr(worker.queue_service, "enqueue", enqueue)
+    await worker.split_upload(db_session, upload, job_for(upload), segments)
+    assert [job["job_id"] for job in enqueued] == ["segmented-job:0", "segmented-job:0", "segmented-job:1"]
+    assert (await reload(db_session, upload)).segments_total == 2
+
+
+@pytest.mark.asyncio
+async def test_last_segment_finishes_the_upload_once(db_session, upload, enqueued):
+    segments = [(0, 100), (100, None)]
+    await worker.split_upload(db_session, upload, job_for(upload), segments)
+    jobs = [segment_job(job_for(upload), i, segment) for i, segment in enumerate(segments)]
+
+    await worker.complete_segment(db_session, upload, jobs[1], 4)
+    assert (await reload(db_session, upload)).status == UploadStatus.PROCESSING
+
+    # A redelivered segment is not merged a second time
+    await worker.complete_segment(db_session, upload, jobs[1], 4)
+    upload = await reload(db_session, upload)
+    assert (upload.segments_done, upload.events_detected) == (1, 4)
+    assert upload.status == UploadStatus.PROCESSING
+
+    await worker.complete_segment(db_session, upload, jobs[0], 3)
+    upload = await reload(db_session, upload)
+    assert (upload.segments_done, upload.events_detected) == (2, 7)
+    assert upload.status == UploadStatus.DONE
+    assert upload.completed_at is not None
+    rows = await db_session.scalar(select(func.count()).select_from(UploadSegment))
+    assert rows == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_segment_fails_the_upload(db_session, upload, enqueued, monkeypatch):
+    segments = [(0, 100), (100, None)]
+    await worker.split_upload(db_session, upload, job_for(upload), segments)
+    jobs = [segment_job(job_for(upload), i, segment) for i, segment in enumerate(segments)]
+
+    async def broken_download(storage_path):
+        raise IOError("storage unavailable")
+
+    monkeypatch.setattr(worker, "download_video", broken_download)
+    await worker.process_segment_job(db_session, upload, jobs[1])
+    await worker.complete_segment(db_session, upload, jobs[0], 2)
+
+    upload = await reload(db_session, upload)
+    assert upload.status == UploadStatus.FAILED
+    assert (upload.segments_done, upload.segments_failed) == (2, 1)
+    assert "Segment 1 failed" in upload.error_message
+
+
+@pytest.mark.asyncio
+async def test_finished_segment_is_not_run_again(db_session, upload, enqueued, monkeypatch):
+    segments = [(0, 100), (100, None)]
+    await worker.split_upload(db_session, upload, job_for(upload), segments)
+    job = segment_job(job_for(upload), 1, segments[1])
+    await worker.complete_segment(db_session, upload, job, 5)
+
+    async def unexpected_download(storage_path):
+        raise AssertionError("segment was processed again")
+
+    monkeypatch.setattr(worker, "download_video", unexpected_download)
+    await worker.process_segment_job(db_session, upload, job)
+
+    upload = await reload(db_session, upload)
+    assert (upload.segments_done, upload.events_detected) == (1, 5)
+
+
+@pytest.mark.asyncio
+async def test_stalled_job_is_requeued_once(enqueued, monkeypatch):
+    monkeypatch.setattr(worker.settings, "CHECKPOINT_STALE_SECONDS", 60)
+    store = worker.checkpoint_store
+    await store.begin({"job_id": "stalled", "upload_id": "u"})
+    await store.redis.hset(store.key("stalled"), mapping={"updated_at": 0})
+
+    assert await worker.requeue_stalled_jobs() == 1
+    # Still waiting in a backed-up queue on the next passes
+    assert await worker.requeue_stalled_jobs() == 0
+    assert [job["job_id"] for job in enqueued] == ["stalled"]
+    assert enqueued[0]["resume"]
+
+
+@pytest.fixture
+def reliable_queue(db_session, enqueued, monkeypatch):
+    monkeypatch.setattr(worker.settings, "QUEUE_RELIABLE", True)
+    monkeypatch.setattr(worker.settings, "QUEUE_MAX_ATTEMPTS", 2)
+    queue = QueueService()
+    queue.redis = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    monkeypatch.setattr(worker, "queue_service", queue)
+    monkeypatch.setattr(
+        worker, "AsyncSessionLocal", async_sessionmaker(db_session.bind, expire_on_commit=False)
+    )
+    return queue
+
+
+@pytest.mark.asyncio
+async def test_finished_upload_is_not_processed_again(db_session, upload, reliable_queue, monkeypatch):
+    upload.status = UploadStatus.DONE
+    await db_session.commit()
+
+    async def unexpected_download(storage_path):
+        raise AssertionError("upload was processed again")
+
+    monkeypatch.setattr(worker, "download_video", unexpected_download)
+    await worker.process_job(job_for(upload))
+
+    assert (await reload(db_session, upload)).status == UploadStatus.DONE
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_is_retried_then_fails_the_upload(
+    db_session, upload, reliable_queue, monkeypatch
+):
+    async def unreachable(storage_path):
+        raise httpx.ConnectError("storage unreachable")
+
+    monkeypatch.setattr(worker, "download_video", unreachable)
+    await reliable_queue.enqueue("video_processing", job_for(upload))
+
+    job = await reliable_queue.dequeue("video_processing", timeout=1)
+    with pytest.raises(httpx.ConnectError):
+        await worker.run_job(job)
+    assert (await reload(db_session, upload)).status == UploadStatus.PROCESSING
+    assert await reliable_queue.reclaim("video_processing") == (1, 0)
+
+    # The last attempt records the failure instead of handing the job back
+    job = await reliable_queue.dequeue("video_processing", timeout=1)
+    await worker.run_job(job)
+    upload = await reload(db_session, upload)
+    assert upload.status == UploadStatus.FAILED
+    assert "storage unreachable" in upload.error_message
+    assert await reliable_queue.reclaim("video_processing") == (0, 0)
+    assert await reliable_queue.get_dead_letter_length("video_processing") == 0
+
+
+@pytest.mark.asyncio
+async def test_bad_job_fails_without_retry(db_session, upload, reliable_queue, monkeypatch):
+    async def corrupt(storage_path):
+        raise ValueError("Could not open video")
+
+    monkeypatch.setattr(worker, "download_video", corrupt)
+    await reliable_queue.enqueue("video_processing", job_for(upload))
+
+    await worker.run_job(await reliable_queue.dequeue("video_processing", timeout=1))
+
+    assert (await reload(db_session, upload)).status == UploadStatus.FAILED
+    assert await reliable_queue.reclaim("video_processing") == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_retried_job_keeps_its_sampling_rate(db_session, upload, reliable_queue, monkeypatch):
+    upload.sampling_fps = 2.0
+    await db_session.commit()
+    downloaded = []
+
+    async def fresh_rate(camera):
+        raise AssertionError("sampling rate chosen again")
+
+    async def download(storage_path):
+        downloaded.append(storage_path)
+        raise ValueError("Could not open video")
+
+    monkeypatch.setattr(worker, "job_sampling_fps", fresh_rate)
+    monkeypatch.setattr(worker, "download_video", download)
+    await worker.process_job(job_for(upload))
+
+    upload = await reload(db_session, upload)
+    # Got as far as the download with the stored rate
+    assert downloaded == [upload.storage_path]
+    assert upload.error_message == "Could not open video"
+    assert upload.sampling_fps == 2.0
@@ -0,0 +1,94 @@
+import queue
+
+import numpy as np
+import pytest
+
+from src.detectors import yolo_easyocr_adapter as adapter
+
+
+class Boxes:
+    def __init__(self, xyxy):
+        self.xyxy = np.array([xyxy], dtype=np.float32)
+
+
+class Result:
+    def __init__(self, boxes):
+        self.boxes = [Boxes(box) for box in boxes]
+
+
+class FakeYolo:
+    """Finds plates by frame brightness, so each frame gets its own boxes."""
+
+    plates = {
+        10: [(40, 40, 140, 70), (300, 200, 400, 230)],
+        30: [(100, 100, 200, 130)],
+    }
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, frames, conf, imgsz, device, verbose):
+        self.calls.append(len(frames))
+        return [Result(self.plates.get(int(frame[0, 0, 0]), [])) for frame in frames]
+
+
+class FakeRecognizer:
+    version = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def recognize(self, grays):
+        self.calls.append(len(grays))
+        return [("AB 123", 0.9) for _ in grays]
+
+
+@pytest.fixture
+def models(monkeypatch):
+    yolo, recognizer = FakeYolo(), FakeRecognizer()
+    pool = queue.SimpleQueue()
+    pool.put((yolo, recognizer))
+    monkeypatch.setattr(adapter, "_model_pool", pool)
+    monkeypatch.setattr(adapter, "OCR_CACHE_ENABLED", False)
+    monkeypatch.setattr(adapter, "_ocr_cache", None)
+    monkeypatch.setattr(adapter, "DETECTOR_BACKEND", "torch")
+    monkeypatch.setattr(adapter, "RESIZE_WIDTH", 640)
+    return yolo, recognizer
+
+
+def frame(value):
+    return np.full((720, 1280, 3), value, dtype=np.uint8)
+
+
+def test_batched_boxes_map_back_to_their_frames(models):
+    detector = adapter.YoloEasyOcrDetector()
+    # Frame 7 has two plates, frame 8 none, frame 9 one
+    batch = [
+        (frame_no, detector.prepare(frame(value)))
+        for frame_no, value in ((7, 10), (8, 20), (9, 30))
+    ]
+
+    detections = detector.detect_batch(batch)
+
+    yolo, recognizer = models
+    assert (yolo.calls, recognizer.calls) == ([3], [3])
+    # Each crop is cut from its own frame
+    assert [(d["frame_no"], int(d["crop"][0, 0, 0])) for d in detections] == [(7, 10), (7, 10), (9, 30)]
+    assert detections[0]["normalized_plate"] == "AB123"
+    # Boxes found on the half-size frames are reported in source pixels
+    assert [d["bbox"] for d in detections] == [
+        {"x1": 80, "y1": 80, "x2": 280, "y2": 140},
+        {"x1": 600, "y1": 400, "x2": 800, "y2": 460},
+        {"x1": 200, "y1": 200, "x2": 400, "y2": 260},
+    ]
+
+
+def test_crops_do_not_hold_on_to_the_source_frame(models):
+    detector = adapter.YoloEasyOcrDetector()
+    source = frame(10)
+
+    first, _ = detector.detect_batch([(7, detector.prepare(source))])
+
+    assert first["crop"].base is None
+    assert not np.shares_memory(first["crop"], source)
+    assert first["crop"].shape == (2 * 30 + 2 * 12, 2 * 100 + 2 * 12, 3)